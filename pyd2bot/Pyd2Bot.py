@@ -17,6 +17,7 @@ from pyd2bot.logic.roleplay.behaviors.fight.SoloFarmFights import SoloFarmFights
 from pyd2bot.logic.roleplay.behaviors.quest.treasure_hunt.ClassicTreasureHunt import ClassicTreasureHunt
 from pyd2bot.data.models import Session
 from pyd2bot.misc.BotEventsManager import BotEventsManager
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
 from pyd2bot.misc.NapManager import NapManager
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
 from pydofus2.com.ankamagames.dofus.kernel.net.DisconnectionReasonEnum import DisconnectionReasonEnum
@@ -43,6 +44,7 @@ class Pyd2Bot(DofusClient):
         self._old_saved_kamas = None
         self.session_run_id = None
         self._market_persistence_manager = None
+        EdgeHealthStore.load()
 
     def shutdown(self, message="", reason=None):
         if self._main_behavior:
@@ -57,6 +59,8 @@ class Pyd2Bot(DofusClient):
                     behavior.session_resources
                 )
                 Logger().debug(f"Farm stat Session {behavior.current_session_id} ended")
+            if behavior:
+                behavior.resource_tracker.flush()
         return super().shutdown(message, reason)
 
     def onReconnect(self, event, message, afterTime=0):
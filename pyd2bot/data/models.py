@@ -38,6 +38,15 @@ class JobFilter(BaseModel):
             return True  # If resourceIds is empty, the filter allows all resources
         return resourceId in self.resourcesIds
 
+    def gatheredResourcesIds(self) -> List[int]:
+        if self.resourcesIds:
+            return list(self.resourcesIds)
+        return [
+            skill.gatheredRessource.id
+            for skill in Skill.getSkills()
+            if skill.parentJobId == self.jobId and skill.gatheredRessource
+        ]
+
 class Path(BaseModel):
     id: str
     type: PathTypeEnum
@@ -46,6 +55,7 @@ class Path(BaseModel):
     allowedTransitions: Optional[List[TransitionTypeEnum]] = None
     forbiddenSubAreas: Optional[List[int]] = None
     mapIds: Optional[List[int]] = None
+    weightedExploration: Optional[bool] = False
 
     @field_validator("startMapId", mode="before")
     @classmethod
@@ -156,6 +166,8 @@ class Session(BaseModel):
     fightOptionsSent: Optional[bool] = False
     fightOptions: Optional[List] = []
     fightSecret: Optional[bool] = False
+    recordFights: Optional[bool] = False
+    tripKamasBudget: Optional[int] = None
 
     @model_validator(mode="before")
     @classmethod
@@ -3,6 +3,7 @@ from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.TransitionTy
 from typing import TYPE_CHECKING, Iterator, List, Tuple
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.astar.AStar import \
     AStar
+from pyd2bot.farmPaths.FarmPathCache import FarmPathCache
 from pyd2bot.misc.Localizer import Localizer
 from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
     PlayedCharacterManager
@@ -32,6 +33,15 @@ class AbstractFarmPath:
         self._mapIds = []
         self._vertices = set()
         self._edge_count = None
+        # Adjacency index over the path vertices, built once by buildAdjacency()
+        self._vertexIndex: dict['Vertex', int] = {}
+        self._indexVertex: list['Vertex'] = []
+        self._adjacency: list[list['Edge']] = []
+        self._adjacencyTrTypes: list[list[tuple[int, ...]]] = []
+        self._adjacencyStateKey = None
+        self._criterionCache: dict[str, bool] = {}
+        # Serialized path definition the built graph is cached under, set by the PathFactory
+        self.definition: str = None
 
     @property
     def vertices(self) -> Set['Vertex']:
@@ -99,10 +109,16 @@ class AbstractFarmPath:
                 candidates.extend(vertices.values())
         return Localizer.findPathToClosestVertexCandidate(self.currentVertex, candidates)
 
-    def hasValidTransition(self, edge: 'Edge') -> bool:
+    def isCriterionRespected(self, criterion: str) -> bool:
+        """Evaluate a transition criterion, results are memoized until the character state changes"""
         from pydofus2.com.ankamagames.dofus.datacenter.items.criterion.GroupItemCriterion import \
             GroupItemCriterion
 
+        if criterion not in self._criterionCache:
+            self._criterionCache[criterion] = GroupItemCriterion(criterion).isRespected
+        return self._criterionCache[criterion]
+
+    def hasValidTransition(self, edge: 'Edge') -> bool:
         transitions = edge.transitions
         valid = False
         for transition in transitions:
@@ -113,12 +129,129 @@ class AbstractFarmPath:
                     and transition.criterion[0:2] not in AStar.CRITERION_WHITE_LIST
                 ):
                     return False
-                criterion = GroupItemCriterion(transition.criterion)
-                return criterion.isRespected
+                return self.isCriterionRespected(transition.criterion)
             valid = True
         return valid
 
+    def candidateEdges(self, vertex: 'Vertex') -> Iterator['Edge']:
+        """World graph edges leaving the vertex, before path specific filtering"""
+        return WorldGraph().getOutgoingEdgesFromVertex(vertex)
+
+    def validEdges(self, vertex: 'Vertex') -> List['Edge']:
+        return [
+            edge for edge in self.candidateEdges(vertex)
+            if edge.dst.mapId in self.mapIds and self.hasValidTransition(edge)
+        ]
+
+    def characterStateKey(self) -> tuple:
+        """State the transition criteria depend on, the adjacency index is rebuilt when it changes"""
+        return (PlayedCharacterManager().limitedLevel,)
+
+    def invalidateAdjacency(self) -> None:
+        self._vertexIndex = {}
+        self._indexVertex = []
+        self._adjacency = []
+        self._adjacencyTrTypes = []
+        self._adjacencyStateKey = None
+        self._criterionCache.clear()
+        self._vertices = set()
+        self._edge_count = None
+
+    def buildAdjacency(self) -> None:
+        """
+        Index the path vertices reachable from the start vertex and their valid outgoing edges,
+        so that per step edge selection is a lookup instead of a world graph scan.
+        """
+        self.invalidateAdjacency()
+        self._adjacencyStateKey = self.characterStateKey()
+        if self._restoreAdjacency():
+            Logger().debug(f"Adjacency index of path {self.name} loaded from cache with {len(self._indexVertex)} vertices")
+            return
+        queue = collections.deque([self.startVertex])
+        self._vertexIndex[self.startVertex] = 0
+        self._indexVertex.append(self.startVertex)
+        while queue:
+            curr = queue.popleft()
+            edges = self.validEdges(curr)
+            self._adjacency.append(edges)
+            self._adjacencyTrTypes.append([tuple(tr.type for tr in e.transitions) for e in edges])
+            for e in edges:
+                if e.dst not in self._vertexIndex:
+                    self._vertexIndex[e.dst] = len(self._indexVertex)
+                    self._indexVertex.append(e.dst)
+                    queue.append(e.dst)
+        Logger().debug(f"Adjacency index of path {self.name} built with {len(self._indexVertex)} vertices")
+        if self.definition:
+            FarmPathCache.put(self.graphCacheKey(), self.graphCacheEntry())
+
+    def graphCacheKey(self) -> str:
+        return FarmPathCache.key(
+            self.definition, self.startVertex.mapId, self.startVertex.zoneId, self._adjacencyStateKey
+        )
+
+    def graphCacheEntry(self) -> dict:
+        return {
+            "mapIds": list(self.mapIds),
+            "vertices": [(v.mapId, v.zoneId) for v in self._indexVertex],
+            "adjacency": [[self._vertexIndex[e.dst] for e in edges] for edges in self._adjacency],
+        }
+
+    def _restoreAdjacency(self) -> bool:
+        if not self.definition:
+            return False
+        key = self.graphCacheKey()
+        entry = FarmPathCache.get(key)
+        if entry is None:
+            return False
+        vertices = [WorldGraph().getVertex(mapId, zoneId) for mapId, zoneId in entry["vertices"]]
+        if not vertices or None in vertices or vertices[0] != self.startVertex:
+            FarmPathCache.invalidate(key)
+            return False
+        if not self._mapIds:
+            self._mapIds = set(entry["mapIds"])
+        for idx, vertex in enumerate(vertices):
+            self._vertexIndex[vertex] = idx
+        self._indexVertex = vertices
+        for vertex, dstIndexes in zip(vertices, entry["adjacency"]):
+            dsts = {vertices[i] for i in dstIndexes}
+            edges = [e for e in self.candidateEdges(vertex) if e.dst in dsts]
+            if len(edges) != len(dsts):
+                Logger().warning(f"Cached graph of path {self.name} does not match the world graph, rebuilding it")
+                FarmPathCache.invalidate(key)
+                self.invalidateAdjacency()
+                self._adjacencyStateKey = self.characterStateKey()
+                return False
+            self._adjacency.append(edges)
+            self._adjacencyTrTypes.append([tuple(tr.type for tr in e.transitions) for e in edges])
+        return True
+
+    def _checkAdjacencyState(self) -> bool:
+        if not self._indexVertex:
+            return False
+        if self._adjacencyStateKey != self.characterStateKey():
+            Logger().debug(f"Character state changed, rebuilding adjacency index of path {self.name}")
+            self.buildAdjacency()
+        return True
+
+    def adjacentEdges(self, vertex: 'Vertex') -> List['Edge']:
+        """Valid outgoing edges of a vertex, from the adjacency index when the vertex is indexed"""
+        if self._checkAdjacencyState():
+            idx = self._vertexIndex.get(vertex)
+            if idx is not None:
+                return self._adjacency[idx]
+        return self.validEdges(vertex)
+
+    def adjacentTransitionTypes(self, vertex: 'Vertex') -> List[tuple]:
+        """Transition types of each edge returned by adjacentEdges for an indexed vertex"""
+        if self._checkAdjacencyState():
+            idx = self._vertexIndex.get(vertex)
+            if idx is not None:
+                return self._adjacencyTrTypes[idx]
+        return [tuple(tr.type for tr in e.transitions) for e in self.validEdges(vertex)]
+
     def reachableVertices(self) -> Set['Vertex']:
+        if self._checkAdjacencyState():
+            return set(self._indexVertex)
         queue = collections.deque([self.startVertex])
         vertices = set([self.startVertex])
         while queue:
@@ -149,7 +282,7 @@ class AbstractFarmPath:
         # Use vertices from parent class (already computed and cached)
         for vertex in self.vertices:
             # Get all valid outgoing edges
-            for edge in self.outgoingEdges(vertex):
+            for edge in self.adjacentEdges(vertex):
                 # Add edge in canonical form
                 edge_tuple = tuple(sorted([edge.src.UID, edge.dst.UID]))
                 edge_set.add(edge_tuple)
@@ -31,6 +31,7 @@ class CustomRandomFarmPath(AbstractFarmPath):
         return self._mapIds
     
     def init(self):
+        self.buildAdjacency()
         Logger().info(f"CustomRandomFarmPath {self.name} initialized with {len(self.vertices)} vertices")
         vertex_count, edge_count = self.calculate_graph_size()
 
@@ -50,20 +51,19 @@ class CustomRandomFarmPath(AbstractFarmPath):
     def outgoingEdges(self, vertex=None, onlyNonRecentVisited=False) -> Iterator[Edge]:
         if vertex is None:
             vertex = self.currentVertex
-        outgoingEdges = WorldGraph().getOutgoingEdgesFromVertex(vertex, False, False)
+        if not onlyNonRecentVisited:
+            return list(self.adjacentEdges(vertex))
         ret = []
-        for edge in outgoingEdges:
-            if edge.dst.mapId in self.mapIds:
-                if self.hasValidTransition(edge):
-                    if onlyNonRecentVisited:
-                        if edge.dst in self._lastVisited:
-                            if time.perf_counter() - self._lastVisited[edge.dst] > 60 * 60:
-                                ret.append(edge)
-                        else:
-                            ret.append(edge)
-                    else:
-                        ret.append(edge)
+        for edge in self.adjacentEdges(vertex):
+            if edge.dst in self._lastVisited:
+                if time.perf_counter() - self._lastVisited[edge.dst] > 60 * 60:
+                    ret.append(edge)
+            else:
+                ret.append(edge)
         return ret
+
+    def candidateEdges(self, vertex: Vertex) -> Iterator[Edge]:
+        return WorldGraph().getOutgoingEdgesFromVertex(vertex, False, False)
     
     def getNextEdge(self, forbiddenEdges=None, onlyNonRecent=False) -> Edge:
         outgoingEdges = list(self.outgoingEdges(onlyNonRecentVisited=onlyNonRecent))
@@ -1,6 +1,7 @@
 from collections import defaultdict
 from typing import Set, List
 from pyd2bot.farmPaths.AbstractFarmPath import AbstractFarmPath
+from pyd2bot.farmPaths.FarmPathCache import FarmPathCache
 from pyd2bot.farmPaths.RandomAreaFarmPath import NoTransitionFound
 from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import PlayedCharacterManager
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.astar.AStar import AStar
@@ -32,11 +33,40 @@ class CyclicFarmPath(AbstractFarmPath):
         Logger().debug(f"Path sequence: {[edge.src.mapId for edge in self._complete_path]}")
         Logger().debug(f"Total unique maps in path: {len(set(edge.src.mapId for edge in self._complete_path))}")
 
+    def _register_edges(self, edges: List[Edge]):
+        self._complete_path.extend(edges)
+        for edge in edges:
+            self._next_edges[edge.src].append(edge)
+            self._vertices.add(edge.src)
+            self._vertices.add(edge.dst)
+
+    def _restore_complete_path(self, key: str) -> bool:
+        entry = FarmPathCache.get(key)
+        if entry is None:
+            return False
+        edges = []
+        for src_map_id, src_zone_id, dst_map_id, dst_zone_id in entry["edges"]:
+            src = WorldGraph().getVertex(src_map_id, src_zone_id)
+            dst = WorldGraph().getVertex(dst_map_id, dst_zone_id)
+            edge = next((e for e in WorldGraph().getOutgoingEdgesFromVertex(src) if e.dst == dst), None) if src else None
+            if edge is None:
+                Logger().warning(f"Cached cycle of path {self.name} does not match the world graph, rebuilding it")
+                FarmPathCache.invalidate(key)
+                return False
+            edges.append(edge)
+        self._register_edges(edges)
+        return True
+
     def _build_complete_path(self):
         """Builds the complete cyclic path connecting all maps."""
         self._complete_path = []
         self._next_edges.clear()
         self._vertices.clear()
+
+        key = FarmPathCache.key(self.definition, "cycle") if self.definition else None
+        if key and self._restore_complete_path(key):
+            Logger().debug(f"Cyclic path {self.name} loaded from cache")
+            return
         
         # Build path segments between consecutive maps
         for i in range(len(self._mapIds)):
@@ -53,13 +83,8 @@ class CyclicFarmPath(AbstractFarmPath):
             if not path_segment:
                 raise Exception(f"No path found between maps {current_map_id} -> {next_map_id}")
                 
-            self._complete_path.extend(path_segment)
-            
             # Build the next_edges mapping from path segment
-            for edge in path_segment:
-                self._next_edges[edge.src].append(edge)
-                self._vertices.add(edge.src)
-                self._vertices.add(edge.dst)
+            self._register_edges(path_segment)
             
         # Add final connection to make it cyclic
         if self._complete_path:
@@ -68,11 +93,12 @@ class CyclicFarmPath(AbstractFarmPath):
             if last_vertex != first_vertex:
                 closing_path = AStar().search(last_vertex, first_vertex)
                 if closing_path:
-                    self._complete_path.extend(closing_path)
-                    for edge in closing_path:
-                        self._next_edges[edge.src].append(edge)
-                        self._vertices.add(edge.src)
-                        self._vertices.add(edge.dst)
+                    self._register_edges(closing_path)
+
+        if key:
+            FarmPathCache.put(key, {
+                "edges": [(e.src.mapId, e.src.zoneId, e.dst.mapId, e.dst.zoneId) for e in self._complete_path]
+            })
 
     def __next__(self, forbiddenEdges=None) -> Edge:
         """Get next edge in cycle."""
@@ -0,0 +1,89 @@
+import hashlib
+import os
+import pickle
+import threading
+from typing import Optional
+
+from pyd2bot.BotSettings import BotSettings
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+
+
+class FarmPathCache:
+    """
+    On disk cache of the graphs built by farm paths at init (vertex sets, map ids, cyclic edge sequences).
+
+    Entries only hold map ids and zone ids so they can be resolved back against the world graph.
+    The file is dropped as a whole when its format version or the game data version changes.
+    """
+
+    FORMAT_VERSION = 1
+    _file = os.path.join(BotSettings.PERSISTENCE_DIR, "farm_paths.cache")
+    _lock = threading.Lock()
+    _entries: dict[str, dict] = None
+
+    @staticmethod
+    def game_data_version() -> str:
+        # Game data ships with pydofus2, its version identifies the world graph the entries were built on
+        try:
+            from importlib.metadata import version
+
+            return version("pydofus2")
+        except Exception:
+            return "unknown"
+
+    @staticmethod
+    def key(definition: str, *parts) -> str:
+        return hashlib.sha1("|".join([definition] + [str(p) for p in parts]).encode()).hexdigest()
+
+    @classmethod
+    def _load(cls) -> dict[str, dict]:
+        if cls._entries is None:
+            cls._entries = cls._read()
+        return cls._entries
+
+    @classmethod
+    def _read(cls) -> dict[str, dict]:
+        if not os.path.exists(cls._file):
+            return {}
+        try:
+            with open(cls._file, "rb") as fp:
+                data = pickle.load(fp)
+            if data.get("format") == cls.FORMAT_VERSION and data.get("game") == cls.game_data_version():
+                return data["paths"]
+            Logger().info("Farm paths cache is outdated, it will be rebuilt")
+        except Exception as e:
+            Logger().warning(f"Unable to read farm paths cache: {e}")
+        return {}
+
+    @classmethod
+    def _write(cls, entries: dict[str, dict]) -> None:
+        data = {"format": cls.FORMAT_VERSION, "game": cls.game_data_version(), "paths": entries}
+        tmp_file = f"{cls._file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_file, "wb") as fp:
+                pickle.dump(data, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cls._file)
+        except Exception as e:
+            Logger().warning(f"Unable to write farm paths cache: {e}")
+
+    @classmethod
+    def get(cls, key: str) -> Optional[dict]:
+        with cls._lock:
+            return cls._load().get(key)
+
+    @classmethod
+    def put(cls, key: str, entry: dict) -> None:
+        with cls._lock:
+            # Entries written by other processes since we loaded the file are kept
+            entries = cls._read()
+            entries[key] = entry
+            cls._entries = entries
+            cls._write(entries)
+
+    @classmethod
+    def invalidate(cls, key: str) -> None:
+        with cls._lock:
+            entries = cls._read()
+            cls._entries = entries
+            if entries.pop(key, None) is not None:
+                cls._write(entries)
@@ -1,6 +1,8 @@
+import math
 import random
+from collections import Counter
 from time import perf_counter
-from typing import Iterator, Set
+from typing import Callable, Dict, Iterator, List, Optional, Set
 
 from pyd2bot.farmPaths.AbstractFarmPath import AbstractFarmPath
 from pydofus2.com.ankamagames.dofus.datacenter.world.MapPosition import \
@@ -14,14 +16,18 @@ from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.TransitionTy
     TransitionTypeEnum
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import \
     Vertex
-from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.WorldGraph import \
-    WorldGraph
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 
 
 class NoTransitionFound(Exception):
     pass
 class RandomAreaFarmPath(AbstractFarmPath):
+    # Seconds after which a harvested map is assumed to have fully respawned
+    RESPAWN_TIME = 10 * 60
+    # Weight of the UCB exploration bonus relative to the normalized expected yield
+    EXPLORATION_COEF = 0.5
+    # Floor weight so that an edge is never totally excluded from sampling
+    MIN_EDGE_WEIGHT = 0.05
     
     def __init__(
         self,
@@ -29,16 +35,34 @@ class RandomAreaFarmPath(AbstractFarmPath):
         startVertex: Vertex,
         allowedTransitions: list = None,
         subAreaBlacklist: list = None,
+        weightedExploration: bool = False,
     ) -> None:
         super().__init__()
         self.name = name
         self.startVertex = startVertex
         self.allowedTransitions: list[TransitionTypeEnum] = allowedTransitions
         self.subAreaBlacklist = subAreaBlacklist if subAreaBlacklist is not None else []
+        self.subAreas = None
+        self.weightedExploration = weightedExploration
+        self._targetResourcesIds: List[int] = []
+        self._yieldEstimator: Callable[[List[str], List[int]], Dict[str, int]] = None
+        self._visitCounts = Counter[Vertex]()
+
+    def setYieldEstimator(
+        self, resourcesIds: List[int], estimator: Callable[[List[str], List[int]], Dict[str, int]]
+    ) -> None:
+        """
+        Set the resources the farmer is after and the function giving, for a list of vertex uids,
+        the number of those resources last seen on each vertex.
+        """
+        self._targetResourcesIds = resourcesIds
+        self._yieldEstimator = estimator
 
     def init(self):
         self.area = SubArea.getSubAreaByMapId(self.startVertex.mapId).area
-        self.subAreas = self.getAllSubAreas()
+        self.subAreas = None
+        # Restores the map ids from the graph cache when possible, sparing the scan of all the subareas
+        self.buildAdjacency()
         Logger().info(f"RandomAreaFarmPath {self.name} initialized with {len(self.vertices)} vertices")
 
     @property
@@ -76,8 +100,42 @@ class RandomAreaFarmPath(AbstractFarmPath):
             outgoingEdges = [e for e in outgoingEdges if e not in forbiddenEdges]
         if not outgoingEdges:
             raise NoTransitionFound()
-        edge = random.choice(outgoingEdges)
+        if self.weightedExploration and self._yieldEstimator:
+            edge = self.sampleWeightedEdge(outgoingEdges)
+        else:
+            edge = random.choice(outgoingEdges)
+        self._visitCounts[edge.dst] += 1
         return edge
+
+    def lastVisitTime(self, vertex: Vertex) -> Optional[float]:
+        return max((t for e, t in self._lastVisited.items() if e.dst == vertex), default=None)
+
+    def edgeWeights(self, edges: List[Edge]) -> List[float]:
+        """
+        UCB style score of each edge: expected yield of its destination, scaled down by how much of the
+        respawn time elapsed since the last visit, plus an exploration bonus for rarely visited vertices.
+        Vertices with no resources history get the average known yield as an optimistic prior.
+        """
+        density = self._yieldEstimator([e.dst.UID for e in edges], self._targetResourcesIds)
+        known = [density[e.dst.UID] for e in edges if e.dst.UID in density]
+        prior = sum(known) / len(known) if known else 1
+        maxYield = max(known + [prior]) or 1
+        totalVisits = sum(self._visitCounts[e.dst] for e in edges)
+        now = perf_counter()
+        weights = []
+        for edge in edges:
+            expected = density.get(edge.dst.UID, prior) / maxYield
+            lastVisit = self.lastVisitTime(edge.dst)
+            if lastVisit is not None:
+                expected *= min(1.0, (now - lastVisit) / self.RESPAWN_TIME)
+            bonus = self.EXPLORATION_COEF * math.sqrt(math.log(totalVisits + 1) / (self._visitCounts[edge.dst] + 1))
+            weights.append(max(self.MIN_EDGE_WEIGHT, expected + bonus))
+        return weights
+
+    def sampleWeightedEdge(self, edges: List[Edge]) -> Edge:
+        weights = self.edgeWeights(edges)
+        Logger().debug(f"Weighted exploration edges : {[(e.dst.mapId, round(w, 2)) for e, w in zip(edges, weights)]}")
+        return random.choices(edges, weights=weights, k=1)[0]
     
     def __next__(self) -> Edge:
         outgoingEdges = list(self.outgoingEdges())
@@ -87,9 +145,6 @@ class RandomAreaFarmPath(AbstractFarmPath):
         return edge
     
     def hasValidTransition(self, edge: Edge) -> bool:
-        from pydofus2.com.ankamagames.dofus.datacenter.items.criterion.GroupItemCriterion import \
-            GroupItemCriterion
-
         if self.allowedTransitions:
             transitions = [tr for tr in edge.transitions if TransitionTypeEnum(tr.type) in self.allowedTransitions]
         else:
@@ -105,27 +160,22 @@ class RandomAreaFarmPath(AbstractFarmPath):
                     and transition.criterion[0:2] not in AStar.CRITERION_WHITE_LIST
                 ):
                     return False
-                criterion = GroupItemCriterion(transition.criterion)
-                return criterion.isRespected
+                return self.isCriterionRespected(transition.criterion)
             valid = True
         return valid
     
     def outgoingEdges(self, vertex=None, onlyNonRecentVisited=False) -> Iterator[Edge]:
         if vertex is None:
             vertex = self.currentVertex
-        outgoingEdges = WorldGraph().getOutgoingEdgesFromVertex(vertex)
+        if not onlyNonRecentVisited:
+            return list(self.adjacentEdges(vertex))
         ret = []
-        for edge in outgoingEdges:
-            if edge.dst.mapId in self.mapIds:
-                if self.hasValidTransition(edge):
-                    if onlyNonRecentVisited:
-                        if edge.dst in self._lastVisited:
-                            if perf_counter() - self._lastVisited[edge.dst] > 60 * 60:
-                                ret.append(edge)
-                        else:
-                            ret.append(edge)
-                    else:
-                        ret.append(edge)
+        for edge in self.adjacentEdges(vertex):
+            if edge.dst in self._lastVisited:
+                if perf_counter() - self._lastVisited[edge.dst] > 60 * 60:
+                    ret.append(edge)
+            else:
+                ret.append(edge)
         return ret
     
     def __iter__(self) -> Iterator[Vertex]:
@@ -144,6 +194,8 @@ class RandomAreaFarmPath(AbstractFarmPath):
     
     def getAllMapsIds(self) -> Set[int]:
         mapIds = set[int]()
+        if self.subAreas is None:
+            self.subAreas = self.getAllSubAreas()
         for sa in self.subAreas:
             for mapId in sa.mapIds:
                 if SubArea.getSubAreaByMapId(mapId).id not in self.subAreaBlacklist:
@@ -161,4 +213,5 @@ class RandomAreaFarmPath(AbstractFarmPath):
             },
             "allowedTransitions": self.allowedTransitions,
             "subAreaBlacklist": self.subAreaBlacklist,
+            "weightedExploration": self.weightedExploration,
         }
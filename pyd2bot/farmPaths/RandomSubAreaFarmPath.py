@@ -13,8 +13,6 @@ from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.TransitionTy
     TransitionTypeEnum
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import \
     Vertex
-from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.WorldGraph import \
-    WorldGraph
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 
 
@@ -39,6 +37,7 @@ class RandomSubAreaFarmPath(AbstractFarmPath):
 
     def init(self):
         self._subArea = SubArea.getSubAreaByMapId(self.startVertex.mapId)
+        self.buildAdjacency()
         Logger().info(f"RandomSubAreaFarmPath {self.name} initialized with {len(self.vertices)} vertices")
 
     def recentVisitedVertices(self):
@@ -67,19 +66,15 @@ class RandomSubAreaFarmPath(AbstractFarmPath):
             vertex = self.currentVertex
         if not self._subArea:
             self._subArea = SubArea.getSubAreaByMapId(vertex.mapId)
-        outgoingEdges = WorldGraph().getOutgoingEdgesFromVertex(vertex)
+        if not onlyNonRecentVisited:
+            return list(self.adjacentEdges(vertex))
         ret = []
-        for edge in outgoingEdges:
-            if edge.dst.mapId in self.mapIds:
-                if self.hasValidTransition(edge):
-                    if onlyNonRecentVisited:
-                        if edge.dst in self._lastVisited:
-                            if time.perf_counter() - self._lastVisited[edge.dst] > 60 * 60:
-                                ret.append(edge)
-                        else:
-                            ret.append(edge)
-                    else:
-                        ret.append(edge)
+        for edge in self.adjacentEdges(vertex):
+            if edge.dst in self._lastVisited:
+                if time.perf_counter() - self._lastVisited[edge.dst] > 60 * 60:
+                    ret.append(edge)
+            else:
+                ret.append(edge)
         return ret
 
     def __iter__(self) -> Iterator[Vertex]:
@@ -102,9 +97,6 @@ class RandomSubAreaFarmPath(AbstractFarmPath):
         }
 
     def hasValidTransition(self, edge: Edge) -> bool:
-        from pydofus2.com.ankamagames.dofus.datacenter.items.criterion.GroupItemCriterion import \
-            GroupItemCriterion
-
         
         if self.allowedTransitions:
             transitions = [tr for tr in edge.transitions if TransitionTypeEnum(tr.type) in self.allowedTransitions]
@@ -121,8 +113,7 @@ class RandomSubAreaFarmPath(AbstractFarmPath):
                     and transition.criterion[0:2] not in AStar.CRITERION_WHITE_LIST
                 ):
                     return False
-                criterion = GroupItemCriterion(transition.criterion)
-                return criterion.isRespected
+                return self.isCriterionRespected(transition.criterion)
             valid = True
         return valid
     
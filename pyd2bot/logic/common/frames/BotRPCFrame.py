@@ -1,4 +1,6 @@
 import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable
 
 from pyd2bot.BotSettings import BotSettings
 from pyd2bot.logic.common.rpcMessages.ComeToCollectMessage import \
@@ -15,6 +17,7 @@ from pyd2bot.logic.roleplay.messages.FollowTransitionMessage import FollowTransi
 from pyd2bot.logic.roleplay.messages.MoveToVertexMessage import MoveToVertexMessage
 from pyd2bot.logic.roleplay.messages.SellerVacantMessage import SellerVacantMessage
 from pyd2bot.misc.BotEventsManager import BotEventsManager
+from pyd2bot.misc.DeadlineScheduler import DeadlineScheduler
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.berilia.managers.KernelEventsManager import KernelEventsManager
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
@@ -22,8 +25,6 @@ from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterMa
     PlayedCharacterManager
 from pydofus2.com.ankamagames.dofus.logic.game.roleplay.types.MovementFailError import \
     MovementFailError
-from pydofus2.com.ankamagames.jerakine.benchmark.BenchmarkTimer import \
-    BenchmarkTimer
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 from pydofus2.com.ankamagames.jerakine.messages.Frame import Frame
 from pydofus2.com.ankamagames.jerakine.types.enums.Priority import Priority
@@ -35,7 +36,9 @@ class BotRPCFrame(Frame):
     CALL_TIMEOUT = "call timeout"
     
     def __init__(self):
-        self._waitingForResp = {}
+        # request uid -> (future of the response, deadline entry)
+        self._waitingForResp = dict[object, tuple[Future, list]]()
+        self._lock = threading.Lock()
         super().__init__()
 
     def pushed(self) -> bool:
@@ -51,24 +54,19 @@ class BotRPCFrame(Frame):
     def process(self, msg: RPCMessage) -> bool:
         if isinstance(msg, RPCMessage):
             if isinstance(msg, RPCResponseMessage):
-                if msg.reqUid in self._waitingForResp:
-                    respw = self._waitingForResp[msg.reqUid]
-                    respw["timeout"].cancel()
-                    del respw["timeout"]
-                    if "callback" in respw:
-                        self._waitingForResp.pop(msg.reqUid)
-                        if respw["callback"] is not None:
-                            respw["callback"](result=msg.data, error=None, sender=msg.sender)
-                    if "event" in respw:
-                        respw["result"] = msg.data
-                        respw["event"].set()
+                with self._lock:
+                    waiting = self._waitingForResp.pop(msg.reqUid, None)
+                if waiting is not None:
+                    future, deadline = waiting
+                    DeadlineScheduler().cancel(deadline)
+                    future.set_result(msg.data)
                 else:
                     Logger().warn("RPCResponseMessage without waiting caller")
                 return True
 
             if isinstance(msg, GetStatusMessage):
-                from pyd2bot.apis.PlayerAPI import PlayerAPI
-                rsp = RPCResponseMessage(msg, data=PlayerAPI().status)
+                from pyd2bot.logic.roleplay.behaviors.party.WaitForMembersIdle import WaitForMembersIdle
+                rsp = RPCResponseMessage(msg, data=WaitForMembersIdle.getMuleStatus(threading.current_thread().name))
                 self.send(rsp)
                 return True
 
@@ -126,16 +124,11 @@ class BotRPCFrame(Frame):
         
         return False
 
-    def onTimeout(self, msg: RPCMessage, timeout):
-        if msg.uid in self._waitingForResp:
-            respw = self._waitingForResp[msg.uid]
-            if "callback" in respw:
-                self._waitingForResp.pop(msg.uid)
-                respw["callback"](result=None, error=self.CALL_TIMEOUT, sender=threading.current_thread().name)
-            if "event" in respw:
-                respw["event"].set()
-                respw["result"] = None
-                respw["err"] = self.CALL_TIMEOUT
+    def onTimeout(self, msg: RPCMessage):
+        with self._lock:
+            waiting = self._waitingForResp.pop(msg.uid, None)
+        if waiting is not None:
+            waiting[0].set_exception(TimeoutError(self.CALL_TIMEOUT))
 
     def askForStatus(self, dst, callback):
         msg = GetStatusMessage(dst)
@@ -145,6 +138,9 @@ class BotRPCFrame(Frame):
         msg = GetStatusMessage(dst)
         return self.sendSync(msg, timeout)
 
+    def askForStatusAll(self, dsts: Iterable[str], callback, timeout=20):
+        self.gather(self.multicast(dsts, GetStatusMessage, timeout), callback)
+
     def askCurrVertex(self, dst, callback):
         msg = GetCurrentVertexMessage(dst)
         self.send(msg, callback)
@@ -153,47 +149,100 @@ class BotRPCFrame(Frame):
         msg = GetCurrentVertexMessage(dst)
         return self.sendSync(msg, timeout)
 
-    def askMoveToVertex(self, dst, vertex):
-        msg = MoveToVertexMessage(dst, vertex)
-        self.send(msg)
+    def askCurrVertexAll(self, dsts: Iterable[str], callback, timeout=20):
+        self.gather(self.multicast(dsts, GetCurrentVertexMessage, timeout), callback)
+
+    def askMoveToVertex(self, dsts: Iterable[str], vertex):
+        for dst in self._dests(dsts):
+            self.post(dst, MoveToVertexMessage(vertex))
 
-    def askFollowTransition(self, dst, transition, dstMapId):
-        msg = FollowTransitionMessage(dst, transition, dstMapId)
-        self.send(msg)
+    def askFollowTransition(self, dsts: Iterable[str], transition, dstMapId):
+        for dst in self._dests(dsts):
+            self.post(dst, FollowTransitionMessage(transition, dstMapId))
 
     def askComeToCollect(self, dst, bankInfo, guestInfo, callback):
         msg = ComeToCollectMessage(dst, bankInfo, guestInfo)
         self.send(msg, callback)
 
-    def send(self, msg: RPCMessage, callback=None, timeout=60) -> None:
+    @staticmethod
+    def _dests(dsts) -> list:
+        return [dsts] if isinstance(dsts, str) else list(dsts)
+
+    def post(self, dst: str, msg) -> bool:
+        """Oneway message to the kernel of another bot"""
+        inst = Kernel.getInstance(dst)
+        if not inst:
+            Logger().warning(f"Can't post {type(msg).__name__} to {dst}: {self.DEST_KERNEL_NOT_FOUND}")
+            return False
+        inst.worker.process(msg)
+        return True
+
+    def call(self, msg: RPCMessage, timeout=60) -> Future:
+        """Sends the request, the future resolves to the response data or fails on timeout"""
+        future = Future()
         inst = Kernel.getInstance(msg.dest)
         if not inst:
-            if callback:
-                return callback(result=None, error=self.DEST_KERNEL_NOT_FOUND, sender=msg.sender)
-        if not msg.oneway and msg.uid not in self._waitingForResp:
-            self._waitingForResp[msg.uid] = {}
-            self._waitingForResp[msg.uid]["timeout"] = BenchmarkTimer(timeout, self.onTimeout, [msg, timeout])
-            self._waitingForResp[msg.uid]["callback"] = callback
-            self._waitingForResp[msg.uid]["timeout"].start()
+            future.set_exception(LookupError(self.DEST_KERNEL_NOT_FOUND))
+            return future
+        # The timeout fires on the scheduler thread, completion is handed back to the caller's worker
+        kernel = Kernel()
+        with self._lock:
+            deadline = DeadlineScheduler().schedule(timeout, lambda: kernel.defer(lambda: self.onTimeout(msg)))
+            self._waitingForResp[msg.uid] = (future, deadline)
         inst.worker.process(msg)
+        return future
+
+    def multicast(self, dsts: Iterable[str], msgFactory: Callable[[str], RPCMessage], timeout=60) -> Dict[str, Future]:
+        """Sends the same request to every destination at once, one future per destination"""
+        return {dst: self.call(msgFactory(dst), timeout) for dst in self._dests(dsts)}
+
+    @staticmethod
+    def gather(futures: Dict[str, Future], callback) -> None:
+        """
+        Calls back once on the caller's worker, when every future is done, with the results and errors keyed by
+        destination. The wait lasts as long as the slowest destination, timeouts included.
+        """
+        kernel = Kernel()
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def on_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+            results, errors = {}, {}
+            for dst, future in futures.items():
+                error = future.exception()
+                if error is None:
+                    results[dst] = future.result()
+                else:
+                    errors[dst] = str(error)
+            kernel.defer(lambda: callback(results=results, errors=errors))
+
+        if not futures:
+            return kernel.defer(lambda: callback(results={}, errors={}))
+        for future in futures.values():
+            future.add_done_callback(on_done)
+
+    def send(self, msg: RPCMessage, callback=None, timeout=60) -> None:
+        if msg.oneway:
+            self.post(msg.dest, msg)
+            return
+        future = self.call(msg, timeout)
+        if callback is not None:
+            def on_done(future: Future):
+                error = future.exception()
+                callback(
+                    result=None if error else future.result(),
+                    error=str(error) if error else None,
+                    sender=msg.dest,
+                )
+
+            future.add_done_callback(on_done)
 
     def sendSync(self, msg: RPCMessage, timeout=60) -> RPCResponseMessage:
         if msg.oneway:
             raise Exception("sendSync can't be used with oneway message")
-        if msg.uid not in self._waitingForResp:
-            self._waitingForResp[msg.uid] = {
-                "timeout": BenchmarkTimer(timeout, self.onTimeout, [msg, None]),
-                "event": threading.Event(),
-            }
-            self._waitingForResp[msg.uid]["timeout"].start()
-        resw = self._waitingForResp[msg.uid]
-        inst = Kernel.getInstance(msg.dest)
-        inst.worker.process(msg)
-        if not resw["event"].wait(10):
-            raise TimeoutError(self.CALL_TIMEOUT)
-        result = resw["result"]
-        error = resw.get("err")
-        self._waitingForResp.pop(msg.uid)
-        if error:
-            raise Exception(error)
-        return result
+        # Bounded here too, the deferred timeout can't run while the caller's worker is blocked on it
+        return self.call(msg, timeout).result(timeout)
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING, Optional, List
 from pyd2bot.data.models import Character, Session
+from pyd2bot.logic.fight.behaviors.FightTurnSnapshot import FightTurnSnapshot
 from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
 from pydofus2.com.ankamagames.dofus.internalDatacenter.stats.EntityStats import EntityStats
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
@@ -30,6 +31,7 @@ class FightStateManager(metaclass=Singleton):
     def __init__(self):
         self._current_player = None
         self._turn_preparation_done = False
+        self._turn_snapshot: Optional[FightTurnSnapshot] = None
         self.turn_playing = False
 
     @property
@@ -77,6 +79,27 @@ class FightStateManager(metaclass=Singleton):
         # Mark as fighting
         self.player_manager.isFighting = True
         self._turn_preparation_done = True
+        self.invalidate_turn_snapshot()
+        if self.fighter_infos:
+            self._turn_snapshot = FightTurnSnapshot.build(self.fighter_infos)
+
+    def get_turn_snapshot(self, fighter_infos: "GameFightFighterInformations" = None) -> Optional[FightTurnSnapshot]:
+        """
+        Snapshot of the fight entities for the current turn, rebuilt after an invalidation
+        or when asked for another fighter than the one it was built for.
+        """
+        if fighter_infos is None:
+            fighter_infos = self.fighter_infos
+        if fighter_infos is None:
+            return None
+        snapshot = self._turn_snapshot
+        if snapshot is None or snapshot.fighterId != fighter_infos.contextualId:
+            snapshot = self._turn_snapshot = FightTurnSnapshot.build(fighter_infos)
+        return snapshot
+
+    def invalidate_turn_snapshot(self) -> None:
+        """Drop the turn snapshot, entities changed (turn start, move or spell cast results)"""
+        self._turn_snapshot = None
 
     def cleanup_turn_state(self) -> None:
         """
@@ -99,6 +122,7 @@ class FightStateManager(metaclass=Singleton):
             spell_cast_manager.nextTurn()
 
         self._turn_preparation_done = False
+        self.invalidate_turn_snapshot()
         self.current_player = None
         
     def validate_turn_state(self) -> bool:
@@ -235,6 +259,7 @@ class FightStateManager(metaclass=Singleton):
     def refresh_turn_state(self, msg: GameFightTurnStartMessage):
         """Update turn state and buffs"""
         player_id = msg.id
+        self.invalidate_turn_snapshot()
 
         if not isinstance(msg, GameFightTurnResumeMessage):
             BuffManager().decrementDuration(player_id)
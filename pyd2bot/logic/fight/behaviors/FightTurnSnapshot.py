@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from prettytable import PrettyTable
+from pydofus2.com.ankamagames.dofus.datacenter.monsters.Monster import Monster
+from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
+from pydofus2.com.ankamagames.dofus.logic.common.managers.StatsManager import StatsManager
+from pydofus2.com.ankamagames.dofus.logic.game.fight.managers.CurrentPlayedFighterManager import CurrentPlayedFighterManager
+from pydofus2.com.ankamagames.dofus.logic.game.fight.managers.FightersStateManager import FightersStateManager
+from pydofus2.com.ankamagames.dofus.logic.game.fight.miscs.TackleUtil import TackleUtil
+from pydofus2.com.ankamagames.dofus.network.types.game.context.fight.GameFightMonsterInformations import (
+    GameFightMonsterInformations,
+)
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+
+if TYPE_CHECKING:
+    from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
+    from pydofus2.com.ankamagames.dofus.network.types.game.context.fight.GameFightFighterInformations import (
+        GameFightFighterInformations,
+    )
+
+
+@dataclass(frozen=True)
+class EntitySnapshot:
+    infos: "GameFightFighterInformations"
+    id: float
+    cellId: int
+    teamId: int
+    name: str
+    level: object
+    hitpoints: int
+    dead: bool
+    hidden: bool
+    summoned: bool
+    isMonster: bool
+    state: tuple
+    boneId: int
+
+
+@dataclass(frozen=True)
+class FightTurnSnapshot:
+    """
+    State of the fight entities at some point of a turn, built once and read by every targeting helper.
+    Castability is resolved lazily, once per spell level, and tackle once per cell, both memoized with the snapshot.
+    """
+
+    fighterId: float
+    fighterCellId: int
+    teamId: int
+    entities: Tuple[EntitySnapshot, ...]
+    fighterInfos: "GameFightFighterInformations" = field(default=None, compare=False)
+    _castability: Dict[Tuple[int, int], Dict[float, Tuple[bool, str]]] = field(default_factory=dict, compare=False)
+    _tackle: Dict[int, float] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def build(cls, fighter_infos: "GameFightFighterInformations") -> "FightTurnSnapshot":
+        entities = []
+        for entity in Kernel().fightEntitiesFrame.entities.values():
+            if entity.contextualId >= 0:
+                continue
+            name = "unknown"
+            level = "unknown"
+            is_monster = isinstance(entity, GameFightMonsterInformations)
+            if is_monster:
+                name = Monster.getMonsterById(entity.creatureGenericId).name
+                level = entity.creatureLevel
+            entities.append(EntitySnapshot(
+                infos=entity,
+                id=entity.contextualId,
+                cellId=entity.disposition.cellId,
+                teamId=entity.spawnInfo.teamId,
+                name=name,
+                level=level,
+                hitpoints=StatsManager().getStats(entity.contextualId).getHealthPoints(),
+                dead=entity.contextualId in Kernel().battleFrame.deadFightersList,
+                hidden=entity.contextualId in Kernel().fightContextFrame.hiddenEntities,
+                summoned=entity.stats.summoned,
+                isMonster=is_monster,
+                state=tuple(FightersStateManager().getStatus(entity.contextualId).getActiveStatuses()),
+                boneId=entity.look.bonesId,
+            ))
+        return cls(
+            fighterId=fighter_infos.contextualId,
+            fighterCellId=fighter_infos.disposition.cellId,
+            teamId=fighter_infos.spawnInfo.teamId,
+            entities=tuple(entities),
+            fighterInfos=fighter_infos,
+        )
+
+    def castability(self, spellw: "SpellWrapper") -> Dict[float, Tuple[bool, str]]:
+        """entity id -> (can cast, reason) for the spell"""
+        key = (spellw.spellId, spellw.spellLevel)
+        result = self._castability.get(key)
+        if result is None:
+            result = {
+                entity.id: CurrentPlayedFighterManager().canCastThisSpell(spellw.spellId, spellw.spellLevel, entity.id)
+                for entity in self.entities
+            }
+            self._castability[key] = result
+            self._log_summary(result)
+        return result
+
+    def tackleAt(self, cellId: int) -> float:
+        """Tackle factor of the fighter leaving the cell, 1 when no enemy holds it"""
+        tackle = self._tackle.get(cellId)
+        if tackle is None:
+            tackle = self._tackle[cellId] = TackleUtil.getTackle(self.fighterInfos, MapPoint.fromCellId(cellId))
+        return tackle
+
+    def enemies(
+        self, spellw: "SpellWrapper", target_sums=False, target_boneId: Optional[int] = None
+    ) -> List[EntitySnapshot]:
+        """Enemies the spell can hit, with the same filters as get_targetable_entities"""
+        castability = self.castability(spellw)
+        return [
+            entity
+            for entity in self.entities
+            if entity.teamId != self.teamId
+            and not entity.dead
+            and not entity.hidden
+            and (target_sums or not entity.summoned)
+            and castability[entity.id][0]
+            and entity.cellId != -1
+            and (target_boneId is None or entity.boneId == target_boneId)
+        ]
+
+    def _log_summary(self, castability: Dict[float, Tuple[bool, str]]) -> None:
+        summaryTable = PrettyTable(
+            ["name", "id", "boneId", "level", "hitpoints", "hidden", "summoned", "state", "canhit", "reason"]
+        )
+        for e in self.entities:
+            canhit, reason = castability[e.id]
+            summaryTable.add_row(
+                [e.name, e.id, e.boneId, e.level, e.hitpoints, e.hidden, e.summoned, list(e.state), canhit, reason]
+            )
+        Logger().info("\n" + str(summaryTable))
@@ -0,0 +1,98 @@
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import MapDisplayManager
+from pydofus2.com.ankamagames.atouin.utils.DataMapProvider import DataMapProvider
+from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
+from pydofus2.com.ankamagames.jerakine.metaclass.Singleton import Singleton
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+from pydofus2.mapTools import MapTools
+
+CELLS_COUNT = 560
+# Extra bit set in every blocked mask, lines leaving the map carry it
+OUT_OF_MAP_BIT = 1 << CELLS_COUNT
+# Line masks kept, out of the 560 * 560 (src, dst) pairs
+LINE_MASKS_CACHE_SIZE = 1 << 16
+
+
+class FightLosMap(metaclass=Singleton):
+    """
+    Line of sight on the fight map as bit operations.
+
+    Cells that block the view are kept as a bitset: static obstacles computed once per map and per set of
+    cells the fight updated in the DataMapProvider, overlaid with the fighters that can't be seen through,
+    recomputed only when fighters positions change.
+    The cells crossed by the line between two cells only depend on the map geometry, they are computed once
+    per (src, dst) pair and shared by every map, a LOS check is then a single AND between the two masks.
+    """
+
+    def __init__(self):
+        self._staticKey = None
+        self._staticBlocked = 0
+        self._occupiedCells: frozenset = None
+        self._blocked = 0
+
+    @staticmethod
+    @lru_cache(maxsize=LINE_MASKS_CACHE_SIZE)
+    def lineMask(src: int, dst: int) -> int:
+        """Bitset of the cells between src and dst that must not block the view, dst excluded"""
+        mask = 0
+        for mp in MapTools.getMpLine(src, dst)[:-1]:
+            cellId = mp.cellId
+            if cellId is None or not 0 <= cellId < CELLS_COUNT:
+                mask |= OUT_OF_MAP_BIT
+            else:
+                mask |= 1 << cellId
+        return mask
+
+    @staticmethod
+    def _blockedMask(cells: Iterable[int], allowThroughEntity: bool) -> int:
+        mask = 0
+        for cellId in cells:
+            p = MapPoint.fromCellId(cellId)
+            if not DataMapProvider().pointLos(p.x, p.y, allowThroughEntity):
+                mask |= 1 << cellId
+        return mask
+
+    @staticmethod
+    def mapKey() -> Tuple:
+        """Current map id with the cells the fight changed in the DataMapProvider (walls, portals...)"""
+        dataMap = MapDisplayManager().dataMap
+        updatedCells = DataMapProvider()._updatedCell
+        return (dataMap.id if dataMap else None, frozenset(updatedCells.items()) if updatedCells else None)
+
+    @staticmethod
+    def occupiedCells() -> frozenset:
+        """Cells of the fighters on the map"""
+        if not Kernel().fightEntitiesFrame:
+            return frozenset()
+        return frozenset(
+            entity.disposition.cellId
+            for entity in Kernel().fightEntitiesFrame.entities.values()
+            if entity.disposition and entity.disposition.cellId != -1
+        )
+
+    def refresh(self) -> int:
+        """Bring the blocked cells up to date with the current map and fighters positions and return them"""
+        staticKey = self.mapKey()
+        if staticKey != self._staticKey:
+            self._staticKey = staticKey
+            self._staticBlocked = OUT_OF_MAP_BIT
+            if MapDisplayManager().dataMap:
+                self._staticBlocked |= self._blockedMask(range(CELLS_COUNT), True)
+            self._occupiedCells = None
+
+        occupiedCells = self.occupiedCells()
+        if occupiedCells != self._occupiedCells:
+            self._occupiedCells = occupiedCells
+            self._blocked = self._staticBlocked | self._blockedMask(occupiedCells, False)
+        return self._blocked
+
+    def hasLos(self, src: int, dst: int) -> bool:
+        """LOS as of the last refresh"""
+        return not (self.lineMask(src, dst) & self._blocked)
+
+    def visibleCells(self, src: int, cells: Iterable[int]) -> List[int]:
+        """Cells among `cells` that src can see, as of the last refresh"""
+        blocked = self._blocked
+        return [cellId for cellId in cells if not (self.lineMask(src, cellId) & blocked)]
@@ -1,5 +1,8 @@
 from typing import Callable, List, Optional
 from pyd2bot.logic.fight.behaviors.FightStateManager import FightStateManager
+from pyd2bot.logic.fight.behaviors.fight_turn.FightView import LiveFightView
+from pyd2bot.logic.fight.behaviors.fight_turn.TurnPlanner import PlannedCast, TurnPlan, TurnPlanner
+from pyd2bot.logic.fight.replay.FightRecorder import FightRecorder
 from pyd2bot.logic.fight.behaviors.fight_turn.TurnResult import TurnResult
 from pyd2bot.logic.fight.behaviors.fight_turn.fight_turn_errors_handling import handle_move_result, handle_spell_result
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
@@ -78,8 +81,16 @@ class FightPlayTurn(AbstractBehavior):
 
         # Prepare fight state if not already done
         self.state_manager.prepare_turn_state()
+        if self.state_manager.session.recordFights:
+            FightRecorder().recordTurn(self.state_manager, self._target_filters())
         self.main()
 
+    def _target_filters(self) -> List[tuple]:
+        """(target_sums, target_boneId) filters to try in order"""
+        if not self.state_manager.session.isTreasureHuntSession or CollectAllMapResources().isRunning():
+            return [(False, None), (True, None)]
+        return [(True, 2672), (True, 91)]
+
     # === Main Turn Logic ===
     def main(self) -> None:
         """Core turn execution logic"""
@@ -91,11 +102,16 @@ class FightPlayTurn(AbstractBehavior):
             Logger().debug("All enemies are dead, fight will end")
             return self._end_turn()
 
-        if not self.state_manager.session.isTreasureHuntSession or CollectAllMapResources().isRunning():
-            filters = [(False, None), (True, None)]
-        else:
-            filters = [(True, 2672), (True, 91)]
+        filters = self._target_filters()
 
+        # Plan the whole turn (move then every cast the AP allows) from the current state
+        plan = TurnPlanner(LiveFightView(self.state_manager), self._forbidden_cells, filters).plan()
+        if plan:
+            self._queue_plan(plan)
+            self.next_action()
+            return
+
+        # No cell to hit from, fall back to a single decision that gets closer to the targets
         # Try primary spell
         if self._can_cast_spell(self.state_manager.primary_spellw):
             if self._try_cast_spell(self.state_manager.primary_spellw, filters):
@@ -129,6 +145,7 @@ class FightPlayTurn(AbstractBehavior):
                 self.state_manager.fighter_infos,
                 self._forbidden_cells,
                 self.state_manager.movement_points,
+                self.state_manager.action_points,
             )
 
             if path is not None:
@@ -167,6 +184,30 @@ class FightPlayTurn(AbstractBehavior):
         # This means we've used movement points but still can't reach
         self.add_action(lambda: self._end_turn())
 
+    def _queue_plan(self, plan: TurnPlan) -> None:
+        """Queue the move and all the casts of a turn plan"""
+        if len(plan.path) > 1:
+            self.add_action(lambda: self.fight_move(plan.path, lambda *args: handle_move_result(self, *args)))
+        for cast in plan.casts:
+            self.add_action(lambda cast=cast: self._cast_planned(cast))
+
+    def _cast_planned(self, cast: PlannedCast) -> None:
+        """Cast a planned spell, or plan again if the fight changed since the plan was made"""
+        target_infos = Kernel().fightEntitiesFrame.getEntityInfos(cast.target.entityId)
+        if (
+            cast.target.entityId in Kernel().battleFrame.deadFightersList
+            or not target_infos
+            or target_infos.disposition.cellId != cast.cellId
+            or not can_cast_spell_on_cell(cast.spellw, cast.cellId)[0]
+        ):
+            self._action_queue.clear()
+            if self._current_retry_count >= 3:
+                return self._end_turn(TurnResult.CANNOT_CAST, f"Planned cast on {cast.cellId} is no longer possible")
+            Logger().info(f"Planned cast on {cast.cellId} is no longer possible, planning again")
+            self._current_retry_count += 1
+            return self.main()
+        self.cast_spell(cast.spellw, cast.cellId, lambda *args: handle_spell_result(self, *args))
+
     def next_action(self, event=None) -> None:
         """Execute next queued action"""
         if Kernel().battleFrame.is_sequence_executing():
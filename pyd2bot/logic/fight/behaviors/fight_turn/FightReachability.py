@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING, Dict, FrozenSet, Tuple
+
+from pyd2bot.logic.fight.behaviors.fight_turn.FightLosMap import FightLosMap
+from pydofus2.com.ankamagames.dofus.logic.game.fight.miscs.FightReachableCellsMaker import FightReachableCellsMaker
+from pydofus2.com.ankamagames.jerakine.metaclass.Singleton import Singleton
+
+if TYPE_CHECKING:
+    from pydofus2.com.ankamagames.dofus.network.types.game.context.fight.GameFightFighterInformations import (
+        GameFightFighterInformations,
+    )
+
+
+class FightReachability(metaclass=Singleton):
+    """
+    Cells a fighter can walk to, flood filled once per (fighter, cell, MP) and shared by every search of the turn.
+
+    Results stay valid as long as no fighter changes cell on the map, the cache is dropped as soon as the
+    occupied cells or the cells the fight updated differ from the ones it was filled with.
+    """
+
+    def __init__(self):
+        self._mapKey = None
+        self._occupiedCells: FrozenSet[int] = None
+        self._cache: Dict[Tuple[float, int, int], FrozenSet[int]] = {}
+
+    def reachableCells(self, fighter_infos: "GameFightFighterInformations", cellId: int, mp: int) -> FrozenSet[int]:
+        mapKey = FightLosMap.mapKey()
+        occupiedCells = FightLosMap.occupiedCells()
+        if mapKey != self._mapKey or occupiedCells != self._occupiedCells:
+            self._mapKey = mapKey
+            self._occupiedCells = occupiedCells
+            self._cache.clear()
+
+        key = (fighter_infos.contextualId, cellId, mp)
+        cells = self._cache.get(key)
+        if cells is None:
+            cells = frozenset()
+            if mp > 0:
+                cells = frozenset(FightReachableCellsMaker(fighter_infos, cellId, mp).reachableCells)
+            self._cache[key] = cells
+        return cells
@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from pyd2bot.logic.fight.behaviors.fight_turn.fight_algo_utils import (
+    Target,
+    find_cells_with_los_to_targets,
+    get_targetable_entities,
+)
+from pyd2bot.logic.fight.behaviors.fight_turn.FightReachability import FightReachability
+from pyd2bot.logic.fight.behaviors.fight_turn.spell_utils import can_cast_spell_on_cell
+from pydofus2.com.ankamagames.dofus.logic.game.fight.managers.CurrentPlayedFighterManager import \
+    CurrentPlayedFighterManager
+
+if TYPE_CHECKING:
+    from pyd2bot.logic.fight.behaviors.FightStateManager import FightStateManager
+    from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
+
+
+class FightView:
+    """
+    What the turn planner reads of a fight. The live view queries the game, recorded fights are replayed offline
+    through another implementation of the same methods.
+    """
+
+    @property
+    def fighter_cell(self) -> Optional[int]:
+        raise NotImplementedError()
+
+    @property
+    def movement_points(self) -> int:
+        raise NotImplementedError()
+
+    @property
+    def action_points(self) -> int:
+        raise NotImplementedError()
+
+    def spells(self) -> Tuple[Optional["SpellWrapper"], Optional["SpellWrapper"]]:
+        """Primary and secondary spells of the fighter"""
+        raise NotImplementedError()
+
+    def can_cast(self, spellw: "SpellWrapper") -> bool:
+        raise NotImplementedError()
+
+    def casts_this_turn(self, spellw: "SpellWrapper") -> int:
+        raise NotImplementedError()
+
+    def casts_on_target(self, spellw: "SpellWrapper", entityId: float) -> int:
+        """Casts of the spell on the entity, as counted against the spell max casts per target"""
+        raise NotImplementedError()
+
+    def targets(self, spellw: "SpellWrapper", target_sums=False, target_boneId=None) -> List[Target]:
+        raise NotImplementedError()
+
+    def casting_cells(self, spellw: "SpellWrapper", targets: List[Target]) -> Dict[int, List[Target]]:
+        """cell -> targets the spell can hit from it"""
+        raise NotImplementedError()
+
+    def reachable_cells(self) -> Set[int]:
+        raise NotImplementedError()
+
+    def tackle_at(self, cellId: int) -> float:
+        """Tackle factor of the fighter leaving the cell"""
+        raise NotImplementedError()
+
+
+class LiveFightView(FightView):
+    def __init__(self, state_manager: "FightStateManager"):
+        self.state = state_manager
+
+    @property
+    def fighter_cell(self) -> Optional[int]:
+        fighter_pos = self.state.fighter_pos
+        if not fighter_pos or not self.state.fighter_infos:
+            return None
+        return fighter_pos.cellId
+
+    @property
+    def movement_points(self) -> int:
+        return self.state.movement_points
+
+    @property
+    def action_points(self) -> int:
+        return self.state.action_points
+
+    def spells(self) -> Tuple[Optional["SpellWrapper"], Optional["SpellWrapper"]]:
+        return self.state.primary_spellw, self.state.secondary_spellw
+
+    def can_cast(self, spellw: "SpellWrapper") -> bool:
+        return can_cast_spell_on_cell(spellw)[0]
+
+    @staticmethod
+    def _spell_manager(spellw: "SpellWrapper"):
+        spell_cast_manager = CurrentPlayedFighterManager().getSpellCastManager()
+        return spell_cast_manager.getSpellManagerBySpellId(spellw.spellId) if spell_cast_manager else None
+
+    def casts_this_turn(self, spellw: "SpellWrapper") -> int:
+        spell_manager = self._spell_manager(spellw)
+        return spell_manager.numberCastThisTurn if spell_manager else 0
+
+    def casts_on_target(self, spellw: "SpellWrapper", entityId: float) -> int:
+        spell_manager = self._spell_manager(spellw)
+        return spell_manager.getCastOnEntity(entityId) if spell_manager else 0
+
+    def targets(self, spellw: "SpellWrapper", target_sums=False, target_boneId=None) -> List[Target]:
+        return get_targetable_entities(spellw, self.state.fighter_infos, target_sums, target_boneId)
+
+    def casting_cells(self, spellw: "SpellWrapper", targets: List[Target]) -> Dict[int, List[Target]]:
+        _, has_los = find_cells_with_los_to_targets(spellw, targets, -1)
+        return has_los
+
+    def reachable_cells(self) -> Set[int]:
+        return FightReachability().reachableCells(self.state.fighter_infos, self.fighter_cell, self.movement_points)
+
+    def tackle_at(self, cellId: int) -> float:
+        return self.state.get_turn_snapshot(self.state.fighter_infos).tackleAt(cellId)
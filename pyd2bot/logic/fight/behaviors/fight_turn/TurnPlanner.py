@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from pyd2bot.logic.fight.behaviors.fight_turn.fight_algo_utils import Target, find_tackle_aware_paths
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+
+if TYPE_CHECKING:
+    from pyd2bot.logic.fight.behaviors.fight_turn.FightView import FightView
+    from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
+
+
+@dataclass
+class PlannedCast:
+    spellw: "SpellWrapper"
+    target: Target
+
+    @property
+    def cellId(self) -> int:
+        return self.target.pos.cellId
+
+
+@dataclass
+class TurnPlan:
+    """A move (possibly empty) followed by the casts done from the cell it ends on"""
+    path: List[int]
+    casts: List[PlannedCast] = field(default_factory=list)
+    apLeft: int = 0
+    score: float = 0
+
+    def __str__(self) -> str:
+        casts = ", ".join(f"{c.spellw.spellId}->{c.cellId}" for c in self.casts)
+        return f"TurnPlan(path={self.path}, casts=[{casts}], apLeft={self.apLeft}, score={self.score:.2f})"
+
+
+class TurnPlanner:
+    """
+    Plans a whole turn from the fight state: where to move within the MP and tackle limits, then how many casts
+    of the primary spell, and of the secondary with the AP left, can be done from there.
+
+    Every reachable cell that sees a target is a candidate, the plan maximizing the casts (primary ones weighing
+    more) for the fewest MP wins. Filters are tried in order, the first one giving a plan that hits is used.
+    """
+
+    PRIMARY_CAST_WEIGHT = 10
+    SECONDARY_CAST_WEIGHT = 4
+    MP_COST = 0.1
+
+    def __init__(self, view: "FightView", forbidden_cells: Iterable[int], filters: List[tuple]):
+        self.view = view
+        self.forbidden_cells = set(forbidden_cells)
+        self.filters = filters
+        # (spell id, entity id or None for the turn limit) -> casts left, read once per plan
+        self._casts_left_cache = dict[Tuple[int, Optional[float]], float]()
+
+    def plan(self) -> Optional[TurnPlan]:
+        primary, secondary = self.view.spells()
+        spells = [
+            (spellw, weight)
+            for spellw, weight in [(primary, self.PRIMARY_CAST_WEIGHT), (secondary, self.SECONDARY_CAST_WEIGHT)]
+            if spellw and self.view.can_cast(spellw)
+        ]
+        if not spells:
+            return None
+
+        start_cell = self.view.fighter_cell
+        if start_cell is None:
+            return None
+        # Paths are searched with the tackle paid at each step, a path around a tackler may save MP or AP
+        paths = find_tackle_aware_paths(
+            start_cell,
+            self.view.movement_points,
+            self.view.action_points,
+            self.view.reachable_cells(),
+            self.forbidden_cells,
+            self.view.tackle_at,
+        )
+
+        for target_filter in self.filters:
+            # Casting cells of each spell, cell -> targets seen from it
+            casting_cells = []
+            for spellw, weight in spells:
+                targets = self.view.targets(spellw, *target_filter)
+                if not targets:
+                    continue
+                casting_cells.append((spellw, weight, self.view.casting_cells(spellw, targets)))
+
+            best: Optional[TurnPlan] = None
+            for cellId in set().union(*(has_los for _, _, has_los in casting_cells)):
+                for tackled in paths.get(cellId, []):
+                    plan = TurnPlan(tackled.path if tackled.mpUsed else [], apLeft=tackled.apLeft)
+                    for spellw, weight, has_los in casting_cells:
+                        casts = self._casts_from_cell(spellw, has_los.get(cellId, []), plan.apLeft, cellId)
+                        plan.casts.extend(casts)
+                        plan.apLeft -= len(casts) * spellw["apCost"]
+                        plan.score += weight * len(casts)
+                    if not plan.casts:
+                        continue
+                    plan.score -= self.MP_COST * tackled.mpUsed
+                    if best is None or plan.score > best.score:
+                        best = plan
+
+            if best:
+                Logger().info(f"Planned turn: {best}")
+                return best
+        return None
+
+    def _casts_left(self, spellw: "SpellWrapper", entityId: Optional[float] = None) -> float:
+        """Casts of the spell the turn limit, or the target limit when an entity is given, still allows"""
+        key = (spellw.spellId, entityId)
+        if key not in self._casts_left_cache:
+            if entityId is None:
+                limit, done = spellw["maxCastPerTurn"], lambda: self.view.casts_this_turn(spellw)
+            else:
+                limit, done = spellw["maxCastPerTarget"], lambda: self.view.casts_on_target(spellw, entityId)
+            self._casts_left_cache[key] = max(0, limit - done()) if limit else float("inf")
+        return self._casts_left_cache[key]
+
+    def _casts_from_cell(self, spellw: "SpellWrapper", targets: List[Target], ap: int, cellId: int) -> List[PlannedCast]:
+        """
+        Casts of the spell on the targets seen from a cell, within the AP and what the spell cast limits leave
+        after the casts already done this turn
+        """
+        ap_cost = spellw["apCost"]
+        if not targets or not ap_cost or ap < ap_cost:
+            return []
+        casts_count = int(min(ap // ap_cost, self._casts_left(spellw)))
+        left = {t.entityId: self._casts_left(spellw, t.entityId) for t in targets}
+        # Spread the casts over the targets, nearest to the casting cell first
+        targets = sorted(targets, key=lambda t: t.pos.distanceToCellId(cellId))
+        casts = []
+        while len(casts) < casts_count:
+            spread = [t for t in targets if left[t.entityId] > 0][: casts_count - len(casts)]
+            if not spread:
+                break
+            for target in spread:
+                left[target.entityId] -= 1
+                casts.append(PlannedCast(spellw, target))
+        return casts
@@ -1,22 +1,18 @@
-from queue import PriorityQueue
+from dataclasses import dataclass
 
-from prettytable import PrettyTable
-from pyd2bot.logic.fight.behaviors.fight_turn.spell_utils import getSpellZone
-from pydofus2.com.ankamagames.atouin.utils.DataMapProvider import DataMapProvider
-from pydofus2.com.ankamagames.dofus.datacenter.monsters.Monster import Monster
+import numpy as np
+from pyd2bot.logic.fight.behaviors.FightStateManager import FightStateManager
+from pyd2bot.logic.fight.behaviors.fight_turn import fight_geometry
+from pyd2bot.logic.fight.behaviors.fight_turn.FightLosMap import FightLosMap
+from pyd2bot.logic.fight.behaviors.fight_turn.FightReachability import FightReachability
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
-from pydofus2.com.ankamagames.dofus.logic.common.managers.StatsManager import StatsManager
-from pydofus2.com.ankamagames.dofus.logic.game.fight.managers.CurrentPlayedFighterManager import CurrentPlayedFighterManager
-from pydofus2.com.ankamagames.dofus.logic.game.fight.managers.FightersStateManager import FightersStateManager
-from pydofus2.com.ankamagames.dofus.logic.game.fight.miscs.FightReachableCellsMaker import FightReachableCellsMaker
 from pydofus2.com.ankamagames.dofus.logic.game.fight.miscs.TackleUtil import TackleUtil
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
-from typing import TYPE_CHECKING, Tuple
+from typing import TYPE_CHECKING, Callable, Iterable, Tuple
 from pydofus2.com.ankamagames.dofus.network.types.game.context.fight.GameFightMonsterInformations import (
         GameFightMonsterInformations,
     )
-from pydofus2.mapTools import MapTools
 
 if TYPE_CHECKING:
     
@@ -50,43 +46,31 @@ def find_cells_with_los_to_targets(spellw: "SpellWrapper", targets: list["Target
     Logger().debug(f"findCellsWithLosToTargets for spell {spellw.spell.name}, with fighter cell {fighterCell}")
 
     hasLosToTargets = dict[int, list["Target"]]()
-    spellZone = getSpellZone(spellw)
     maxRangeFromFighter = 0
 
     Logger().debug(f"Target positions: {[f'Target(cell={t.pos.cellId}, dist={t.distFromPlayer})' for t in targets]}")
 
-    for target in targets:
-        currSpellZone = spellZone.getCells(target.pos.cellId)
+    # Zone cells of every target at once, one row per target
+    zones = fight_geometry.spell_zone_mask(spellw, [target.pos.cellId for target in targets])
 
-        for cell in currSpellZone:
-            p = MapPoint.fromCellId(cell)
-            
-            # Get line between target and potential casting cell
-            line = MapTools.getMpLine(target.pos.cellId, p.cellId)
-
-            los = True
-            if len(line) > 1:
-                for mp in line[:-1]:
-                    has_los = DataMapProvider().pointLos(mp.x, mp.y, False)
-                    if not has_los:
-                        los = False
-                        break
-            else:
-                pass
-
-            if los:
-                # Special case - we can cast from current position
-                if fighterCell == p.cellId:
-                    Logger().debug("=> Can cast from current position - returning immediately")
-                    return 0, {fighterCell: [target]}
-
-                # Record this casting position
-                if p.cellId not in hasLosToTargets:
-                    hasLosToTargets[p.cellId] = list[Target]()
-                hasLosToTargets[p.cellId].append(target)
-
-                # Update max range
-                maxRangeFromFighter = max(maxRangeFromFighter, target.distFromPlayer)
+    losMap = FightLosMap()
+    losMap.refresh()
+
+    for target, zone in zip(targets, zones):
+        # Cells of the spell zone that have a line of sight with the target
+        for cellId in losMap.visibleCells(target.pos.cellId, np.flatnonzero(zone).tolist()):
+            # Special case - we can cast from current position
+            if fighterCell == cellId:
+                Logger().debug("=> Can cast from current position - returning immediately")
+                return 0, {fighterCell: [target]}
+
+            # Record this casting position
+            if cellId not in hasLosToTargets:
+                hasLosToTargets[cellId] = list[Target]()
+            hasLosToTargets[cellId].append(target)
+
+            # Update max range
+            maxRangeFromFighter = max(maxRangeFromFighter, target.distFromPlayer)
 
 
     # Final summary
@@ -105,67 +89,116 @@ def find_path_to_target(
     fighter_infos: "GameFightFighterInformations",
     forbidden_cells: list[int],
     movement_points: int,
+    action_points: int,
 ) -> Tuple[Target, list[int]]:
+    """Cheapest path, tackle included, to a cell the spell can hit a target from with the AP left.
+
+    When no such cell is reachable this turn, returns no target and the path getting closest to the casting cells.
+    """
     if not targets:
         return None, None
 
-    maxRangeFromFighter, hasLosToTargets = find_cells_with_los_to_targets(spellw, targets, fighter_pos.cellId)
+    _, hasLosToTargets = find_cells_with_los_to_targets(spellw, targets, fighter_pos.cellId)
     if not hasLosToTargets:
         return None, None
     if fighter_pos.cellId in hasLosToTargets:
         return hasLosToTargets[fighter_pos.cellId][0], []
     if movement_points <= 0:
         return None, None
-    reachableCells = set(FightReachableCellsMaker(fighter_infos, fighter_pos.cellId, maxRangeFromFighter).reachableCells)
-    queue = PriorityQueue[Tuple[int, int, int]]()
-    queue.put((0, 0, fighter_pos.cellId))
-    visited = set()
-    parentOfCell = {}
+    reachableCells = FightReachability().reachableCells(fighter_infos, fighter_pos.cellId, movement_points)
+    snapshot = FightStateManager().get_turn_snapshot(fighter_infos)
+    paths = find_tackle_aware_paths(
+        fighter_pos.cellId, movement_points, action_points, reachableCells, forbidden_cells, snapshot.tackleAt
+    )
+
+    best = None
+    for cellId in hasLosToTargets.keys() & paths.keys():
+        for tackled in paths[cellId]:
+            if tackled.apLeft < spellw["apCost"]:
+                continue
+            if best is None or (tackled.mpUsed, -tackled.apLeft) < (best[1].mpUsed, -best[1].apLeft):
+                best = (cellId, tackled)
+    if best:
+        cellId, tackled = best
+        return hasLosToTargets[cellId][0], tackled.path
+
+    # Get as close as the tackle allows to the casting cells, mean distance to them as the heuristic
+    distanceToLosCells = fight_geometry.mean_distance_to(list(hasLosToTargets))
     bestAlternative = None
     BestAlternativeCost = float("inf")
-    while not queue.empty():
-        _, usedPms, currCellId = queue.get()
-        if currCellId in visited:
+    for cellId, tackledPaths in paths.items():
+        if cellId == fighter_pos.cellId:
             continue
-        visited.add(currCellId)
-        currPoint = MapPoint.fromCellId(currCellId)
-        for nextMapPoint in currPoint.vicinity():
-            nextCellId = nextMapPoint.cellId
-            if nextCellId not in forbidden_cells and nextCellId not in visited and nextCellId in reachableCells:
-                parentOfCell[nextCellId] = currCellId
-                if nextCellId in hasLosToTargets:
-                    path = buildPath(parentOfCell, nextCellId)
-                    return hasLosToTargets[nextCellId][0], path
-                heuristic = (
-                    usedPms
-                    + 1
-                    + 10
-                    * sum([MapTools.getDistance(nextCellId, cellId) for cellId in hasLosToTargets])
-                    / len(hasLosToTargets)
-                )
-                if heuristic < BestAlternativeCost:
-                    bestAlternative = nextCellId
-                    BestAlternativeCost = heuristic
-                queue.put((heuristic, usedPms + 1, nextCellId))
+        for tackled in tackledPaths:
+            cost = tackled.mpUsed + 10 * float(distanceToLosCells[cellId])
+            if cost < BestAlternativeCost:
+                bestAlternative = tackled
+                BestAlternativeCost = cost
     if bestAlternative is not None:
-        path = buildPath(parentOfCell, bestAlternative)
-        return None, path
+        return None, bestAlternative.path
     return None, None
 
-def buildPath(parentOfCell: dict[int, int], endCellId):
-    path = [endCellId]
-    currCellId = endCellId
-    while True:
-        currCellId = parentOfCell.get(currCellId)
-        if currCellId is None:
-            break
-        path.append(currCellId)
-    path.reverse()
-    return path
+
+@dataclass
+class TackledPath:
+    path: list[int]
+    mpUsed: int
+    apLeft: int
+
+
+def find_tackle_aware_paths(
+    start_cell: int,
+    total_mp: int,
+    total_ap: int,
+    reachable: set[int],
+    forbidden_cells: Iterable[int],
+    tackle_at: Callable[[int], float],
+) -> dict[int, list[TackledPath]]:
+    """Ways to reach every cell with the MP left once the tackle of the cells walked out of is paid.
+
+    Steps follow the simulate_tackle rules: leaving a cell loses MP and AP in proportion to the tackle on it,
+    and a step is only possible within the MP left. Every path returned can be walked whole.
+    Several paths are kept per cell when one loses less MP and another keeps more AP, fewest steps first.
+    """
+    forbidden_cells = set(forbidden_cells)
+    # (cellId, steps, mpLost, apLeft, parent label)
+    root = (start_cell, 0, 0, total_ap, None)
+    labels = {start_cell: [root]}
+    frontier = [root]
+    while frontier:
+        nextFrontier = []
+        for label in frontier:
+            cellId, steps, mpLost, apLeft, _ = label
+            tackle = tackle_at(cellId)
+            newMpLost = mpLost + max(0, int((total_mp - steps) * (1 - tackle) + 0.5))
+            if steps >= total_mp - newMpLost:
+                continue
+            newApLeft = apLeft - max(0, int(apLeft * (1 - tackle) + 0.5))
+            for neighbour in MapPoint.fromCellId(cellId).vicinity():
+                nextCellId = neighbour.cellId
+                if nextCellId in forbidden_cells or nextCellId not in reachable:
+                    continue
+                cellLabels = labels.setdefault(nextCellId, [])
+                if any(other[2] <= newMpLost and other[3] >= newApLeft for other in cellLabels):
+                    continue
+                newLabel = (nextCellId, steps + 1, newMpLost, newApLeft, label)
+                cellLabels.append(newLabel)
+                nextFrontier.append(newLabel)
+        frontier = nextFrontier
+
+    paths = dict[int, list[TackledPath]]()
+    for cellId, cellLabels in labels.items():
+        for label in cellLabels:
+            path = []
+            node = label
+            while node:
+                path.append(node[0])
+                node = node[4]
+            path.reverse()
+            paths.setdefault(cellId, []).append(TackledPath(path, label[1], label[3]))
+    return paths
 
 def get_targetable_entities(spellw: "SpellWrapper", fighter_infos: "GameFightFighterInformations", target_sums=False, target_boneId=None) -> list[Target]:
-    result = list[Target]()
-    infosTable = list[dict]()
     if not Kernel().fightEntitiesFrame or not Kernel().battleFrame:
         Logger().error("EntitiesFrame or BattleFrame is not found")
         return []
@@ -174,56 +207,58 @@ def get_targetable_entities(spellw: "SpellWrapper", fighter_infos: "GameFightFig
             f"Fighter not found in entities frame!"
         )
         return []
-    for entity in Kernel().fightEntitiesFrame.entities.values():
-        if entity.contextualId < 0:
-            monster = entity
+    snapshot = FightStateManager().get_turn_snapshot(fighter_infos)
+    return [
+        Target(entity.infos, fighter_infos.disposition.cellId)
+        for entity in snapshot.enemies(spellw, target_sums, target_boneId)
+    ]
+
+def simulate_tackle(
+    path: list[int],
+    fighter_infos: "GameFightFighterInformations",
+    total_mp: int,
+    total_ap: int,
+    tackle_at: Callable[[int], float] = None,
+) -> tuple[list[int], int, int]:
+    """Walk a path applying the tackle losses of every step.
+
+    Args:
+        tackle_at: tackle factor of the fighter on a cell, TackleUtil on the live fight by default
+
+    Returns:
+        Tuple of (usable path, movement points used, action points left after the move)
+    """
+    mpCount = 0
+    mpLost = 0
+    apLost = 0
+    actionPoints = total_ap
+    if len(path) <= 1:
+        return path[:], 0, total_ap
+
+    lastCellId = path[0]
+    for cellId in path[1:]:
+        if tackle_at:
+            tackle = tackle_at(lastCellId)
+        else:
+            tackle = TackleUtil.getTackle(fighter_infos, MapPoint.fromCellId(lastCellId))
+        mpLost += int((total_mp - mpCount) * (1 - tackle) + 0.5)
+        apLost += int(actionPoints * (1 - tackle) + 0.5)
+        
+        if apLost < 0:
+            apLost = 0
+        if mpLost < 0:
+            mpLost = 0
             
-            canCast, reason = CurrentPlayedFighterManager().canCastThisSpell(spellw.spellId, spellw.spellLevel, entity.contextualId)
-            stats = StatsManager().getStats(entity.contextualId)
-            hp = stats.getHealthPoints()
-            stats.getMaxHealthPoints()
-            is_monster = isinstance(entity, GameFightMonsterInformations)
-            name = "unknown"
-            level = "unknown"
-            if isinstance(entity, GameFightMonsterInformations):
-                monster = Monster.getMonsterById(entity.creatureGenericId)
-                name = monster.name
-                level = entity.creatureLevel
-            status = FightersStateManager().getStatus(fighter_infos.contextualId)
-            entry = {
-                "name": name,
-                "level": level,
-                "teamId": entity.spawnInfo.teamId,
-                "dead": entity.contextualId in Kernel().battleFrame.deadFightersList,
-                "hidden": entity.contextualId in Kernel().fightContextFrame.hiddenEntities,
-                "summoned": entity.stats.summoned,
-                "canhit": canCast,
-                "cell": entity.disposition.cellId,
-                "id": entity.contextualId,
-                "reason": reason,
-                "hitpoints": hp,
-                "isMonster": is_monster,
-                "state": status.getActiveStatuses(),
-                "boneId": entity.look.bonesId,
-            }
-            infosTable.append(entry)
-            if (
-                entry["teamId"] != fighter_infos.spawnInfo.teamId
-                and not entry["dead"]
-                and not entry["hidden"]
-                and (target_sums or not entry["summoned"])
-                and entry["canhit"]
-                and entry["cell"] != -1
-                and (target_boneId is None or entity.look.bonesId == target_boneId)
-            ):
-                result.append(Target(entity, fighter_infos.disposition.cellId))
-    summaryTable = PrettyTable(
-        ["name", "id", "boneId", "level", "hitpoints", "hidden", "summoned", "state", "canhit", "reason"]
-    )
-    for e in infosTable:
-        summaryTable.add_row([e[k] for k in summaryTable.field_names])
-    Logger().info("\n" + str(summaryTable))
-    return result
+        movementPoints = total_mp - mpLost
+        actionPoints = total_ap - apLost
+        
+        if mpCount < movementPoints:
+            mpCount += 1
+        else:
+            break
+        lastCellId = cellId
+
+    return path[: mpCount + 1], mpCount, actionPoints
 
 def analyze_tackle_path(
     path: list[int], 
@@ -249,36 +284,9 @@ def analyze_tackle_path(
         - usable_path (list[int]): Path truncated to what's actually usable
         - movement_points_used (int): Number of MP actually used in movement
     """
-    mpCount = 0
-    mpLost = 0
-    apLost = 0
-    movementPoints = total_mp
-    actionPoints = total_ap
-    canHitTarget = target is not None
-    usable_path = []
-    
-    if len(path) > 1:
-        lastCellId = path[0]
-        for cellId in path[1:]:
-            tackle = TackleUtil.getTackle(fighter_infos, MapPoint.fromCellId(lastCellId))
-            mpLost += int((total_mp - mpCount) * (1 - tackle) + 0.5)
-            apLost += int(actionPoints * (1 - tackle) + 0.5)
-            
-            if apLost < 0:
-                apLost = 0
-            if mpLost < 0:
-                mpLost = 0
-                
-            movementPoints = total_mp - mpLost
-            actionPoints = total_ap - apLost
-            
-            if mpCount < movementPoints:
-                mpCount += 1
-            else:
-                break
-            lastCellId = cellId
-            
-        canHitTarget = target and actionPoints >= spell_ap_cost and mpCount >= len(path) - 1
-        usable_path = path[: mpCount + 1]
-        
-    return canHitTarget, usable_path, mpCount
\ No newline at end of file
+    if len(path) <= 1:
+        return target is not None, [], 0
+
+    usable_path, mpCount, actionPoints = simulate_tackle(path, fighter_infos, total_mp, total_ap)
+    canHitTarget = target and actionPoints >= spell_ap_cost and mpCount >= len(path) - 1
+    return canHitTarget, usable_path, mpCount
@@ -0,0 +1,83 @@
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterable, List, Tuple
+
+import numpy as np
+
+from pyd2bot.logic.fight.behaviors.fight_turn.spell_utils import ZoneKind, getSpellZoneParams
+from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import MapDisplayManager
+from pydofus2.com.ankamagames.atouin.utils.DataMapProvider import DataMapProvider
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+
+if TYPE_CHECKING:
+    from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
+
+CELLS_COUNT = 560
+
+
+@lru_cache(maxsize=1)
+def cell_coords() -> Tuple[np.ndarray, np.ndarray]:
+    """x and y map coordinates of every cell id"""
+    points = [MapPoint.fromCellId(cellId) for cellId in range(CELLS_COUNT)]
+    return np.array([p.x for p in points], dtype=np.int16), np.array([p.y for p in points], dtype=np.int16)
+
+
+@lru_cache(maxsize=1)
+def cell_offsets() -> Tuple[np.ndarray, np.ndarray]:
+    """dx[src, dst] and dy[src, dst] between every pair of cells"""
+    x, y = cell_coords()
+    return x[None, :] - x[:, None], y[None, :] - y[:, None]
+
+
+@lru_cache(maxsize=1)
+def distance_matrix() -> np.ndarray:
+    """Manhattan distance between every pair of cells, same as MapTools.getDistance"""
+    dx, dy = cell_offsets()
+    return np.abs(dx) + np.abs(dy)
+
+
+_movable_cache: dict = {}
+
+
+def movable_mask() -> np.ndarray:
+    """Cells of the current map a zone can contain, as filtered by the zones getCells"""
+    dataMap = MapDisplayManager().dataMap
+    mapId = dataMap.id if dataMap else None
+    mask = _movable_cache.get(mapId)
+    if mask is None:
+        x, y = cell_coords()
+        mask = np.array([bool(DataMapProvider().pointMov(int(x[c]), int(y[c]))) for c in range(CELLS_COUNT)])
+        _movable_cache.clear()
+        _movable_cache[mapId] = mask
+    return mask
+
+
+def zone_mask(kind: int, min_range: int, max_range: int, centers: Iterable[int], movable: np.ndarray = None) -> np.ndarray:
+    """Bool matrix (centers x cells) of the cells in the zone of each center, `movable` defaults to the current map"""
+    if movable is None:
+        movable = movable_mask()
+    centers = np.asarray(list(centers), dtype=np.int64)
+    dx, dy = cell_offsets()
+    adx, ady = np.abs(dx[centers]), np.abs(dy[centers])
+    if kind == ZoneKind.LOZENGE:
+        radius = adx + ady
+        shape = np.ones_like(radius, dtype=bool)
+    else:
+        straight = (adx == 0) | (ady == 0)
+        diagonal = adx == ady
+        radius = np.maximum(adx, ady)
+        if kind == ZoneKind.CROSS:
+            shape = straight
+        elif kind == ZoneKind.DIAGONAL:
+            shape = diagonal
+        else:
+            shape = straight | diagonal
+    return shape & (radius >= min_range) & (radius <= max_range) & movable[None, :]
+
+
+def spell_zone_mask(spellw: "SpellWrapper", centers: Iterable[int]) -> np.ndarray:
+    return zone_mask(*getSpellZoneParams(spellw), centers)
+
+
+def mean_distance_to(cells: List[int]) -> np.ndarray:
+    """Mean distance of every cell to the given cells, indexed by cell id"""
+    return distance_matrix()[:, np.asarray(cells, dtype=np.int64)].mean(axis=1)
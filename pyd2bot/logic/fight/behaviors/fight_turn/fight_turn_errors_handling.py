@@ -8,6 +8,9 @@ if TYPE_CHECKING:
 
 def handle_move_result(behavior: "FightPlayTurn", error_code: int, error_msg: str, infos: Optional[Dict] = None) -> None:
     """Handle movement action results"""
+    # Positions changed, or may have
+    behavior.state_manager.invalidate_turn_snapshot()
+
     # Success
     if error_code == 0:
         behavior._current_retry_count = 0
@@ -56,6 +59,9 @@ def handle_move_result(behavior: "FightPlayTurn", error_code: int, error_msg: st
 
 def handle_spell_result(behavior: "FightPlayTurn", error_code: int, error_msg: str, infos: Optional[Dict] = None) -> None:
     """Handle spell casting action results"""
+    # HP, deaths and states may have changed
+    behavior.state_manager.invalidate_turn_snapshot()
+
     if error_code == 0:  # Success
         behavior.next_action()
         return
@@ -1,13 +1,14 @@
 from pydofus2.com.ankamagames.atouin.utils.DataMapProvider import DataMapProvider
 from typing import TYPE_CHECKING
 
+from pyd2bot.logic.fight.behaviors.fight_turn.FightLosMap import FightLosMap
+
 from pydofus2.com.ankamagames.dofus.datacenter.spells.Spell import Spell
 from pydofus2.com.ankamagames.dofus.logic.game.fight.managers.CurrentPlayedFighterManager import CurrentPlayedFighterManager
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 from pydofus2.com.ankamagames.jerakine.types.zones.Cross import Cross
 from pydofus2.com.ankamagames.jerakine.types.zones.Lozenge import Lozenge
 from pydofus2.com.ankamagames.jerakine.utils.display.spellZone.SpellShapeEnum import SpellShapeEnum
-from pydofus2.mapTools import MapTools
 from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
 
 if TYPE_CHECKING:
@@ -26,7 +27,14 @@ def getSpellShape(spellw: "SpellWrapper") -> int:
             return spellEffect.zoneShape
     return 0
 
-def getSpellZone(spellw: "SpellWrapper") -> "DisplayZone":
+class ZoneKind:
+    LOZENGE = 0
+    CROSS = 1
+    DIAGONAL = 2
+    CROSS_AND_DIAGONAL = 3
+
+def getSpellZoneParams(spellw: "SpellWrapper") -> tuple[int, int, int]:
+    """Returns the (zone kind, min range, range) of the cells the spell can be cast from around a target"""
     range = spellw["range"]
     minRange = spellw["minRange"]
     if range is None or minRange is None:
@@ -37,12 +45,24 @@ def getSpellZone(spellw: "SpellWrapper") -> "DisplayZone":
     castInLine = spellw["castInLine"] or (spellShape == SpellShapeEnum.l)
     if castInLine:
         if spellw["castInDiagonal"]:
-            return Cross(SpellShapeEnum.UNKNOWN, minRange, range, DataMapProvider(), False, True)
-        return Cross(SpellShapeEnum.UNKNOWN, minRange, range, DataMapProvider(), False)
+            return ZoneKind.CROSS_AND_DIAGONAL, minRange, range
+        return ZoneKind.CROSS, minRange, range
     elif spellw["castInDiagonal"]:
-        return Cross(SpellShapeEnum.UNKNOWN, minRange, range, DataMapProvider(), True)
+        return ZoneKind.DIAGONAL, minRange, range
     else:
-        return Lozenge(SpellShapeEnum.UNKNOWN, minRange, range, DataMapProvider())
+        return ZoneKind.LOZENGE, minRange, range
+
+def getSpellZone(spellw: "SpellWrapper", dataMapProvider=None) -> "DisplayZone":
+    kind, minRange, range = getSpellZoneParams(spellw)
+    if dataMapProvider is None:
+        dataMapProvider = DataMapProvider()
+    if kind == ZoneKind.CROSS_AND_DIAGONAL:
+        return Cross(SpellShapeEnum.UNKNOWN, minRange, range, dataMapProvider, False, True)
+    if kind == ZoneKind.CROSS:
+        return Cross(SpellShapeEnum.UNKNOWN, minRange, range, dataMapProvider, False)
+    if kind == ZoneKind.DIAGONAL:
+        return Cross(SpellShapeEnum.UNKNOWN, minRange, range, dataMapProvider, True)
+    return Lozenge(SpellShapeEnum.UNKNOWN, minRange, range, dataMapProvider)
 
 def check_line_of_sight(start_cell_id: int, end_cell_id: int) -> tuple[bool, str]:
     """Check if there is line of sight between two cells.
@@ -56,13 +76,10 @@ def check_line_of_sight(start_cell_id: int, end_cell_id: int) -> tuple[bool, str
         Tuple of (has_los, reason) where has_los is True if there is LOS,
         and reason explains why if there isn't
     """
-    line = MapTools.getMpLine(start_cell_id, end_cell_id)
-    if len(line) <= 1:
-        return True, ""
-        
-    for mp in line[:-1]:
-        if not DataMapProvider().pointLos(mp.x, mp.y, False):
-            return False, f"Obstacle between cells {start_cell_id} and {end_cell_id}"
+    losMap = FightLosMap()
+    losMap.refresh()
+    if not losMap.hasLos(start_cell_id, end_cell_id):
+        return False, f"Obstacle between cells {start_cell_id} and {end_cell_id}"
             
     return True, ""
 
@@ -2,6 +2,7 @@ from pyd2bot.data.models import Session
 from pyd2bot.logic.fight.behaviors.FightPreparation import FightPreparation
 from pyd2bot.logic.fight.behaviors.fight_turn.FightPlayTurn import FightPlayTurn
 from pyd2bot.logic.fight.behaviors.FightStateManager import FightStateManager
+from pyd2bot.logic.fight.replay.FightRecorder import FightRecorder
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.berilia.managers.KernelEventsManager import KernelEventsManager
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
@@ -25,6 +26,8 @@ class FightAIFrame(Frame):
         super().__init__()
 
     def pushed(self) -> bool:
+        if self.session.recordFights:
+            FightRecorder().startFight()
         Kernel().defer(FightPreparation().start)
         return True
 
@@ -99,6 +102,8 @@ class FightAIFrame(Frame):
             FightPreparation().stop()
         if FightPlayTurn().isRunning():
             FightPlayTurn().stop()
+        if self.session.recordFights:
+            FightRecorder().endFight()
         Kernel().worker.removeFrame(self)
         return True
 
@@ -0,0 +1,167 @@
+import gzip
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, List, Optional
+
+from pyd2bot.BotSettings import BotSettings
+from pyd2bot.logic.fight.behaviors.fight_turn import fight_geometry
+from pyd2bot.logic.fight.behaviors.fight_turn.FightLosMap import FightLosMap
+from pyd2bot.logic.fight.behaviors.fight_turn.FightReachability import FightReachability
+from pyd2bot.logic.fight.behaviors.fight_turn.spell_utils import can_cast_spell_on_cell, getSpellZoneParams
+from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import MapDisplayManager
+from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
+from pydofus2.com.ankamagames.dofus.logic.game.fight.miscs.TackleUtil import TackleUtil
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+from pydofus2.com.ankamagames.jerakine.metaclass.Singleton import Singleton
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+
+if TYPE_CHECKING:
+    from pyd2bot.logic.fight.behaviors.FightStateManager import FightStateManager
+    from pydofus2.com.ankamagames.dofus.internalDatacenter.spells.SpellWrapper import SpellWrapper
+
+
+def mask_to_hex(mask: int) -> str:
+    return format(mask, "x")
+
+
+def cells_to_mask(cells: Iterable[int]) -> int:
+    mask = 0
+    for cellId in cells:
+        mask |= 1 << int(cellId)
+    return mask
+
+
+class FightRecorder(metaclass=Singleton):
+    """
+    Records the state the AI decides from at every turn it plays, one JSON line per turn in a gzipped file of
+    the day. The records hold everything the turn planner reads (fighters, AP/MP, spells ranges and costs,
+    LOS and movement masks, tackle around the fighter) so fights can be replayed offline,
+    see RecordedFightView and scripts/simulate_fights.py.
+    """
+
+    RECORDS_DIR = os.path.join(BotSettings.PERSISTENCE_DIR, "fight_records")
+    # Bots of the same process append to the same file
+    _fileLock = threading.Lock()
+
+    def __init__(self):
+        self._fightId: Optional[str] = None
+        self._turn = 0
+
+    @classmethod
+    def recordsFile(cls, day: datetime = None) -> str:
+        day = day or datetime.now()
+        return os.path.join(cls.RECORDS_DIR, f"fights-{day.strftime('%Y%m%d')}.jsonl.gz")
+
+    def startFight(self) -> None:
+        self._fightId = uuid.uuid4().hex
+        self._turn = 0
+
+    def endFight(self) -> None:
+        if self._fightId is None:
+            return
+        self._write({"type": "end", "fightId": self._fightId, "turns": self._turn})
+        self._fightId = None
+
+    def recordTurn(self, state_manager: "FightStateManager", filters: List[tuple]) -> None:
+        """Never raises, a failing record must not break the fight"""
+        if self._fightId is None:
+            self.startFight()
+        try:
+            record = self._turnRecord(state_manager, filters)
+        except Exception as e:
+            Logger().warning(f"Unable to record fight turn: {e}", exc_info=True)
+            return
+        self._turn += 1
+        self._write(record)
+
+    def _turnRecord(self, state_manager: "FightStateManager", filters: List[tuple]) -> dict:
+        fighter_infos = state_manager.fighter_infos
+        fighter_cell = fighter_infos.disposition.cellId
+        mp = state_manager.movement_points
+        snapshot = state_manager.get_turn_snapshot(fighter_infos)
+        spells = [state_manager.primary_spellw, state_manager.secondary_spellw]
+
+        blocked = FightLosMap().refresh()
+        entities = []
+        for entity in snapshot.entities:
+            entities.append({
+                "id": entity.id,
+                "cell": entity.cellId,
+                "team": entity.teamId,
+                "hp": entity.hitpoints,
+                "dead": entity.dead,
+                "hidden": entity.hidden,
+                "summoned": entity.summoned,
+                "boneId": entity.boneId,
+                "blocksLos": entity.cellId != -1 and bool(blocked >> entity.cellId & 1),
+                "canHit": [
+                    spellw.spellId for spellw in spells if spellw and snapshot.castability(spellw)[entity.id][0]
+                ],
+            })
+
+        # Players aren't part of the snapshot, they still block the way
+        others = [
+            entity.disposition.cellId
+            for entity in Kernel().fightEntitiesFrame.entities.values()
+            if entity.contextualId >= 0
+            and entity.contextualId != fighter_infos.contextualId
+            and entity.disposition
+            and entity.disposition.cellId != -1
+        ]
+
+        tackle = {}
+        if mp > 0:
+            for cellId in FightReachability().reachableCells(fighter_infos, fighter_cell, mp):
+                factor = TackleUtil.getTackle(fighter_infos, MapPoint.fromCellId(cellId))
+                if factor < 1:
+                    tackle[cellId] = factor
+
+        dataMap = MapDisplayManager().dataMap
+        return {
+            "type": "turn",
+            "fightId": self._fightId,
+            "turn": self._turn + 1,
+            "mapId": dataMap.id if dataMap else None,
+            "fighter": {
+                "id": fighter_infos.contextualId,
+                "cell": fighter_cell,
+                "team": fighter_infos.spawnInfo.teamId,
+                "ap": state_manager.action_points,
+                "mp": mp,
+            },
+            "spells": [self._spellRecord(spellw) if spellw else None for spellw in spells],
+            "entities": entities,
+            "players": others,
+            "filters": [list(target_filter) for target_filter in filters],
+            "blocked": mask_to_hex(blocked),
+            "movable": mask_to_hex(cells_to_mask(fight_geometry.movable_mask().nonzero()[0])),
+            "tackle": tackle,
+        }
+
+    @staticmethod
+    def _spellRecord(spellw: "SpellWrapper") -> dict:
+        kind, min_range, max_range = getSpellZoneParams(spellw)
+        return {
+            "id": spellw.spellId,
+            "level": spellw.spellLevel,
+            "apCost": spellw["apCost"],
+            "maxCastPerTurn": spellw["maxCastPerTurn"],
+            "maxCastPerTarget": spellw["maxCastPerTarget"],
+            "kind": kind,
+            "minRange": min_range,
+            "range": max_range,
+            "castable": can_cast_spell_on_cell(spellw)[0],
+        }
+
+    def _write(self, record: dict) -> None:
+        try:
+            with self._fileLock:
+                os.makedirs(self.RECORDS_DIR, exist_ok=True)
+                # Each append adds a gzip member, readers see a single stream
+                with gzip.open(self.recordsFile(), "at", encoding="utf-8") as fp:
+                    fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except OSError as e:
+            Logger().warning(f"Unable to write fight record: {e}")
@@ -0,0 +1,107 @@
+import gzip
+import json
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from pyd2bot.logic.fight.behaviors.fight_turn import fight_geometry
+from pyd2bot.logic.fight.behaviors.fight_turn.TurnPlanner import TurnPlan, TurnPlanner
+from pyd2bot.logic.fight.replay.RecordedFightView import RecordedFightView
+
+
+def read_records(paths: Iterable[str]) -> Iterator[dict]:
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as fp:
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+
+
+@dataclass
+class RecordedFight:
+    fightId: str
+    turns: List[dict] = field(default_factory=list)
+    # Turns the AI actually played, when the end of the fight was recorded
+    playedTurns: Optional[int] = None
+
+
+def load_fights(paths: Iterable[str]) -> List[RecordedFight]:
+    fights: Dict[str, RecordedFight] = {}
+    for record in read_records(paths):
+        fight = fights.setdefault(record["fightId"], RecordedFight(record["fightId"]))
+        if record["type"] == "turn":
+            fight.turns.append(record)
+        elif record["type"] == "end":
+            fight.playedTurns = record["turns"]
+    return [fight for fight in fights.values() if fight.turns]
+
+
+class FightSimulator:
+    """
+    Replays recorded fights through the turn planner, headless.
+
+    Every recorded turn is planned again to time the decision. A fight is also played out from its first
+    recorded turn: the planned move and casts are applied, each cast taking `damage_per_cast` HP off its
+    target, enemies don't move nor hit back. Turns the planner finds nothing to cast, the fighter walks
+    toward the nearest enemy.
+    """
+
+    def __init__(self, damage_per_cast: int, max_turns: int = 30):
+        self.damage_per_cast = damage_per_cast
+        self.max_turns = max_turns
+
+    @staticmethod
+    def decide(view: RecordedFightView) -> Tuple[Optional[TurnPlan], float]:
+        """Plan of the turn and the time it took in seconds"""
+        start = perf_counter()
+        plan = TurnPlanner(view, [], [tuple(f) for f in view.record["filters"]]).plan()
+        return plan, perf_counter() - start
+
+    def replay_turns(self, fight: RecordedFight) -> List[float]:
+        return [self.decide(RecordedFightView(record))[1] for record in fight.turns]
+
+    def simulate(self, fight: RecordedFight) -> Tuple[Optional[int], List[float]]:
+        """Turns to kill every enemy, None if not done within max_turns, and the decision latencies"""
+        view = RecordedFightView(fight.turns[0])
+        latencies = []
+        for turn in range(1, self.max_turns + 1):
+            view.new_turn()
+            plan, latency = self.decide(view)
+            latencies.append(latency)
+            if plan:
+                self._apply(view, plan)
+            else:
+                self._approach(view)
+            if not view.alive_enemies():
+                return turn, latencies
+        return None, latencies
+
+    def _apply(self, view: RecordedFightView, plan: TurnPlan) -> None:
+        if plan.path:
+            view.move_to(plan.path[-1], len(plan.path) - 1)
+        for cast in plan.casts:
+            view.cast(cast.spellw, cast.target.entityId)
+            entity = cast.target.entity
+            entity.hitpoints -= self.damage_per_cast
+            if entity.hitpoints <= 0:
+                entity.dead = True
+
+    @staticmethod
+    def _approach(view: RecordedFightView) -> None:
+        enemies = view.alive_enemies()
+        walk = view.walk_distances()
+        if not enemies:
+            return
+        distances = fight_geometry.distance_matrix()[:, [e.cellId for e in enemies]].min(axis=1)
+        cellId = min(walk, key=lambda c: (distances[c], walk[c]))
+        if cellId != view.fighter_cell:
+            view.move_to(cellId, walk[cellId])
+
+
+def percentiles(values: List[float], qs=(50, 90, 99)) -> Dict[int, float]:
+    if not values:
+        return {q: float("nan") for q in qs}
+    return dict(zip(qs, np.percentile(values, qs).tolist()))
@@ -0,0 +1,181 @@
+from collections import deque
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from pyd2bot.logic.fight.behaviors.fight_turn import fight_geometry
+from pyd2bot.logic.fight.behaviors.fight_turn.FightLosMap import OUT_OF_MAP_BIT, FightLosMap
+from pyd2bot.logic.fight.behaviors.fight_turn.FightView import FightView
+from pyd2bot.logic.fight.behaviors.fight_turn.fight_algo_utils import Target
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+
+
+class RecordedSpell:
+    """Stands for a SpellWrapper in the planner, from a spell of a turn record"""
+
+    def __init__(self, record: dict):
+        self.record = record
+        self.spellId = record["id"]
+        self.spellLevel = record["level"]
+        self.spell = SimpleNamespace(name=str(self.spellId))
+
+    def __getitem__(self, key):
+        return self.record.get(key)
+
+
+class RecordedEntity:
+    """Fighter of a turn record, shaped like the fighter informations the planner targets"""
+
+    def __init__(self, record: dict):
+        self.record = record
+        self.contextualId = record["id"]
+        self.teamId = record["team"]
+        self.hitpoints = record["hp"]
+        self.dead = record["dead"]
+        self.hidden = record["hidden"]
+        self.summoned = record["summoned"]
+        self.boneId = record["boneId"]
+        self.blocksLos = record["blocksLos"]
+        self.canHit = set(record["canHit"])
+        self.disposition = SimpleNamespace(cellId=record["cell"])
+
+    @property
+    def cellId(self) -> int:
+        return self.disposition.cellId
+
+    @cellId.setter
+    def cellId(self, value: int) -> None:
+        self.disposition.cellId = value
+
+
+class RecordedFightView(FightView):
+    """
+    A fight as recorded by FightRecorder, mutable so a simulation can move the fighter and kill targets.
+    Geometry comes from the recorded masks instead of the map data providers, enemies keep their recorded cells.
+    """
+
+    def __init__(self, record: dict):
+        self.record = record
+        fighter = record["fighter"]
+        self.fighterId = fighter["id"]
+        self.teamId = fighter["team"]
+        self._fighter_cell = fighter["cell"]
+        self._ap = fighter["ap"]
+        self._mp = fighter["mp"]
+        self._spells = tuple(RecordedSpell(s) if s else None for s in record["spells"])
+        self.entities = [RecordedEntity(e) for e in record["entities"]]
+        movable = int(record["movable"], 16)
+        self.movable = np.array([bool(movable >> cellId & 1) for cellId in range(fight_geometry.CELLS_COUNT)])
+        # Static obstacles, fighters are laid back on top of them from their current cells
+        blocked = int(record["blocked"], 16)
+        for entity in self.entities:
+            if entity.blocksLos:
+                blocked &= ~(1 << entity.cellId)
+        # The fighter never stands between a target and itself
+        blocked &= ~(1 << self._fighter_cell)
+        self._static_blocked = blocked | OUT_OF_MAP_BIT
+        self.players = set(record.get("players", []))
+        self._tackle = {int(cellId): factor for cellId, factor in record["tackle"].items()}
+        # spell id -> entity id -> casts done this turn
+        self._casts = dict[int, Dict[float, int]]()
+
+    @property
+    def fighter_cell(self) -> Optional[int]:
+        return self._fighter_cell
+
+    @property
+    def movement_points(self) -> int:
+        return self._mp
+
+    @property
+    def action_points(self) -> int:
+        return self._ap
+
+    def alive_enemies(self) -> List[RecordedEntity]:
+        return [e for e in self.entities if e.teamId != self.teamId and not e.dead and e.cellId != -1]
+
+    def new_turn(self) -> None:
+        """Gives back the recorded AP and MP"""
+        self._ap = self.record["fighter"]["ap"]
+        self._mp = self.record["fighter"]["mp"]
+        self._casts.clear()
+
+    def move_to(self, cellId: int, mp_used: int) -> None:
+        self._fighter_cell = cellId
+        self._mp -= mp_used
+        # The tackle was recorded around the starting cell only
+        self._tackle = {}
+
+    def spend_ap(self, ap: int) -> None:
+        self._ap -= ap
+
+    def cast(self, spellw: RecordedSpell, entityId: float) -> None:
+        self.spend_ap(spellw["apCost"])
+        casts = self._casts.setdefault(spellw.spellId, {})
+        casts[entityId] = casts.get(entityId, 0) + 1
+
+    def spells(self) -> Tuple[Optional[RecordedSpell], Optional[RecordedSpell]]:
+        primary, secondary = (self._spells + (None, None))[:2]
+        return primary, secondary
+
+    def can_cast(self, spellw: RecordedSpell) -> bool:
+        return bool(spellw["castable"]) and self._ap >= (spellw["apCost"] or 0)
+
+    def casts_this_turn(self, spellw: RecordedSpell) -> int:
+        return sum(self._casts.get(spellw.spellId, {}).values())
+
+    def casts_on_target(self, spellw: RecordedSpell, entityId: float) -> int:
+        return self._casts.get(spellw.spellId, {}).get(entityId, 0)
+
+    def targets(self, spellw: RecordedSpell, target_sums=False, target_boneId=None) -> List[Target]:
+        return [
+            Target(entity, self._fighter_cell)
+            for entity in self.alive_enemies()
+            if not entity.hidden
+            and (target_sums or not entity.summoned)
+            and spellw.spellId in entity.canHit
+            and (target_boneId is None or entity.boneId == target_boneId)
+        ]
+
+    def _blocked(self) -> int:
+        blocked = self._static_blocked
+        for entity in self.entities:
+            if entity.blocksLos and not entity.dead and entity.cellId != -1:
+                blocked |= 1 << entity.cellId
+        return blocked
+
+    def casting_cells(self, spellw: RecordedSpell, targets: List[Target]) -> Dict[int, List[Target]]:
+        blocked = self._blocked()
+        zones = fight_geometry.zone_mask(
+            spellw["kind"], spellw["minRange"], spellw["range"], [t.pos.cellId for t in targets], self.movable
+        )
+        has_los = dict[int, List[Target]]()
+        for target, zone in zip(targets, zones):
+            for cellId in np.flatnonzero(zone).tolist():
+                if not (FightLosMap.lineMask(target.pos.cellId, cellId) & blocked):
+                    has_los.setdefault(cellId, []).append(target)
+        return has_los
+
+    def reachable_cells(self) -> Set[int]:
+        return set(self.walk_distances()) - {self._fighter_cell}
+
+    def walk_distances(self) -> Dict[int, int]:
+        """MP needed to reach the free movable cells within the MP, walking around fighters"""
+        occupied = {e.cellId for e in self.entities if not e.dead and e.cellId != -1} | self.players
+        distances = {self._fighter_cell: 0}
+        queue = deque([self._fighter_cell])
+        while queue:
+            cellId = queue.popleft()
+            if distances[cellId] >= self._mp:
+                continue
+            for neighbour in MapPoint.fromCellId(cellId).vicinity():
+                nextCellId = neighbour.cellId
+                if nextCellId in distances or nextCellId in occupied or not self.movable[nextCellId]:
+                    continue
+                distances[nextCellId] = distances[cellId] + 1
+                queue.append(nextCellId)
+        return distances
+
+    def tackle_at(self, cellId: int) -> float:
+        return self._tackle.get(cellId, 1)
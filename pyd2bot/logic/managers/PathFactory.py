@@ -20,7 +20,14 @@ class PathFactory:
 
         if not isinstance(obj, Path):
             raise ValueError("session.path must be a Path instance, not " + str(type(obj)))
-            
+
+        path = cls._create(obj)
+        # Built graphs are cached on disk under the path definition
+        path.definition = obj.model_dump_json()
+        return path
+
+    @classmethod
+    def _create(cls, obj: 'Path'):
         if obj.type == PathTypeEnum.RandomSubAreaFarmPath:
             return RandomSubAreaFarmPath(
                 name=obj.id,
@@ -31,7 +38,8 @@ class PathFactory:
         if obj.type == PathTypeEnum.RandomAreaFarmPath:
             return RandomAreaFarmPath(
                 name=obj.id,
-                startVertex=WorldGraph().getVertex(obj.startMapId, obj.startZoneId)
+                startVertex=WorldGraph().getVertex(obj.startMapId, obj.startZoneId),
+                weightedExploration=bool(obj.weightedExploration),
             )
             
         if obj.type == PathTypeEnum.CustomRandomFarmPath:
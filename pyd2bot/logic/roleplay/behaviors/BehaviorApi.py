@@ -32,17 +32,26 @@ class BehaviorApi:
     def __init__(self) -> None:
         pass
 
+    @property
+    def tripKamasBudget(self):
+        """Kamas the session allows its trips to spend on zaaps, havenbag and recall potions"""
+        workflowFrame = Kernel().worker.getFrameByName("BotWorkflowFrame")
+        if workflowFrame is None:
+            return None
+        return workflowFrame.session.tripKamasBudget
+
     def autoTrip(
         self,
         dstMapId=None,
         dstZoneId=None,
         path: list["Edge"] = None,
         farm_resources_on_way=False,
+        kamas_budget=None,
         callback=None,
     ):
         from pyd2bot.logic.roleplay.behaviors.movement.AutoTrip import AutoTrip
 
-        AutoTrip(farm_resources_on_way).start(dstMapId, dstZoneId, path, callback=callback, parent=self)
+        AutoTrip(farm_resources_on_way, kamas_budget).start(dstMapId, dstZoneId, path, callback=callback, parent=self)
 
     def travel_with_npc(self, infos, callback=None, dstSubAreaName=""):
         Logger().info(f"Auto trip to a special destination ({dstSubAreaName}).")
@@ -247,6 +256,7 @@ class BehaviorApi:
         npcQuestionsReplies,
         farm_resources_on_way=False,
         path_to_npc=None,
+        kamas_budget=None,
         callback=None,
     ):
         from pyd2bot.logic.roleplay.behaviors.npc.NpcDialog import NpcDialog
@@ -266,6 +276,7 @@ class BehaviorApi:
                 npcMapId,
                 farm_resources_on_way=farm_resources_on_way,
                 path=path_to_npc,
+                kamas_budget=kamas_budget,
                 callback=self._on_npc_reached_callback,
             )
 
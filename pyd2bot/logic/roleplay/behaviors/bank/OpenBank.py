@@ -48,6 +48,7 @@ class OpenBank(AbstractBehavior):
             self.infos.npcActionId, 
             self.infos.questionsReplies,
             path_to_npc=self.path_to_bank,
+            kamas_budget=self.tripKamasBudget,
             callback=self.onBankManDialogEnded,
         )
 
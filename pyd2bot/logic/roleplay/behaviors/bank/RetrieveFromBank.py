@@ -127,8 +127,13 @@ class RetrieveFromBank(AbstractBehavior):
                 if avg_price * batch_size < self.MIN_STACK_VALUE_TO_CONSIDER:
                     continue
 
-                score = self.scorer.score(PlayerManager().server.id, item.objectGID, batch_size)
-                candidates.append({"item": item, "batch_size": batch_size, "score": score})
+                candidates.append({"item": item, "batch_size": batch_size})
+
+        # Score all candidates at once, missing market stats get recomputed in the background
+        server_id = PlayerManager().server.id
+        scores = self.scorer.score_many((server_id, c["item"].objectGID, c["batch_size"]) for c in candidates)
+        for candidate in candidates:
+            candidate["score"] = scores[(server_id, candidate["item"].objectGID, candidate["batch_size"])]
 
         # Sort candidates by score
         candidates.sort(key=lambda x: x["score"], reverse=True)
@@ -203,6 +208,6 @@ class RetrieveFromBank(AbstractBehavior):
 
         if self._return_to_start:
             self._logger.info(f"Returning to start point")
-            self.autoTrip(self._start_map_id, self._start_zone, callback=callback)
+            self.autoTrip(self._start_map_id, self._start_zone, kamas_budget=self.tripKamasBudget, callback=callback)
         else:
             callback()
@@ -59,7 +59,7 @@ class RetrieveRecipeFromBank(AbstractBehavior):
         Logger().info("Bank storage closed")
         if self.return_to_start:
             Logger().info(f"Returning to start point")
-            self.autoTrip(self._startMapId, self._startRpZone, callback=self.finish)
+            self.autoTrip(self._startMapId, self._startRpZone, kamas_budget=self.tripKamasBudget, callback=self.finish)
         else:
             self.finish(0)
 
@@ -11,23 +11,24 @@ def find_items_to_retrieve(
     max_slots: int,
     scorer
 ) -> Tuple[List[Tuple[int, int, int]], bool]:  # Returns (selections, has_remainder)
+    eligible = [
+        (item, batch_size)
+        for item in bank_items
+        if item.typeId in type_ids
+        for batch_size in BATCH_SIZES
+        if batch_size <= item.quantity
+    ]
+    scores = scorer.score_many((server_id, item.objectGID, batch_size) for item, batch_size in eligible)
+
     candidates = []
-    for item in bank_items:
-        if item.typeId not in type_ids:
-            continue
-            
-        for batch_size in BATCH_SIZES:
-            if batch_size > item.quantity:
-                continue
-                
-            score = scorer.score(server_id, item.objectGID, batch_size)
-            candidates.append({
-                'uid': item.objectUID,
-                'batch_size': batch_size,
-                'available_qty': item.quantity,
-                'weight_per_unit': item.weight,
-                'score_per_batch': score
-            })
+    for item, batch_size in eligible:
+        candidates.append({
+            'uid': item.objectUID,
+            'batch_size': batch_size,
+            'available_qty': item.quantity,
+            'weight_per_unit': item.weight,
+            'score_per_batch': scores[(server_id, item.objectGID, batch_size)]
+        })
 
     candidates.sort(key=lambda x: x['score_per_batch'], reverse=True)
 
@@ -1,14 +1,47 @@
+import threading
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketItemAnalytics import MarketStats, MarketItemAnalytics
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 
+ItemKey = Tuple[int, int, int]
+
+
 class MarketScorer:
     def __init__(self, stats_max_age_hours: int = 24):
         self.analytics = MarketItemAnalytics()
         self.stats_max_age_hours = stats_max_age_hours
         self._stats_cache = dict()
+        self._cache_lock = threading.Lock()
+        self._pending_recompute = set[ItemKey]()
+        self._recompute_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _row_to_stats(row) -> MarketStats:
+        return MarketStats(
+            server_id=row[0],
+            object_gid=row[1],
+            batch_size=row[2],
+            item_name=row[3],
+            calculated_at=row[4],
+            num_samples=row[5],
+            mean_time_to_sell=row[6],
+            std_time_to_sell=row[7],
+            exp_rate=row[8],
+            mean_price=row[9],
+            std_price=row[10],
+            median_price=row[11],
+            mean_tax=row[12],
+            std_tax=row[13],
+            sales_rate=row[14],
+            mean_profit_per_hour=row[15],
+            std_profit_per_hour=row[16],
+            p95_profit_per_hour=row[17]
+        )
+
+    def _is_fresh(self, timestamp: datetime) -> bool:
+        return datetime.now() - timestamp <= timedelta(hours=self.stats_max_age_hours)
     
     def _get_latest_stats(self, server_id: int, gid: int, batch_size: int) -> Optional[MarketStats]:
         """Retrieve the latest stats for an item from the database."""
@@ -37,26 +70,7 @@ class MarketScorer:
                     if not row:
                         return None
                     
-                    stats = MarketStats(
-                        server_id=row[0],
-                        object_gid=row[1],
-                        batch_size=row[2],
-                        item_name=row[3],
-                        calculated_at=row[4],
-                        num_samples=row[5],
-                        mean_time_to_sell=row[6],
-                        std_time_to_sell=row[7],
-                        exp_rate=row[8],
-                        mean_price=row[9],
-                        std_price=row[10],
-                        median_price=row[11],
-                        mean_tax=row[12],
-                        std_tax=row[13],
-                        sales_rate=row[14],
-                        mean_profit_per_hour=row[15],
-                        std_profit_per_hour=row[16],
-                        p95_profit_per_hour=row[17]
-                    )
+                    stats = self._row_to_stats(row)
                     
                     # Update cache
                     self._stats_cache[cache_key] = (datetime.now(), stats)
@@ -69,8 +83,12 @@ class MarketScorer:
     def score(self, server_id: int, gid: int, batch_size: int) -> float:
         """Score an item based on its market statistics."""
         try:
-            # Get latest stats (from cache or DB)
-            stats = self._get_latest_stats(server_id, gid, batch_size)
+            # Running stats are kept up to date by every recorded sale
+            stats = self.analytics.get_running_item_stats(server_id, gid, batch_size)
+            
+            # Otherwise get latest stats snapshot (from cache or DB)
+            if not stats:
+                stats = self._get_latest_stats(server_id, gid, batch_size)
             
             # Calculate if missing or too old
             if not stats or (datetime.now() - stats.calculated_at) > timedelta(hours=self.stats_max_age_hours):
@@ -90,4 +108,105 @@ class MarketScorer:
             
         except Exception as e:
             Logger().error(f"Error scoring item {gid}: {str(e)}")
-            return 0.0
\ No newline at end of file
+            return 0.0
+
+    def _get_latest_stats_bulk(self, keys: List[ItemKey]) -> Dict[ItemKey, MarketStats]:
+        """Latest stats snapshot of many items in one query."""
+        if not keys:
+            return {}
+        try:
+            with self.analytics.market_db.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT DISTINCT ON (server_id, object_gid, batch_size) *
+                        FROM market_statistics
+                        WHERE (server_id, object_gid, batch_size) IN %s
+                        ORDER BY server_id, object_gid, batch_size, calculated_at DESC
+                    """, (tuple(keys),))
+                    
+                    return {(row[0], row[1], row[2]): self._row_to_stats(row) for row in cur.fetchall()}
+                    
+        except Exception as e:
+            Logger().error(f"Error retrieving stats for {len(keys)} items: {str(e)}")
+            return {}
+
+    @staticmethod
+    def _fallback_score(gid: int, batch_size: int) -> float:
+        avg_price = Kernel().averagePricesFrame.getItemAveragePrice(gid)
+        return (batch_size * avg_price) / 0.5 if avg_price else 0.0
+
+    def score_many(self, keys: Iterable[ItemKey]) -> Dict[ItemKey, float]:
+        """
+        Score many (server_id, gid, batch_size) at once.
+        Stats are read in bulk, missing or stale ones are recomputed in the background and scored
+        provisionally meanwhile: stale stats as they are, missing ones from the average price.
+        """
+        keys = list(dict.fromkeys(keys))
+        stats_by_key: Dict[ItemKey, MarketStats] = {}
+        with self._cache_lock:
+            for key in keys:
+                cached = self._stats_cache.get(key)
+                if cached and self._is_fresh(cached[0]):
+                    stats_by_key[key] = cached[1]
+        
+        missing = [key for key in keys if key not in stats_by_key]
+        # Running stats are kept up to date by every recorded sale, snapshots are only needed for the others
+        fetched = self.analytics.get_running_items_stats(missing)
+        fetched.update(self._get_latest_stats_bulk([key for key in missing if key not in fetched]))
+        
+        now = datetime.now()
+        stale = []
+        with self._cache_lock:
+            for key in missing:
+                stats = fetched.get(key)
+                if stats:
+                    self._stats_cache[key] = (now, stats)
+                    stats_by_key[key] = stats
+                if not stats or not self._is_fresh(stats.calculated_at):
+                    stale.append(key)
+        self._schedule_recompute(stale)
+        
+        scores = {}
+        for key in keys:
+            stats = stats_by_key.get(key)
+            try:
+                scores[key] = stats.mean_profit_per_hour if stats else self._fallback_score(key[1], key[2])
+            except Exception as e:
+                Logger().error(f"Error scoring item {key[1]}: {str(e)}")
+                scores[key] = 0.0
+        return scores
+
+    def _schedule_recompute(self, keys: List[ItemKey]):
+        if not keys:
+            return
+        with self._cache_lock:
+            self._pending_recompute.update(keys)
+            if self._recompute_thread and self._recompute_thread.is_alive():
+                return
+            self._recompute_thread = threading.Thread(
+                target=self._recompute_pending, name="MarketScorerRecompute", daemon=True
+            )
+            self._recompute_thread.start()
+
+    def _recompute_pending(self):
+        while True:
+            with self._cache_lock:
+                if not self._pending_recompute:
+                    self._recompute_thread = None
+                    return
+                keys = list(self._pending_recompute)
+                self._pending_recompute.clear()
+            
+            computed = []
+            for server_id, gid, batch_size in keys:
+                stats = self.analytics.calculate_item_stats(server_id, gid, batch_size)
+                if stats:
+                    computed.append(stats)
+            if not computed:
+                continue
+            
+            self.analytics.batch_save_stats(computed)
+            now = datetime.now()
+            with self._cache_lock:
+                for stats in computed:
+                    self._stats_cache[(stats.server_id, stats.object_gid, stats.batch_size)] = (now, stats)
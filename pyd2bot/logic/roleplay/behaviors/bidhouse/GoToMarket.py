@@ -55,6 +55,7 @@ class GoToMarket(AbstractBehavior):
         ):
             self.autoTrip(
                 path=self.path_to_market,
+                kamas_budget=self.tripKamasBudget,
                 callback=self._on_market_map_reached,
             )
         else:
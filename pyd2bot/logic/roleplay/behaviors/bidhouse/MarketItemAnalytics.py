@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from datetime import datetime
-from collections import defaultdict
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketPersistence import MarketPersistence
+from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketRunningStats import MarketRunningStats, P2Quantile
+from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketStatsEngine import SalesColumns, compute_group_stats
 from pydofus2.com.ankamagames.dofus.datacenter.items.Item import Item
 
 @dataclass
@@ -181,34 +182,6 @@ class MarketItemAnalytics:
                 """)
             conn.commit()
 
-    def _fetch_all_sales_data(self) -> Dict[Tuple[int, int, int], List[dict]]:
-        """Fetch all sales data in a single query."""
-        sales_by_key = defaultdict(list)
-        with self.market_db.get_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT 
-                        server_id,
-                        object_gid,
-                        batch_size,
-                        price,
-                        sold_at,
-                        created_at
-                    FROM bids
-                    WHERE sold_at IS NOT NULL
-                    ORDER BY sold_at DESC
-                """)
-                
-                for row in cur.fetchall():
-                    key = (row[0], row[1], row[2])  # server_id, object_gid, batch_size
-                    sales_by_key[key].append({
-                        'price': float(row[3]),
-                        'sold_at': row[4],
-                        'created_at': row[5]
-                    })
-        
-        return dict(sales_by_key)
-
     def _fetch_all_taxes(self) -> Dict[Tuple[int, int, int], float]:
             """Fetch all average taxes using only the tax_history table."""
             with self.market_db.get_connection() as conn:
@@ -225,69 +198,64 @@ class MarketItemAnalytics:
                     
                     return {(row[0], row[1], row[2]): float(row[3]) for row in cur.fetchall()}
 
+    def _fetch_sales_columns(self) -> SalesColumns:
+        """Fetch all sold bids as column arrays, timestamps as epoch seconds."""
+        with self.market_db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT 
+                        server_id,
+                        object_gid,
+                        batch_size,
+                        price,
+                        EXTRACT(EPOCH FROM created_at)::float8,
+                        EXTRACT(EPOCH FROM sold_at)::float8
+                    FROM bids
+                    WHERE sold_at IS NOT NULL
+                """)
+                return SalesColumns.from_rows(cur.fetchall())
+
     def calculate_all_stats(self) -> List[MarketStats]:
         """Calculate statistics for all items in a single batch."""
         # Fetch all data at once
         print("Fetching all sales data...")
-        sales_data = self._fetch_all_sales_data()
-        print(f"Found {len(sales_data)} unique combinations with sales data")
+        sales = self._fetch_sales_columns()
+        print(f"Found {len(sales)} sold bids")
         
         print("Fetching all tax data...")
         tax_data = self._fetch_all_taxes()
         print(f"Found {len(tax_data)} unique combinations with tax data")
         
-        # Calculate statistics for each combination
+        # Calculate statistics for every combination at once
+        groups = compute_group_stats(sales, tax_data)
+        print(f"Found {len(groups)} unique combinations with sales data")
+
         all_stats = []
-        for key, sales in sales_data.items():
-            server_id, gid, batch_size = key
-            avg_tax = tax_data.get(key, 0)
-            
+        calculated_at = datetime.now()
+        for i in range(len(groups)):
+            server_id, gid, batch_size = groups.key(i)
             try:
                 item_name = Item.getItemById(gid).name
                 
-                # Calculate time to sell in hours
-                times_to_sell = [(sale['sold_at'] - sale['created_at']).total_seconds() / 3600 
-                                for sale in sales]
-                
-                # Calculate prices
-                prices = [sale['price'] for sale in sales]
-                
-                # Calculate profits per hour
-                profits_per_hour = [
-                    (sale['price'] - avg_tax) / ((sale['sold_at'] - sale['created_at']).total_seconds() / 3600)
-                    for sale in sales
-                    if (sale['sold_at'] - sale['created_at']).total_seconds() > 0
-                ]
-                
-                # Calculate sales rate (sales per day)
-                if len(sales) >= 2:
-                    time_span = (sales[0]['sold_at'] - sales[-1]['sold_at']).total_seconds() / (24 * 3600)
-                    sales_rate = len(sales) / time_span if time_span > 0 else 0
-                else:
-                    sales_rate = 0
-                
-                # Fit exponential distribution to time to sell
-                exp_rate = 1 / np.mean(times_to_sell) if times_to_sell else 0
-                
                 stats = MarketStats(
                     server_id=server_id,
                     object_gid=gid,
                     batch_size=batch_size,
                     item_name=item_name,
-                    calculated_at=datetime.now(),
-                    num_samples=len(sales),
-                    mean_time_to_sell=np.mean(times_to_sell),
-                    std_time_to_sell=np.std(times_to_sell),
-                    exp_rate=exp_rate,
-                    mean_price=np.mean(prices),
-                    std_price=np.std(prices),
-                    median_price=np.median(prices),
-                    mean_tax=avg_tax,
+                    calculated_at=calculated_at,
+                    num_samples=groups.num_samples[i],
+                    mean_time_to_sell=groups.mean_time_to_sell[i],
+                    std_time_to_sell=groups.std_time_to_sell[i],
+                    exp_rate=groups.exp_rate[i],
+                    mean_price=groups.mean_price[i],
+                    std_price=groups.std_price[i],
+                    median_price=groups.median_price[i],
+                    mean_tax=groups.mean_tax[i],
                     std_tax=0,
-                    sales_rate=sales_rate,
-                    mean_profit_per_hour=np.mean(profits_per_hour) if profits_per_hour else 0,
-                    std_profit_per_hour=np.std(profits_per_hour) if profits_per_hour else 0,
-                    p95_profit_per_hour=np.percentile(profits_per_hour, 95) if profits_per_hour else 0
+                    sales_rate=groups.sales_rate[i],
+                    mean_profit_per_hour=groups.mean_profit_per_hour[i],
+                    std_profit_per_hour=groups.std_profit_per_hour[i],
+                    p95_profit_per_hour=groups.p95_profit_per_hour[i]
                 )
                 all_stats.append(stats)
                 
@@ -297,37 +265,119 @@ class MarketItemAnalytics:
         
         return all_stats
 
-    def batch_save_stats(self, all_stats: List[MarketStats]):
-        """Save all statistics in a single transaction."""
+    @staticmethod
+    def _running_to_market_stats(running: MarketRunningStats) -> MarketStats:
+        return MarketStats(
+            server_id=running.server_id,
+            object_gid=running.object_gid,
+            batch_size=running.batch_size,
+            item_name=Item.getItemById(running.object_gid).name,
+            calculated_at=datetime.now(),
+            num_samples=running.num_samples,
+            mean_time_to_sell=running.mean_time_to_sell,
+            std_time_to_sell=running.std_time_to_sell,
+            exp_rate=running.exp_rate,
+            mean_price=running.mean_price,
+            std_price=running.std_price,
+            median_price=running.median_price,
+            mean_tax=running.mean_tax,
+            std_tax=0.0,
+            sales_rate=running.sales_rate,
+            mean_profit_per_hour=running.mean_profit_per_hour,
+            std_profit_per_hour=running.std_profit_per_hour,
+            p95_profit_per_hour=running.p95_profit_per_hour
+        )
+
+    def get_running_item_stats(self, server_id: int, gid: int, batch_size: int) -> Optional[MarketStats]:
+        """Statistics of an item read from its running aggregates, without going through its sales history."""
+        running = self.market_db.get_running_stats(server_id, gid, batch_size)
+        if not running or not running.num_samples:
+            return None
+        return self._running_to_market_stats(running)
+
+    def get_running_items_stats(self, keys: List[Tuple[int, int, int]]) -> Dict[Tuple[int, int, int], MarketStats]:
+        """Running statistics of many (server_id, gid, batch_size) in one query, items without sales are left out."""
+        return {
+            key: self._running_to_market_stats(running)
+            for key, running in self.market_db.get_running_stats_bulk(keys).items()
+            if running.num_samples
+        }
+
+    def reconcile_running_stats(self) -> int:
+        """
+        Rebuild the running aggregates of every item from the full sales history.
+        Sums are recomputed exactly and the quantile sketches are reseeded from exact quantiles.
+        """
+        median_fractions = [0.0, 0.25, 0.5, 0.75, 1.0]
+        p95_fractions = [0.0, 0.475, 0.95, 0.975, 1.0]
         with self.market_db.get_connection() as conn:
             with conn.cursor() as cur:
-                for stats in all_stats:
-                    cur.execute("""
-                        INSERT INTO market_statistics (
-                            server_id, object_gid, item_name, batch_size, calculated_at,
-                            num_samples, mean_time_to_sell, std_time_to_sell, exp_rate,
-                            mean_price, std_price, median_price,
-                            mean_tax, std_tax, sales_rate,
-                            mean_profit_per_hour, std_profit_per_hour, p95_profit_per_hour
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                    """, (
-                        stats.server_id, stats.object_gid, stats.item_name, stats.batch_size, stats.calculated_at,
-                        stats.num_samples, stats.mean_time_to_sell, stats.std_time_to_sell, stats.exp_rate,
-                        stats.mean_price, stats.std_price, stats.median_price,
-                        stats.mean_tax, stats.std_tax, stats.sales_rate,
-                        stats.mean_profit_per_hour, stats.std_profit_per_hour, stats.p95_profit_per_hour
-                    ))
-            conn.commit()
+                cur.execute("""
+                    WITH taxes AS (
+                        SELECT server_id, object_gid, batch_size, AVG(tax_amount)::float8 AS tax
+                        FROM tax_history
+                        GROUP BY server_id, object_gid, batch_size
+                    ),
+                    sales AS (
+                        SELECT 
+                            b.server_id,
+                            b.object_gid,
+                            b.batch_size,
+                            b.price::float8 AS price,
+                            EXTRACT(EPOCH FROM b.sold_at - b.created_at)::float8 / 3600 AS tts,
+                            EXTRACT(EPOCH FROM b.sold_at)::float8 AS sold_epoch,
+                            COALESCE(t.tax, 0) AS tax
+                        FROM bids b
+                        LEFT JOIN taxes t USING (server_id, object_gid, batch_size)
+                        WHERE b.sold_at IS NOT NULL
+                    )
+                    SELECT 
+                        server_id,
+                        object_gid,
+                        batch_size,
+                        count(*),
+                        sum(price),
+                        sum(price * price),
+                        sum(tts),
+                        sum(tts * tts),
+                        count(*) FILTER (WHERE tts > 0),
+                        COALESCE(sum(price / tts) FILTER (WHERE tts > 0), 0),
+                        COALESCE(sum(1 / tts) FILTER (WHERE tts > 0), 0),
+                        COALESCE(sum(price * price / (tts * tts)) FILTER (WHERE tts > 0), 0),
+                        COALESCE(sum(price / (tts * tts)) FILTER (WHERE tts > 0), 0),
+                        COALESCE(sum(1 / (tts * tts)) FILTER (WHERE tts > 0), 0),
+                        max(tax),
+                        min(sold_epoch),
+                        max(sold_epoch),
+                        percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY price),
+                        CASE WHEN count(*) < 5 THEN array_agg(price ORDER BY price) END,
+                        percentile_cont(%s::float8[]) WITHIN GROUP (ORDER BY (price - tax) / tts)
+                            FILTER (WHERE tts > 0),
+                        CASE WHEN count(*) FILTER (WHERE tts > 0) < 5 
+                            THEN array_agg((price - tax) / tts ORDER BY (price - tax) / tts) FILTER (WHERE tts > 0) END
+                    FROM sales
+                    GROUP BY server_id, object_gid, batch_size
+                """, (median_fractions, p95_fractions))
+                rows = cur.fetchall()
+
+        all_running = []
+        for row in rows:
+            running = MarketRunningStats(*row[:17])
+            running.median_price_sketch = P2Quantile.seeded(0.5, running.num_samples, row[17], row[18])
+            running.p95_profit_sketch = P2Quantile.seeded(0.95, running.num_profit_samples, row[19], row[20])
+            all_running.append(running)
+        
+        self.market_db.save_running_stats(all_running)
+        return len(all_running)
+
+    def batch_save_stats(self, all_stats: List[MarketStats]):
+        """Save all statistics in a single transaction."""
+        self.market_db.add_market_stats_bulk(all_stats)
 
 if __name__ == "__main__":
     calculator = MarketItemAnalytics()
     
-    print("Calculating statistics...")
-    all_stats = calculator.calculate_all_stats()
-    print(f"Calculated statistics for {len(all_stats)} items")
-    
-    print("Saving statistics to database...")
-    calculator.batch_save_stats(all_stats)
+    # Sales keep the running statistics up to date, the batch job only reconciles them with the full history
+    print("Reconciling running statistics...")
+    print(f"Reconciled running statistics of {calculator.reconcile_running_stats()} items")
     print("Done!")
\ No newline at end of file
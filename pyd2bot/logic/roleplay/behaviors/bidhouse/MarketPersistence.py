@@ -2,12 +2,16 @@ import psycopg2
 import psycopg2.pool
 import psycopg2.extras
 from contextlib import contextmanager
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import threading
 from datetime import datetime, timezone
+from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketRunningStats import MarketRunningStats
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 from pydofus2.com.ankamagames.jerakine.metaclass.ThreadSharedSingleton import ThreadSharedSingleton
 
+if TYPE_CHECKING:
+    from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketItemAnalytics import MarketStats
+
 class MarketPersistence(metaclass=ThreadSharedSingleton):
     """Manages persistence of market data and bid tracking"""
     
@@ -109,6 +113,33 @@ class MarketPersistence(metaclass=ThreadSharedSingleton):
                             ON tax_history (server_id, object_gid, batch_size)
                     """)
                     
+                    # Running sales aggregates per item, updated with every sale
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS market_running_stats (
+                            server_id INTEGER NOT NULL,
+                            object_gid INTEGER NOT NULL,
+                            batch_size INTEGER NOT NULL,
+                            num_samples BIGINT NOT NULL,
+                            sum_price DOUBLE PRECISION NOT NULL,
+                            sumsq_price DOUBLE PRECISION NOT NULL,
+                            sum_time_to_sell DOUBLE PRECISION NOT NULL,
+                            sumsq_time_to_sell DOUBLE PRECISION NOT NULL,
+                            num_profit_samples BIGINT NOT NULL,
+                            sum_price_per_hour DOUBLE PRECISION NOT NULL,
+                            sum_inv_time DOUBLE PRECISION NOT NULL,
+                            sumsq_price_per_hour DOUBLE PRECISION NOT NULL,
+                            sum_price_per_hour2 DOUBLE PRECISION NOT NULL,
+                            sumsq_inv_time DOUBLE PRECISION NOT NULL,
+                            mean_tax DOUBLE PRECISION NOT NULL,
+                            first_sold_at DOUBLE PRECISION,
+                            last_sold_at DOUBLE PRECISION,
+                            median_price_sketch JSONB NOT NULL,
+                            p95_profit_sketch JSONB NOT NULL,
+                            updated_at TIMESTAMPTZ NOT NULL,
+                            PRIMARY KEY (server_id, object_gid, batch_size)
+                        )
+                    """)
+                    
                     conn.commit()
                 except Exception as e:
                     conn.rollback()
@@ -292,7 +323,7 @@ class MarketPersistence(metaclass=ThreadSharedSingleton):
                         return False
 
     def mark_bid_as_sold(self, server_id: int, object_gid: int, batch_size: int, price: int, sold_at: int) -> Optional[int]:
-        """Mark oldest matching unsold bid as sold"""
+        """Mark oldest matching unsold bid as sold and add the sale to the item running stats"""
         with self._lock:            
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
@@ -313,10 +344,14 @@ class MarketPersistence(metaclass=ThreadSharedSingleton):
                                 LIMIT 1
                                 FOR UPDATE
                             )
-                            RETURNING uid
+                            RETURNING uid, EXTRACT(EPOCH FROM created_at)::float8
                         """, (sold_at, server_id, object_gid, batch_size, price))
                         
                         result = cur.fetchone()
+                        if result:
+                            self._add_sales_to_running_stats(
+                                cur, server_id, [(object_gid, batch_size, price, result[1], sold_at)]
+                            )
                         conn.commit()
                         return result[0] if result else None
                         
@@ -325,6 +360,229 @@ class MarketPersistence(metaclass=ThreadSharedSingleton):
                         conn.rollback()
                         return None
 
+    def _add_sales_to_running_stats(self, cur, server_id: int, sales: List[Tuple[int, int, int, float, float]]):
+        """
+        Fold sales (object_gid, batch_size, price, created_at, sold_at) into the running stats of their items,
+        within the caller transaction
+        """
+        if not sales:
+            return
+        keys = tuple(sorted({(gid, batch_size) for gid, batch_size, *_ in sales}))
+        
+        cur.execute("""
+            SELECT object_gid, batch_size, AVG(tax_amount)
+            FROM tax_history
+            WHERE server_id = %s AND (object_gid, batch_size) IN %s
+            GROUP BY object_gid, batch_size
+        """, (server_id, keys))
+        taxes = {(row[0], row[1]): float(row[2]) for row in cur.fetchall()}
+        
+        cur.execute("""
+            SELECT *
+            FROM market_running_stats
+            WHERE server_id = %s AND (object_gid, batch_size) IN %s
+            FOR UPDATE
+        """, (server_id, keys))
+        columns = [col[0] for col in cur.description]
+        running = {}
+        for row in cur.fetchall():
+            stats = MarketRunningStats.from_row(dict(zip(columns, row)))
+            running[(stats.object_gid, stats.batch_size)] = stats
+        
+        for gid, batch_size, price, created_at, sold_at in sorted(sales, key=lambda sale: sale[4]):
+            stats = running.get((gid, batch_size))
+            if stats is None:
+                stats = running[(gid, batch_size)] = MarketRunningStats(server_id, gid, batch_size)
+            stats.add_sale(float(price), float(created_at), float(sold_at), taxes.get((gid, batch_size), 0.0))
+        
+        self._upsert_running_stats(cur, list(running.values()))
+
+    def _upsert_running_stats(self, cur, stats: List[MarketRunningStats]):
+        columns = MarketRunningStats.COLUMNS + ("updated_at",)
+        updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in columns[3:])
+        current_time = self.get_current_time()
+        psycopg2.extras.execute_values(
+            cur,
+            f"""
+            INSERT INTO market_running_stats ({", ".join(columns)})
+            VALUES %s
+            ON CONFLICT (server_id, object_gid, batch_size) DO UPDATE SET {updates}
+            """,
+            [s.to_row() + (current_time,) for s in stats],
+            page_size=500
+        )
+
+    def save_running_stats(self, stats: List[MarketRunningStats]) -> bool:
+        """Replace the running stats of the given items, used to reconcile them with the full history"""
+        if not stats:
+            return True
+        with self._lock:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    try:
+                        self._upsert_running_stats(cur, stats)
+                        conn.commit()
+                        return True
+                    except Exception as e:
+                        self.logger.error(f"Database error in save_running_stats: {e}", exc_info=e)
+                        conn.rollback()
+                        return False
+
+    def get_running_stats(self, server_id: int, object_gid: int, batch_size: int) -> Optional[MarketRunningStats]:
+        """Running stats of an item, None if none of its sales was recorded yet"""
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                try:
+                    cur.execute("""
+                        SELECT *
+                        FROM market_running_stats
+                        WHERE server_id = %s AND object_gid = %s AND batch_size = %s
+                    """, (server_id, object_gid, batch_size))
+                    
+                    row = cur.fetchone()
+                    return MarketRunningStats.from_row(row) if row else None
+                    
+                except Exception as e:
+                    self.logger.error(f"Database error in get_running_stats: {e}", exc_info=e)
+                    return None
+
+    def get_running_stats_bulk(self, keys: List[Tuple[int, int, int]]) -> Dict[Tuple[int, int, int], MarketRunningStats]:
+        """Running stats of many (server_id, object_gid, batch_size) at once, items without sales are left out"""
+        if not keys:
+            return {}
+        with self.get_connection() as conn:
+            with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                try:
+                    cur.execute("""
+                        SELECT *
+                        FROM market_running_stats
+                        WHERE (server_id, object_gid, batch_size) IN %s
+                    """, (tuple(keys),))
+                    
+                    return {
+                        (row["server_id"], row["object_gid"], row["batch_size"]): MarketRunningStats.from_row(row)
+                        for row in cur.fetchall()
+                    }
+                    
+                except Exception as e:
+                    self.logger.error(f"Database error in get_running_stats_bulk: {e}", exc_info=e)
+                    return {}
+
+    def mark_bids_as_sold_bulk(self, server_id: int, sales: List[Dict]) -> List[int]:
+        """
+        Mark sold the bids matching a list of sales {'object_gid', 'batch_size', 'price', 'sold_at'} in one update.
+        Sales of the same item and price take the matching unsold bids from the oldest, like mark_bid_as_sold.
+        Returns the uids of the bids marked as sold
+        """
+        if not sales:
+            return []
+            
+        with self._lock:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    try:
+                        values = [(
+                            server_id,
+                            sale['object_gid'],
+                            sale['batch_size'],
+                            sale['price'],
+                            sale['sold_at'],
+                            sale_order
+                        ) for sale_order, sale in enumerate(sales)]
+                        
+                        # n-th sale of an (item, price) is matched with the n-th oldest unsold bid of that (item, price)
+                        rows = psycopg2.extras.execute_values(
+                            cur,
+                            """
+                            WITH sales AS (
+                                SELECT 
+                                    s.*,
+                                    row_number() OVER (
+                                        PARTITION BY object_gid, batch_size, price ORDER BY sold_at, sale_order
+                                    ) AS match_rank
+                                FROM (VALUES %s) AS s(server_id, object_gid, batch_size, price, sold_at, sale_order)
+                            ),
+                            candidates AS (
+                                SELECT 
+                                    locked.id,
+                                    locked.object_gid,
+                                    locked.batch_size,
+                                    locked.price,
+                                    row_number() OVER (
+                                        PARTITION BY locked.object_gid, locked.batch_size, locked.price
+                                        ORDER BY locked.created_at, locked.id
+                                    ) AS match_rank
+                                FROM (
+                                    SELECT id, object_gid, batch_size, price, created_at
+                                    FROM bids
+                                    WHERE sold_at IS NULL
+                                    AND (server_id, object_gid, batch_size, price) IN (
+                                        SELECT server_id, object_gid, batch_size, price FROM sales
+                                    )
+                                    FOR UPDATE
+                                ) AS locked
+                            )
+                            UPDATE bids
+                            SET sold_at = to_timestamp(sales.sold_at)
+                            FROM candidates
+                            JOIN sales USING (object_gid, batch_size, price, match_rank)
+                            WHERE bids.id = candidates.id
+                            RETURNING 
+                                bids.uid,
+                                bids.object_gid,
+                                bids.batch_size,
+                                bids.price,
+                                EXTRACT(EPOCH FROM bids.created_at)::float8,
+                                sales.sold_at
+                            """,
+                            values,
+                            page_size=len(values),
+                            fetch=True
+                        )
+                        
+                        self._add_sales_to_running_stats(cur, server_id, [row[1:] for row in rows])
+                        conn.commit()
+                        return [row[0] for row in rows]
+                        
+                    except Exception as e:
+                        self.logger.error(f"Database error in mark_bids_as_sold_bulk: {e}", exc_info=e)
+                        conn.rollback()
+                        return []
+
+    def add_market_stats_bulk(self, all_stats: List["MarketStats"]) -> int:
+        """
+        Bulk insert market statistics snapshots
+        Returns number of inserted rows
+        """
+        if not all_stats:
+            return 0
+            
+        with self._lock:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    try:
+                        columns = (
+                            "server_id", "object_gid", "item_name", "batch_size", "calculated_at",
+                            "num_samples", "mean_time_to_sell", "std_time_to_sell", "exp_rate",
+                            "mean_price", "std_price", "median_price",
+                            "mean_tax", "std_tax", "sales_rate",
+                            "mean_profit_per_hour", "std_profit_per_hour", "p95_profit_per_hour"
+                        )
+                        psycopg2.extras.execute_values(
+                            cur,
+                            f"INSERT INTO market_statistics ({', '.join(columns)}) VALUES %s",
+                            [tuple(getattr(stats, col) for col in columns) for stats in all_stats],
+                            page_size=1000
+                        )
+                        
+                        conn.commit()
+                        return len(all_stats)
+                        
+                    except Exception as e:
+                        self.logger.error(f"Database error in add_market_stats_bulk: {e}", exc_info=e)
+                        conn.rollback()
+                        return 0
+
     def record_tax_payment(self,
                           object_gid: int,
                           batch_size: int,
@@ -138,15 +138,16 @@ class MarketPersistenceManager(AbstractBehavior):
     
     def _on_offline_sales(self, event, sales_data: list["ObjectItemQuantityPriceDateEffects"]):
         """Handle offline sales processing"""
-        try:            
-            for item in sales_data:
-                self.persister.mark_bid_as_sold(
-                    server_id=PlayerManager().server.id,
-                    object_gid=item.objectGID,
-                    batch_size=item.quantity,
-                    price=item.price,
-                    sold_at=item.date
-                )
+        try:
+            self.persister.mark_bids_as_sold_bulk(
+                server_id=PlayerManager().server.id,
+                sales=[{
+                    'object_gid': item.objectGID,
+                    'batch_size': item.quantity,
+                    'price': item.price,
+                    'sold_at': item.date
+                } for item in sales_data]
+            )
         except Exception as e:
             self.logger.error(f"Failed to process offline sales: {e}")
             raise
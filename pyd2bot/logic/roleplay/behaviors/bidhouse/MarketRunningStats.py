@@ -0,0 +1,227 @@
+import bisect
+import json
+import math
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 24 * 3600
+
+
+class P2Quantile:
+    """
+    Streaming quantile estimate with the P² algorithm (Jain & Chlamtac), five markers whatever the number
+    of observations. The first five observations are kept as is and give exact quantiles.
+    """
+
+    def __init__(self, p: float, n: int = 0, heights: List[float] = None, positions: List[int] = None):
+        self.p = p
+        self.n = n
+        self.heights = list(heights or [])
+        self.positions = list(positions or [])
+        self._dp = (0.0, p / 2, p, (1 + p) / 2, 1.0)
+
+    @classmethod
+    def seeded(cls, p: float, n: int, markers: Optional[Sequence[float]], raw: Optional[Sequence[float]]) -> "P2Quantile":
+        """
+        Rebuild a sketch from exact data, `markers` are the exact quantiles at 0, p/2, p, (1+p)/2 and 1,
+        `raw` the sorted observations when there are fewer than five of them.
+        """
+        if n < 5:
+            return cls(p, n, sorted(raw or []))
+        sketch = cls(p, n, list(markers))
+        positions = []
+        for i, dp in enumerate(sketch._dp):
+            position = max(round(1 + (n - 1) * dp), positions[-1] + 1 if positions else 1)
+            positions.append(min(position, n - 4 + i))
+        sketch.positions = positions
+        return sketch
+
+    def add(self, x: float):
+        q, pos = self.heights, self.positions
+        if self.n < 5:
+            bisect.insort(q, x)
+            self.n += 1
+            if self.n == 5:
+                self.positions = [1, 2, 3, 4, 5]
+            return
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        self.n += 1
+        for i in (1, 2, 3):
+            d = 1 + (self.n - 1) * self._dp[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                d = 1 if d > 0 else -1
+                candidate = self._parabolic(i, d)
+                if q[i - 1] < candidate < q[i + 1]:
+                    q[i] = candidate
+                else:
+                    q[i] += d * (q[i + d] - q[i]) / (pos[i + d] - pos[i])
+                pos[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def value(self) -> float:
+        if self.n == 0:
+            return 0.0
+        if self.n < 5:
+            # Same linear interpolation as np.percentile
+            rank = self.p * (self.n - 1)
+            lower = math.floor(rank)
+            upper = min(lower + 1, self.n - 1)
+            return self.heights[lower] + (self.heights[upper] - self.heights[lower]) * (rank - lower)
+        return self.heights[2]
+
+    def to_json(self) -> str:
+        return json.dumps({"p": self.p, "n": self.n, "q": self.heights, "pos": self.positions})
+
+    @classmethod
+    def from_json(cls, data) -> "P2Quantile":
+        if isinstance(data, str):
+            data = json.loads(data)
+        return cls(data["p"], data["n"], data["q"], data["pos"])
+
+
+@dataclass
+class MarketRunningStats:
+    """
+    Running aggregates of the sales of one (server_id, object_gid, batch_size), updated sale by sale.
+
+    Profit per hour is (price - tax) / time_to_sell, its sums are kept without the tax
+    (price/t, 1/t, price²/t², price/t², 1/t²) so mean and std are exact for whatever `mean_tax` is current.
+    Times to sell are in hours, sold dates in epoch seconds.
+    """
+
+    COLUMNS = (
+        "server_id", "object_gid", "batch_size", "num_samples",
+        "sum_price", "sumsq_price", "sum_time_to_sell", "sumsq_time_to_sell",
+        "num_profit_samples", "sum_price_per_hour", "sum_inv_time", "sumsq_price_per_hour",
+        "sum_price_per_hour2", "sumsq_inv_time", "mean_tax",
+        "first_sold_at", "last_sold_at", "median_price_sketch", "p95_profit_sketch",
+    )
+
+    server_id: int
+    object_gid: int
+    batch_size: int
+    num_samples: int = 0
+    sum_price: float = 0.0
+    sumsq_price: float = 0.0
+    sum_time_to_sell: float = 0.0
+    sumsq_time_to_sell: float = 0.0
+    num_profit_samples: int = 0
+    sum_price_per_hour: float = 0.0
+    sum_inv_time: float = 0.0
+    sumsq_price_per_hour: float = 0.0
+    sum_price_per_hour2: float = 0.0
+    sumsq_inv_time: float = 0.0
+    mean_tax: float = 0.0
+    first_sold_at: Optional[float] = None
+    last_sold_at: Optional[float] = None
+    median_price_sketch: P2Quantile = field(default_factory=lambda: P2Quantile(0.5))
+    p95_profit_sketch: P2Quantile = field(default_factory=lambda: P2Quantile(0.95))
+
+    def add_sale(self, price: float, created_at: float, sold_at: float, tax: float):
+        seconds_to_sell = sold_at - created_at
+        time_to_sell = seconds_to_sell / SECONDS_PER_HOUR
+        self.num_samples += 1
+        self.sum_price += price
+        self.sumsq_price += price * price
+        self.sum_time_to_sell += time_to_sell
+        self.sumsq_time_to_sell += time_to_sell * time_to_sell
+        self.mean_tax = tax
+        self.median_price_sketch.add(price)
+        if seconds_to_sell > 0:
+            inv_time = 1 / time_to_sell
+            self.num_profit_samples += 1
+            self.sum_price_per_hour += price * inv_time
+            self.sum_inv_time += inv_time
+            self.sumsq_price_per_hour += (price * inv_time) ** 2
+            self.sum_price_per_hour2 += price * inv_time * inv_time
+            self.sumsq_inv_time += inv_time * inv_time
+            self.p95_profit_sketch.add((price - tax) * inv_time)
+        self.first_sold_at = sold_at if self.first_sold_at is None else min(self.first_sold_at, sold_at)
+        self.last_sold_at = sold_at if self.last_sold_at is None else max(self.last_sold_at, sold_at)
+
+    @staticmethod
+    def _std(n: int, total: float, total_sq: float) -> float:
+        if n == 0:
+            return 0.0
+        mean = total / n
+        return math.sqrt(max(total_sq / n - mean * mean, 0.0))
+
+    @property
+    def mean_price(self) -> float:
+        return self.sum_price / self.num_samples if self.num_samples else 0.0
+
+    @property
+    def std_price(self) -> float:
+        return self._std(self.num_samples, self.sum_price, self.sumsq_price)
+
+    @property
+    def median_price(self) -> float:
+        return self.median_price_sketch.value()
+
+    @property
+    def mean_time_to_sell(self) -> float:
+        return self.sum_time_to_sell / self.num_samples if self.num_samples else 0.0
+
+    @property
+    def std_time_to_sell(self) -> float:
+        return self._std(self.num_samples, self.sum_time_to_sell, self.sumsq_time_to_sell)
+
+    @property
+    def exp_rate(self) -> float:
+        mean_time = self.mean_time_to_sell
+        return 1 / mean_time if mean_time > 0 else 0.0
+
+    @property
+    def sales_rate(self) -> float:
+        """Sales per day between the first and last sale"""
+        if self.num_samples < 2:
+            return 0.0
+        span_days = (self.last_sold_at - self.first_sold_at) / SECONDS_PER_DAY
+        return self.num_samples / span_days if span_days > 0 else 0.0
+
+    @property
+    def mean_profit_per_hour(self) -> float:
+        if not self.num_profit_samples:
+            return 0.0
+        return (self.sum_price_per_hour - self.mean_tax * self.sum_inv_time) / self.num_profit_samples
+
+    @property
+    def std_profit_per_hour(self) -> float:
+        if not self.num_profit_samples:
+            return 0.0
+        tax = self.mean_tax
+        total_sq = self.sumsq_price_per_hour - 2 * tax * self.sum_price_per_hour2 + tax * tax * self.sumsq_inv_time
+        return self._std(self.num_profit_samples, self.sum_price_per_hour - tax * self.sum_inv_time, total_sq)
+
+    @property
+    def p95_profit_per_hour(self) -> float:
+        return self.p95_profit_sketch.value()
+
+    def to_row(self) -> tuple:
+        return tuple(
+            getattr(self, column).to_json() if column.endswith("_sketch") else getattr(self, column)
+            for column in self.COLUMNS
+        )
+
+    @classmethod
+    def from_row(cls, row: dict) -> "MarketRunningStats":
+        values = {column: row[column] for column in cls.COLUMNS}
+        values["median_price_sketch"] = P2Quantile.from_json(values["median_price_sketch"])
+        values["p95_profit_sketch"] = P2Quantile.from_json(values["p95_profit_sketch"])
+        return cls(**values)
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 24 * 3600
+
+
+@dataclass
+class SalesColumns:
+    """Sold bids as parallel column arrays, timestamps are epoch seconds"""
+    server_id: np.ndarray
+    object_gid: np.ndarray
+    batch_size: np.ndarray
+    price: np.ndarray
+    created_at: np.ndarray
+    sold_at: np.ndarray
+
+    @classmethod
+    def from_rows(cls, rows: List[tuple]) -> "SalesColumns":
+        """Build from (server_id, object_gid, batch_size, price, created_at_epoch, sold_at_epoch) rows"""
+        data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        return cls(
+            server_id=data[:, 0].astype(np.int64),
+            object_gid=data[:, 1].astype(np.int64),
+            batch_size=data[:, 2].astype(np.int64),
+            price=data[:, 3],
+            created_at=data[:, 4],
+            sold_at=data[:, 5],
+        )
+
+    def __len__(self):
+        return len(self.price)
+
+
+@dataclass
+class GroupStats:
+    """Statistics of every (server_id, object_gid, batch_size) group, one array entry per group"""
+    server_id: np.ndarray
+    object_gid: np.ndarray
+    batch_size: np.ndarray
+    num_samples: np.ndarray
+    mean_time_to_sell: np.ndarray
+    std_time_to_sell: np.ndarray
+    exp_rate: np.ndarray
+    mean_price: np.ndarray
+    std_price: np.ndarray
+    median_price: np.ndarray
+    mean_tax: np.ndarray
+    sales_rate: np.ndarray
+    mean_profit_per_hour: np.ndarray
+    std_profit_per_hour: np.ndarray
+    p95_profit_per_hour: np.ndarray
+
+    def __len__(self):
+        return len(self.num_samples)
+
+    def key(self, i: int) -> Tuple[int, int, int]:
+        return int(self.server_id[i]), int(self.object_gid[i]), int(self.batch_size[i])
+
+
+def _segment_mean_std(values: np.ndarray, starts: np.ndarray, counts: np.ndarray, group_ids: np.ndarray):
+    """Mean and population std of contiguous segments, two pass like np.std"""
+    mean = np.add.reduceat(values, starts) / counts
+    dev = values - mean[group_ids]
+    std = np.sqrt(np.add.reduceat(dev * dev, starts) / counts)
+    return mean, std
+
+
+def _lerp(a: np.ndarray, b: np.ndarray, t: np.ndarray) -> np.ndarray:
+    # Same formulation as numpy's linear percentile interpolation
+    diff = b - a
+    res = a + diff * t
+    return np.where(t >= 0.5, b - diff * (1 - t), res)
+
+
+def compute_group_stats(sales: SalesColumns, taxes: Dict[Tuple[int, int, int], float]) -> GroupStats:
+    """
+    Compute the market statistics of every group in one pass over sorted columns.
+
+    Rows are sorted once by (server_id, object_gid, batch_size, price) and every statistic is a segment
+    reduction over that order, the profit per hour statistics use a second sort of the rows that have a
+    positive time to sell.
+    """
+    if len(sales) == 0:
+        empty_i = np.empty(0, dtype=np.int64)
+        empty_f = np.empty(0, dtype=np.float64)
+        return GroupStats(empty_i, empty_i, empty_i, empty_i, *([empty_f] * 11))
+
+    order = np.lexsort((sales.price, sales.batch_size, sales.object_gid, sales.server_id))
+    server_id = sales.server_id[order]
+    object_gid = sales.object_gid[order]
+    batch_size = sales.batch_size[order]
+    price = sales.price[order]
+    created_at = sales.created_at[order]
+    sold_at = sales.sold_at[order]
+    n = len(price)
+
+    boundary = np.empty(n, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = (
+        (server_id[1:] != server_id[:-1])
+        | (object_gid[1:] != object_gid[:-1])
+        | (batch_size[1:] != batch_size[:-1])
+    )
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, n))
+    group_ids = np.cumsum(boundary) - 1
+    n_groups = len(starts)
+
+    group_server = server_id[starts]
+    group_gid = object_gid[starts]
+    group_batch = batch_size[starts]
+    group_tax = np.array(
+        [taxes.get((int(s), int(g), int(b)), 0) for s, g, b in zip(group_server, group_gid, group_batch)],
+        dtype=np.float64,
+    )
+
+    # Time to sell in hours
+    seconds_to_sell = sold_at - created_at
+    times_to_sell = seconds_to_sell / SECONDS_PER_HOUR
+    mean_tts, std_tts = _segment_mean_std(times_to_sell, starts, counts, group_ids)
+    with np.errstate(divide="ignore"):
+        exp_rate = 1 / mean_tts
+
+    # Prices, rows are sorted by price inside each group
+    mean_price, std_price = _segment_mean_std(price, starts, counts, group_ids)
+    median_price = (price[starts + (counts - 1) // 2] + price[starts + counts // 2]) / 2
+
+    # Sales rate (sales per day) over the span between the first and last sale
+    span_days = (np.maximum.reduceat(sold_at, starts) - np.minimum.reduceat(sold_at, starts)) / SECONDS_PER_DAY
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sales_rate = np.where((counts >= 2) & (span_days > 0), counts / span_days, 0.0)
+
+    # Profits per hour, only for sales with a positive time to sell
+    positive = seconds_to_sell > 0
+    pph_groups = group_ids[positive]
+    pph = (price[positive] - group_tax[pph_groups]) / times_to_sell[positive]
+    pph_order = np.lexsort((pph, pph_groups))
+    pph = pph[pph_order]
+    pph_groups = pph_groups[pph_order]
+    pph_counts = np.bincount(pph_groups, minlength=n_groups)
+    has_pph = pph_counts > 0
+    pph_starts = np.concatenate(([0], np.cumsum(pph_counts)[:-1]))
+
+    mean_pph = np.zeros(n_groups)
+    std_pph = np.zeros(n_groups)
+    p95_pph = np.zeros(n_groups)
+    if has_pph.any():
+        starts_nz = pph_starts[has_pph]
+        counts_nz = pph_counts[has_pph]
+        local_ids = np.cumsum(has_pph)[pph_groups] - 1
+        mean_nz, std_nz = _segment_mean_std(pph, starts_nz, counts_nz, local_ids)
+        mean_pph[has_pph] = mean_nz
+        std_pph[has_pph] = std_nz
+        position = 0.95 * (counts_nz - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, counts_nz - 1)
+        p95_pph[has_pph] = _lerp(pph[starts_nz + lower], pph[starts_nz + upper], position - lower)
+
+    return GroupStats(
+        server_id=group_server,
+        object_gid=group_gid,
+        batch_size=group_batch,
+        num_samples=counts,
+        mean_time_to_sell=mean_tts,
+        std_time_to_sell=std_tts,
+        exp_rate=exp_rate,
+        mean_price=mean_price,
+        std_price=std_price,
+        median_price=median_price,
+        mean_tax=group_tax,
+        sales_rate=sales_rate,
+        mean_profit_per_hour=mean_pph,
+        std_profit_per_hour=std_pph,
+        p95_profit_per_hour=p95_pph,
+    )
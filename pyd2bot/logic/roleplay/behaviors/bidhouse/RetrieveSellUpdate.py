@@ -117,6 +117,7 @@ class RetrieveSellUpdate(AbstractBehavior):
             self.autoTrip(
                 self._start_map_id,
                 dstZoneId=self._start_zone,
+                kamas_budget=self.tripKamasBudget,
                 callback=lambda *_: self.finish(self._finish_code, self._finish_error),
             )
         else:
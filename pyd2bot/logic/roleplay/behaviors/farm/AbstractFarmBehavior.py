@@ -1,7 +1,7 @@
 import os
 import threading
 from time import perf_counter
-from typing import Any, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 
 from pyd2bot.farmPaths.CyclicFarmPath import CyclicFarmPath
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
@@ -11,6 +11,7 @@ from pyd2bot.logic.roleplay.behaviors.movement.ChangeMap import ChangeMap
 from pyd2bot.logic.roleplay.behaviors.skill.UseSkill import UseSkill
 from pyd2bot.farmPaths.AbstractFarmPath import AbstractFarmPath
 from pyd2bot.farmPaths.RandomAreaFarmPath import NoTransitionFound
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.berilia.managers.KernelEventsManager import KernelEventsManager
 from pydofus2.com.ankamagames.dofus.internalDatacenter.items.ItemWrapper import ItemWrapper
@@ -24,7 +25,7 @@ from pydofus2.com.ankamagames.dofus.network.types.game.context.roleplay.job.JobE
 from pydofus2.com.ankamagames.dofus.uiApi.PlayedCharacterApi import PlayedCharacterApi
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 if TYPE_CHECKING:
-    pass
+    from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Edge import Edge
 
 CURR_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -41,6 +42,7 @@ class AbstractFarmBehavior(AbstractBehavior):
         self.forbiddenActions = set()
         self.forbiddenEdges = set()
         self._currEdge = None
+        self._nextEdge = None
         self._deactivate_riding = False
         self._stop_sig = threading.Event()
         self._moving_to_next_step = False
@@ -161,7 +163,8 @@ class AbstractFarmBehavior(AbstractBehavior):
             return
 
         try:
-            self._currEdge = self.path.getNextEdge(self.forbiddenEdges, onlyNonRecent=True)
+            self._currEdge = self._planNextEdge()
+            self._nextEdge = None
         except NoTransitionFound:
             Logger().error(f"No next vertex found in path, player is stuck!")
             if PlayedCharacterManager().currVertex in self.path:
@@ -185,6 +188,34 @@ class AbstractFarmBehavior(AbstractBehavior):
         )
         return self._currEdge
 
+    def _planNextEdge(self) -> "Edge":
+        """Edge the farmer will leave the current map by, chosen ahead so the work on the map can end near it"""
+        edge = self._nextEdge
+        if (
+            edge is None
+            or edge in self.forbiddenEdges
+            or edge.src != PlayedCharacterManager().currVertex
+            or EdgeHealthStore.isBroken(edge)
+        ):
+            try:
+                edge = self.path.getNextEdge(self.forbiddenEdges | set(EdgeHealthStore.brokenEdges()), onlyNonRecent=True)
+            except NoTransitionFound:
+                # Every way out failed lately for some bot, still better than being stuck
+                edge = self.path.getNextEdge(self.forbiddenEdges, onlyNonRecent=True)
+            self._nextEdge = edge
+        return edge
+
+    def _exitCellId(self) -> Optional[int]:
+        """Cell of the transition the next edge leaves the map from, None when unknown"""
+        try:
+            edge = self._planNextEdge()
+        except NoTransitionFound:
+            return None
+        for tr in edge.transitions:
+            if tr.isValid and tr.cell is not None and tr.cell >= 0:
+                return tr.cell
+        return None
+
     def _on_out_of_path(self):
         Logger().warning(f"Bot is out of farm path, searching path to previous vertex...")
         if not PlayedCharacterManager().currVertex:
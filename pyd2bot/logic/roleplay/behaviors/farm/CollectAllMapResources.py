@@ -6,6 +6,7 @@ from prettytable import PrettyTable
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
 from pyd2bot.logic.roleplay.behaviors.farm.CollectableResource import \
     CollectableResource
+from pyd2bot.logic.roleplay.behaviors.farm.HarvestRoute import HarvestRoute
 from pyd2bot.logic.roleplay.behaviors.farm.ResourcesTracker import ResourceTracker
 from pyd2bot.logic.roleplay.behaviors.inventory.UseItemsByType import UseItemsByType
 from pyd2bot.logic.roleplay.behaviors.skill.UseSkill import UseSkill
@@ -33,6 +34,7 @@ class CollectAllMapResources(AbstractBehavior):
         self.jobFilters = jobFilters
         self.currentTarget: CollectableResource = None
         self.forbiddenActions = set()
+        self.harvestRoute = HarvestRoute()
         self._stop_sig = threading.Event()
         self.inFight = threading.Event()
 
@@ -103,7 +105,7 @@ class CollectAllMapResources(AbstractBehavior):
             Logger().info("No farmable resource found")
             self.finish(0)
         else:
-            nonForbiddenResources.sort(key=lambda r: r.distance)
+            nonForbiddenResources = self.harvestRoute.order(nonForbiddenResources, PlayedCharacterManager().currentCellId)
             self.logResourcesTable(nonForbiddenResources)
             self.currentTarget = nonForbiddenResources[0]
             self.currentVertex = PlayedCharacterManager().currVertex
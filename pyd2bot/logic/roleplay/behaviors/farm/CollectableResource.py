@@ -2,6 +2,8 @@
 from typing import TYPE_CHECKING, List
 
 from pyd2bot.data.models import JobFilter
+from pyd2bot.logic.roleplay.behaviors.farm.MapResourceDistances import \
+    MapResourceDistances
 from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import \
     MapDisplayManager
 from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
@@ -9,8 +11,6 @@ from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterMa
 from pydofus2.com.ankamagames.dofus.logic.game.roleplay.frames.RoleplayInteractivesFrame import \
     CollectableElement
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
-from pydofus2.com.ankamagames.jerakine.pathfinding.Pathfinding import \
-    PathFinding
 
 if TYPE_CHECKING:
     from pyd2bot.logic.roleplay.behaviors.farm.AbstractFarmBehavior import \
@@ -40,24 +40,14 @@ class CollectableResource:
 
     @property
     def distance(self):
-        movePath = PathFinding().findPath(PlayedCharacterManager().entity.position, self.position)
-        if movePath is None:
-            return -1
-        return len(movePath.path)
+        return MapResourceDistances().lookup(self.resource.id, self.position)[1]
 
     @property
     def nearestCell(self):
         if not self._nearestCell:
-            playerEntity = PlayedCharacterManager().entity
-            if playerEntity is None:
+            self._nearestCell = MapResourceDistances().lookup(self.resource.id, self.position)[0]
+            if self._nearestCell is None:
                 Logger().debug("Player entity not found!")
-                self._nearestCell = None
-                return None
-            movePath = PathFinding().findPath(playerEntity.position, self.position)
-            if movePath is None:
-                self._nearestCell = None
-                return None
-            self._nearestCell = movePath.end
         return self._nearestCell
 
     @property
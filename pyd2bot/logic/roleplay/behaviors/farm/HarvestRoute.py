@@ -0,0 +1,138 @@
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from pyd2bot.logic.roleplay.behaviors.movement.MapCellGraph import MapCellGraph
+from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import \
+    MapDisplayManager
+
+if TYPE_CHECKING:
+    from pyd2bot.logic.roleplay.behaviors.farm.CollectableResource import \
+        CollectableResource
+
+# Steps counted for a leg that can't be walked, keeps such legs last without breaking the sums
+UNREACHABLE_STEPS = 1000
+
+
+class HarvestRoute:
+    """
+    Order to harvest the resources of a map in, walking the least overall instead of always going to the nearest
+    resource next.
+
+    Walking distances between interaction cells come from flood fills of the map cell graph, kept for the whole
+    map visit. The order is solved exactly (Held-Karp) for up to EXACT_MAX resources, by nearest neighbour
+    improved with 2-opt above that. When an end cell is given, usually the exit of the next edge, the walk from
+    the last resource to it is part of the cost.
+    """
+
+    EXACT_MAX = 10
+
+    def __init__(self):
+        self._mapId = None
+        self._floods: Dict[int, List[int]] = {}
+
+    def _steps(self, mapId: int, cellId: int) -> List[int]:
+        if mapId != self._mapId:
+            self._mapId = mapId
+            self._floods.clear()
+        steps = self._floods.get(cellId)
+        if steps is None:
+            steps = self._floods[cellId] = MapCellGraph.flood(mapId, cellId)
+        return steps
+
+    def order(
+        self, resources: List["CollectableResource"], startCellId: int, endCellId: Optional[int] = None
+    ) -> List["CollectableResource"]:
+        if len(resources) <= 1:
+            return list(resources)
+        dataMap = MapDisplayManager().dataMap
+        if dataMap is None:
+            return sorted(resources, key=lambda r: r.distance)
+        mapId = dataMap.id
+
+        def walk(steps: List[int], cellId: int) -> int:
+            return steps[cellId] if steps[cellId] != -1 else UNREACHABLE_STEPS
+
+        cells = [r.nearestCell.cellId for r in resources]
+        floods = [self._steps(mapId, cellId) for cellId in cells]
+        fromStart = [walk(self._steps(mapId, startCellId), cellId) for cellId in cells]
+        toEnd = [walk(steps, endCellId) if endCellId is not None else 0 for steps in floods]
+        dist = [[walk(floods[i], cellId) for cellId in cells] for i in range(len(cells))]
+
+        if len(resources) <= self.EXACT_MAX:
+            route = self.solveExact(dist, fromStart, toEnd)
+        else:
+            route = self.solveTwoOpt(dist, fromStart, toEnd)
+        return [resources[i] for i in route]
+
+    @staticmethod
+    def routeCost(route: List[int], dist: List[List[int]], fromStart: List[int], toEnd: List[int]) -> int:
+        cost = fromStart[route[0]] + toEnd[route[-1]]
+        for a, b in zip(route, route[1:]):
+            cost += dist[a][b]
+        return cost
+
+    @staticmethod
+    def solveExact(dist: List[List[int]], fromStart: List[int], toEnd: List[int]) -> List[int]:
+        """Held-Karp over the open path starting from the player"""
+        n = len(fromStart)
+        full = (1 << n) - 1
+        inf = float("inf")
+        cost = [[inf] * n for _ in range(1 << n)]
+        parent = [[-1] * n for _ in range(1 << n)]
+        for j in range(n):
+            cost[1 << j][j] = fromStart[j]
+        for mask in range(1, 1 << n):
+            row = cost[mask]
+            for j in range(n):
+                c = row[j]
+                if c == inf:
+                    continue
+                distJ = dist[j]
+                for k in range(n):
+                    if mask >> k & 1:
+                        continue
+                    nextMask = mask | 1 << k
+                    nc = c + distJ[k]
+                    if nc < cost[nextMask][k]:
+                        cost[nextMask][k] = nc
+                        parent[nextMask][k] = j
+        last = min(range(n), key=lambda j: cost[full][j] + toEnd[j])
+        route = []
+        mask = full
+        while last != -1:
+            route.append(last)
+            last, mask = parent[mask][last], mask & ~(1 << last)
+        route.reverse()
+        return route
+
+    @classmethod
+    def solveTwoOpt(cls, dist: List[List[int]], fromStart: List[int], toEnd: List[int]) -> List[int]:
+        """Nearest neighbour route from the player, then 2-opt segment reversals while they shorten it"""
+        n = len(fromStart)
+        left = set(range(n))
+        route = [min(left, key=lambda j: fromStart[j])]
+        left.remove(route[0])
+        while left:
+            nearest = min(left, key=lambda j: dist[route[-1]][j])
+            route.append(nearest)
+            left.remove(nearest)
+
+        # None stands for the player cell before the route and the end cell after it
+        def w(a: Optional[int], b: Optional[int]) -> int:
+            if a is None:
+                return fromStart[b]
+            if b is None:
+                return toEnd[a]
+            return dist[a][b]
+
+        improved = True
+        while improved:
+            improved = False
+            for i in range(n - 1):
+                prev = route[i - 1] if i > 0 else None
+                for k in range(i + 1, n):
+                    nxt = route[k + 1] if k + 1 < n else None
+                    delta = w(prev, route[k]) + w(route[i], nxt) - w(prev, route[i]) - w(route[k], nxt)
+                    if delta < 0:
+                        route[i:k + 1] = reversed(route[i:k + 1])
+                        improved = True
+        return route
@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional, Tuple
+
+from pyd2bot.logic.roleplay.behaviors.movement.MapCellGraph import MapCellGraph
+from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import \
+    MapDisplayManager
+from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
+    PlayedCharacterManager
+from pydofus2.com.ankamagames.jerakine.metaclass.Singleton import Singleton
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+
+
+class MapResourceDistances(metaclass=Singleton):
+    """
+    Walking distance from the player to the interactive elements of the map, and the cell to use them from.
+
+    A single flood fill from the player cell serves every element, it is redone only once the player changed
+    cell or map. The cell of an element is the walkable cell closest to it, the nearest to the player on ties,
+    which is where a path finding toward the element would end.
+    """
+
+    def __init__(self):
+        self._key = None
+        self._steps: List[int] = []
+        self._reached: List[Tuple[int, MapPoint]] = []
+        self._byElement: Dict[int, Tuple[Optional[MapPoint], int]] = {}
+
+    def _refresh(self) -> bool:
+        playerEntity = PlayedCharacterManager().entity
+        dataMap = MapDisplayManager().dataMap
+        if playerEntity is None or dataMap is None:
+            self._key = None
+            return False
+        cellId = playerEntity.position.cellId
+        key = (dataMap.id, cellId)
+        if key != self._key:
+            self._key = key
+            self._steps = MapCellGraph.flood(dataMap.id, cellId)
+            self._reached = [(c, MapPoint.fromCellId(c)) for c, steps in enumerate(self._steps) if steps != -1]
+            self._byElement.clear()
+        return True
+
+    def lookup(self, elementId: int, position: MapPoint) -> Tuple[Optional[MapPoint], int]:
+        """(cell to use the element from, steps to walk there), (None, -1) if the player isn't on the map"""
+        if not self._refresh() or position is None:
+            return None, -1
+        result = self._byElement.get(elementId)
+        if result is None:
+            steps = self._steps
+            cellId, point = min(self._reached, key=lambda r: (r[1].distanceTo(position), steps[r[0]]))
+            result = self._byElement[elementId] = (point, steps[cellId])
+        return result
@@ -2,10 +2,12 @@ from typing import List
 from prettytable import PrettyTable
 
 from pyd2bot.farmPaths.CyclicFarmPath import CyclicFarmPath
+from pyd2bot.farmPaths.RandomAreaFarmPath import RandomAreaFarmPath
 from pyd2bot.logic.roleplay.behaviors.farm.AbstractFarmBehavior import \
     AbstractFarmBehavior
 from pyd2bot.logic.roleplay.behaviors.farm.CollectableResource import \
     CollectableResource
+from pyd2bot.logic.roleplay.behaviors.farm.HarvestRoute import HarvestRoute
 from pyd2bot.logic.roleplay.behaviors.farm.ResourcesTracker import ResourceTracker
 from pyd2bot.logic.roleplay.behaviors.inventory.UseItemsByType import UseItemsByType
 from pyd2bot.logic.roleplay.behaviors.skill.UseSkill import UseSkill
@@ -37,9 +39,13 @@ class ResourceFarm(AbstractFarmBehavior):
         self.deadEnds = set()
         self.resource_tracker = ResourceTracker(expiration_days=30)
         self.session_paused = False  # Track session pause state locally
+        self.harvestRoute = HarvestRoute()
 
     def init(self):
         self.path.init()
+        if isinstance(self.path, RandomAreaFarmPath) and self.path.weightedExploration:
+            resourcesIds = [resId for jobFilter in self.jobFilters for resId in jobFilter.gatheredResourcesIds()]
+            self.path.setYieldEstimator(resourcesIds, self.resource_tracker.get_resource_density)
         self.currentTarget: CollectableResource = None
         self.current_session_id = self.resource_tracker.start_farm_session(self.path.name)
         self.session_resources = {}
@@ -108,7 +114,9 @@ class ResourceFarm(AbstractFarmBehavior):
     
         farmable_resources = [r for r in available_resources if r.canFarm(self.jobFilters)]
         nonForbiddenResources = [r for r in farmable_resources if r.uid not in self.forbiddenActions]
-        nonForbiddenResources.sort(key=lambda r: r.distance)
+        nonForbiddenResources = self.harvestRoute.order(
+            nonForbiddenResources, PlayedCharacterManager().currentCellId, self._exitCellId()
+        )
         if len(nonForbiddenResources) == 0:
             Logger().info("No farmable resource found")
             self._move_to_next_step()
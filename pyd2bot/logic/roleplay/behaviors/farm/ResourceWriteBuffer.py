@@ -0,0 +1,153 @@
+import threading
+from time import perf_counter
+from typing import Callable, Dict, Tuple
+
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+
+# (map_id, zone_id, resource_counts, observed_at) keyed by vertex uid
+VertexRows = Dict[str, Tuple[int, int, Dict[str, int], object]]
+# resource_id -> quantity delta, keyed by session id
+SessionDeltas = Dict[int, Dict[str, int]]
+
+
+class ResourceWriteBuffer:
+    """
+    Write-behind buffer for the resource tracker.
+
+    Vertex updates are coalesced by vertex uid (first observation wins, like the upsert that only
+    replaces expired rows and like `VertexResourceCache.observe`) and session updates by
+    (session id, resource id) (quantities are summed). A background thread hands the pending
+    rows to `flush_callback` every `flush_interval_ms` or as soon as `flush_max_rows` rows are
+    pending. The buffer is bounded by `max_pending` rows, producers wait up to `put_timeout`
+    seconds for room before the update is dropped.
+    """
+
+    def __init__(
+        self,
+        flush_callback: Callable[[VertexRows, SessionDeltas], None],
+        flush_interval_ms: int = 500,
+        flush_max_rows: int = 200,
+        max_pending: int = 5000,
+        put_timeout: float = 5.0,
+    ):
+        self._flush_callback = flush_callback
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_max_rows = flush_max_rows
+        self.max_pending = max_pending
+        self.put_timeout = put_timeout
+        self._vertices: VertexRows = {}
+        self._sessions: SessionDeltas = {}
+        self._pending_rows = 0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ResourceWriteBuffer")
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def pending_rows(self) -> int:
+        return self._pending_rows
+
+    def put_vertex(self, vertex_uid: str, map_id: int, zone_id: int, resource_counts: Dict[str, int], observed_at) -> bool:
+        with self._cond:
+            if vertex_uid in self._vertices:
+                return True
+            if not self._wait_for_room():
+                Logger().error(f"Resource write buffer full, dropped vertex update for {vertex_uid}")
+                return False
+            self._pending_rows += 1
+            self._vertices[vertex_uid] = (map_id, zone_id, resource_counts, observed_at)
+            self._notify_if_batch_ready()
+            return True
+
+    def put_session_delta(self, session_id: int, resource_id: str, qty: int) -> bool:
+        with self._cond:
+            deltas = self._sessions.get(session_id)
+            is_new_row = deltas is None or resource_id not in deltas
+            if is_new_row and not self._wait_for_room():
+                Logger().error(f"Resource write buffer full, dropped {qty} x {resource_id} for session {session_id}")
+                return False
+            if deltas is None:
+                deltas = self._sessions[session_id] = {}
+            if is_new_row:
+                self._pending_rows += 1
+            deltas[resource_id] = deltas.get(resource_id, 0) + qty
+            self._notify_if_batch_ready()
+            return True
+
+    def flush(self) -> bool:
+        """Write every pending row now, returns False if the write failed and rows were re-queued"""
+        with self._flush_lock:
+            with self._cond:
+                vertices, sessions = self._vertices, self._sessions
+                self._vertices, self._sessions = {}, {}
+                self._pending_rows = 0
+                self._cond.notify_all()
+            if not vertices and not sessions:
+                return True
+            try:
+                self._flush_callback(vertices, sessions)
+                return True
+            except Exception as e:
+                Logger().error(f"Resource write buffer flush failed, re-queuing rows: {e}")
+                self._requeue(vertices, sessions)
+                return False
+
+    def discard_session(self, session_id: int):
+        """Drop the pending deltas of a session whose totals are about to be written directly"""
+        with self._cond:
+            deltas = self._sessions.pop(session_id, None)
+            if deltas:
+                self._pending_rows -= len(deltas)
+                self._cond.notify_all()
+
+    def close(self):
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.put_timeout)
+        self.flush()
+
+    def _wait_for_room(self) -> bool:
+        # Called with self._cond held
+        if self._pending_rows < self.max_pending:
+            return True
+        self._cond.notify_all()
+        deadline = perf_counter() + self.put_timeout
+        while self._pending_rows >= self.max_pending and not self._stopped.is_set():
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                return False
+            self._cond.wait(remaining)
+        return self._pending_rows < self.max_pending
+
+    def _notify_if_batch_ready(self):
+        if self._pending_rows >= self.flush_max_rows:
+            self._cond.notify_all()
+
+    def _requeue(self, vertices: VertexRows, sessions: SessionDeltas):
+        with self._cond:
+            for uid, row in vertices.items():
+                # The re-queued observation is the older one, it wins
+                if uid not in self._vertices:
+                    self._pending_rows += 1
+                self._vertices[uid] = row
+            for session_id, deltas in sessions.items():
+                pending = self._sessions.setdefault(session_id, {})
+                for resource_id, qty in deltas.items():
+                    if resource_id not in pending:
+                        self._pending_rows += 1
+                    pending[resource_id] = pending.get(resource_id, 0) + qty
+
+    def _run(self):
+        while not self._stopped.is_set():
+            with self._cond:
+                if self._pending_rows < self.flush_max_rows:
+                    self._cond.wait(self.flush_interval)
+            if self._stopped.is_set():
+                break
+            if not self.flush():
+                # Database unavailable, back off before retrying
+                self._stopped.wait(self.flush_interval)
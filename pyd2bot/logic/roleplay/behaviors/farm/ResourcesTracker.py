@@ -1,3 +1,4 @@
+import atexit
 import json
 import psycopg2
 import psycopg2.pool
@@ -7,6 +8,8 @@ from typing import Dict, List, Optional
 import threading
 from datetime import datetime, timedelta, timezone
 
+from pyd2bot.logic.roleplay.behaviors.farm.ResourceWriteBuffer import ResourceWriteBuffer, SessionDeltas, VertexRows
+from pyd2bot.logic.roleplay.behaviors.farm.VertexResourceCache import VertexResourceCache
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import Vertex
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
@@ -23,9 +26,18 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
                  password: str = "rMrTXHA4*",
                  expiration_days: int = 30,
                  min_connections: int = 5,
-                 max_connections: int = 15):
+                 max_connections: int = 15,
+                 write_behind: bool = True,
+                 flush_interval_ms: int = 500,
+                 flush_max_rows: int = 200,
+                 max_pending_rows: int = 5000,
+                 cache_ttl_seconds: float = 600,
+                 cache_max_entries: int = 50000):
         self.expiration_days = expiration_days
         self.active_sessions = {}
+        self.vertex_cache = VertexResourceCache(ttl=cache_ttl_seconds, max_entries=cache_max_entries)
+        self._cache_load_lock = threading.Lock()
+        self.write_buffer: Optional[ResourceWriteBuffer] = None
         
         # Create connection pool
         self.pool = psycopg2.pool.ThreadedConnectionPool(
@@ -40,6 +52,16 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
         
         # Initialize database schema
         self._init_db()
+
+        # Vertex and session updates are coalesced in memory and written in batches by a background flusher
+        if write_behind:
+            self.write_buffer = ResourceWriteBuffer(
+                self._write_buffered_rows,
+                flush_interval_ms=flush_interval_ms,
+                flush_max_rows=flush_max_rows,
+                max_pending=max_pending_rows
+            )
+            atexit.register(self.write_buffer.close)
     
     def _init_db(self):
         """Initialize database tables and indexes"""
@@ -109,16 +131,102 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
         """Get current UTC time with timezone information"""
         return datetime.now(timezone.utc)
 
+    def flush(self) -> bool:
+        """Write all buffered vertex and session updates to the database"""
+        if self.write_buffer is None:
+            return True
+        return self.write_buffer.flush()
+
+    def _write_buffered_rows(self, vertices: VertexRows, sessions: SessionDeltas):
+        """Write a batch of coalesced updates in a single transaction, raises on failure so the rows get re-queued"""
+        with self.get_connection() as conn:
+            with conn.cursor() as cur:
+                try:
+                    if vertices:
+                        psycopg2.extras.execute_values(
+                            cur,
+                            f"""
+                            INSERT INTO map_vertices 
+                                (map_id, zone_id, vertex_uid, resource_counts, created_at, updated_at)
+                            VALUES %s
+                            ON CONFLICT (vertex_uid) DO UPDATE SET
+                                resource_counts = EXCLUDED.resource_counts,
+                                updated_at = EXCLUDED.updated_at
+                            WHERE 
+                                map_vertices.updated_at < EXCLUDED.updated_at - make_interval(days => {int(self.expiration_days)})
+                            """,
+                            [
+                                (map_id, zone_id, uid, json.dumps(counts), observed_at, observed_at)
+                                for uid, (map_id, zone_id, counts, observed_at) in vertices.items()
+                            ],
+                            template="(%s, %s, %s, %s::jsonb, %s, %s)",
+                            page_size=500
+                        )
+
+                    if sessions:
+                        # Merge the summed deltas into the stored totals, clamping at 0 and dropping empty keys
+                        psycopg2.extras.execute_values(
+                            cur,
+                            """
+                            UPDATE farm_sessions AS fs SET
+                                resources_collected = (
+                                    SELECT COALESCE(jsonb_object_agg(totals.key, totals.qty) FILTER (WHERE totals.qty > 0), '{}'::jsonb)
+                                    FROM (
+                                        SELECT merged.key, SUM(merged.qty) AS qty
+                                        FROM (
+                                            SELECT key, value::integer AS qty
+                                            FROM jsonb_each_text(COALESCE(fs.resources_collected, '{}'::jsonb))
+                                            UNION ALL
+                                            SELECT key, value::integer AS qty
+                                            FROM jsonb_each_text(v.deltas)
+                                        ) merged
+                                        GROUP BY merged.key
+                                    ) totals
+                                ),
+                                last_update = v.last_update
+                            FROM (VALUES %s) AS v(id, deltas, last_update)
+                            WHERE fs.id = v.id
+                            """,
+                            [
+                                (session_id, json.dumps(deltas), self.get_current_time())
+                                for session_id, deltas in sessions.items()
+                            ],
+                            template="(%s, %s::jsonb, %s::timestamptz)",
+                            page_size=500
+                        )
+
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+
     def update_vertex_resources(self, vertex: Vertex, resource_ids: List[int]) -> bool:
-        """Update or create vertex entry with resource counts"""
+        """Update or create vertex entry with resource counts, returns whether the stored entry was updated"""
+        # Build resource counts
+        resource_counts = {}
+        for res_id in resource_ids:
+            resource_counts[str(res_id)] = resource_counts.get(str(res_id), 0) + 1
+
+        if self.write_buffer is not None:
+            # The cache decides like the upsert will, so the result still tells whether the row was updated
+            current_time = self.get_current_time()
+            try:
+                self._get_vertex_row(vertex.UID)
+            except Exception as e:
+                Logger().error(f"Database error in update_vertex_resources: {e}")
+            was_updated = self.vertex_cache.observe(
+                vertex.UID, vertex.mapId, vertex.zoneId, resource_counts, current_time, self._expiration_date(current_time)
+            )
+            if was_updated is False:
+                return False
+            if not self.write_buffer.put_vertex(vertex.UID, vertex.mapId, vertex.zoneId, resource_counts, current_time):
+                self.vertex_cache.invalidate(vertex.UID)
+                return False
+            return True
+
         with self._lock:
             current_time = self.get_current_time()
             
-            # Build resource counts
-            resource_counts = {}
-            for res_id in resource_ids:
-                resource_counts[str(res_id)] = resource_counts.get(str(res_id), 0) + 1
-            
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
                     try:
@@ -148,38 +256,103 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
                         
                         result = cur.fetchone()
                         conn.commit()
-                        return result is not None and result[0]
+                        was_updated = result is not None and result[0]
+                        if was_updated:
+                            self.vertex_cache.observe(
+                                vertex.UID, vertex.mapId, vertex.zoneId, resource_counts, current_time,
+                                self._expiration_date(current_time)
+                            )
+                        return was_updated
                         
                     except Exception as e:
                         Logger().error(f"Database error in update_vertex_resources: {e}")
                         conn.rollback()
+                        self.vertex_cache.invalidate(vertex.UID)
                         return False
 
-    def get_vertex_resources(self, vertex_uid: str, ignore_expiration: bool = False) -> Optional[Dict[str, int]]:
-        """Get resource counts for a specific vertex"""
+    def _expiration_date(self, current_time: Optional[datetime] = None) -> datetime:
+        return (current_time or self.get_current_time()) - timedelta(days=self.expiration_days)
+
+    def _ensure_vertex_cache_loaded(self) -> bool:
+        """Bulk load map_vertices into the cache if it was never loaded or its snapshot expired"""
+        if not self.vertex_cache.is_stale():
+            return True
+        with self._cache_load_lock:
+            if not self.vertex_cache.is_stale():
+                return True
+            # Pending writes must land first or the fresh snapshot would miss them
+            self.flush()
+            with self.get_connection() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    try:
+                        cur.execute("SELECT * FROM map_vertices")
+                        self.vertex_cache.load(cur.fetchall())
+                        return True
+                    except Exception as e:
+                        Logger().error(f"Database error while loading vertex resources cache: {e}")
+                        return False
+
+    def _get_vertex_row(self, vertex_uid: str) -> Optional[Dict]:
+        """Get the map_vertices row of a vertex from the cache, reading through to the database on a miss"""
+        self._ensure_vertex_cache_loaded()
+        hit, row = self.vertex_cache.get(vertex_uid)
+        if hit:
+            return row
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-                try:
-                    if not ignore_expiration:
-                        expiration_date = self.get_current_time() - timedelta(days=self.expiration_days)
-                        cur.execute("""
-                            SELECT resource_counts FROM map_vertices 
-                            WHERE vertex_uid = %s AND updated_at >= %s
-                        """, (vertex_uid, expiration_date))
-                    else:
-                        cur.execute("""
-                            SELECT resource_counts FROM map_vertices 
-                            WHERE vertex_uid = %s
-                        """, (vertex_uid,))
-                    
-                    result = cur.fetchone()
-                    return dict(result['resource_counts']) if result else None
-                except Exception as e:
-                    Logger().error(f"Database error in get_vertex_resources: {e}")
-                    return None
+                cur.execute("""
+                    SELECT * FROM map_vertices 
+                    WHERE vertex_uid = %s
+                """, (vertex_uid,))
+                result = cur.fetchone()
+        row = dict(result) if result else None
+        self.vertex_cache.put(vertex_uid, row)
+        return row
+
+    def get_vertex_resources(self, vertex_uid: str, ignore_expiration: bool = False) -> Optional[Dict[str, int]]:
+        """Get resource counts for a specific vertex"""
+        try:
+            row = self._get_vertex_row(vertex_uid)
+        except Exception as e:
+            Logger().error(f"Database error in get_vertex_resources: {e}")
+            return None
+        if row is None:
+            return None
+        if not ignore_expiration and row['updated_at'] < self._expiration_date():
+            return None
+        return dict(row['resource_counts'])
+
+    def get_resource_density(self, vertex_uids: List[str], resource_ids: List[str]) -> Dict[str, int]:
+        """
+        Get the number of the given resources last seen on each vertex, from the cache.
+        Vertices without a non expired entry are left out.
+        """
+        expiration_date = self._expiration_date()
+        density = {}
+        for vertex_uid in vertex_uids:
+            try:
+                row = self._get_vertex_row(vertex_uid)
+            except Exception as e:
+                Logger().error(f"Database error in get_resource_density: {e}")
+                continue
+            if row is None or row['updated_at'] < expiration_date:
+                continue
+            counts = row['resource_counts']
+            density[vertex_uid] = sum(int(counts.get(str(res_id), 0)) for res_id in resource_ids)
+        return density
 
     def get_vertices_with_resource_minimum(self, resource_id: str, min_count: int) -> List[Dict]:
         """Find vertices with minimum resource count"""
+        resource_id = str(resource_id)
+        expiration_date = self._expiration_date()
+        if self._ensure_vertex_cache_loaded() and self.vertex_cache.complete:
+            rows = [
+                dict(row) for row in self.vertex_cache.rows()
+                if row['updated_at'] >= expiration_date
+                and int(row['resource_counts'].get(resource_id, 0)) >= min_count
+            ]
+            rows.sort(key=lambda row: int(row['resource_counts'][resource_id]), reverse=True)
+            return rows
         with self.get_connection() as conn:
             with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                 try:
@@ -191,7 +364,7 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
                     """, (
                         resource_id,
                         min_count,
-                        self.get_current_time() - timedelta(days=self.expiration_days),
+                        expiration_date,
                         resource_id
                     ))
                     return cur.fetchall()
@@ -237,6 +410,12 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
 
     def update_session_collected_resources(self, session_id: int, resource_id: str, qty: int) -> bool:
         """Update resources collected in a session, handling both positive and negative quantities"""
+        if self.write_buffer is not None:
+            if not self.write_buffer.put_session_delta(session_id, resource_id, qty):
+                return False
+            self._log_collected_value(resource_id, qty)
+            return True
+
         with self._lock:
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
@@ -301,21 +480,9 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
                         # Log the update with value calculation
                         try:
                             new_qty = int(result[0]) if result[0] else 0
-                            avg_price = Kernel().averagePricesFrame.getItemAveragePrice(int(resource_id))
-                            if avg_price:
-                                value = avg_price * qty
-                                total_value = avg_price * new_qty
-                                Logger().debug(
-                                    f"{'Added' if qty > 0 else 'Removed'} {abs(qty)} x {resource_id} "
-                                    f"(value: {abs(value):,} kamas, total: {total_value:,} kamas)"
-                                )
-                            else:
-                                Logger().debug(
-                                    f"{'Added' if qty > 0 else 'Removed'} {abs(qty)} x {resource_id} "
-                                    "(no price available)"
-                                )
-                        except (ValueError, TypeError) as e:
-                            Logger().warning(f"Error calculating value for resource {resource_id}: {e}")
+                        except (ValueError, TypeError):
+                            new_qty = None
+                        self._log_collected_value(resource_id, qty, new_qty)
                         
                         return True
                         
@@ -324,8 +491,31 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
                         conn.rollback()
                         return False
 
+    def _log_collected_value(self, resource_id: str, qty: int, new_qty: Optional[int] = None):
+        try:
+            avg_price = Kernel().averagePricesFrame.getItemAveragePrice(int(resource_id))
+            if avg_price:
+                value = avg_price * qty
+                total = f", total: {avg_price * new_qty:,} kamas" if new_qty is not None else ""
+                Logger().debug(
+                    f"{'Added' if qty > 0 else 'Removed'} {abs(qty)} x {resource_id} "
+                    f"(value: {abs(value):,} kamas{total})"
+                )
+            else:
+                Logger().debug(
+                    f"{'Added' if qty > 0 else 'Removed'} {abs(qty)} x {resource_id} "
+                    "(no price available)"
+                )
+        except (ValueError, TypeError) as e:
+            Logger().warning(f"Error calculating value for resource {resource_id}: {e}")
+
     def end_farm_session(self, session_id: int, resources_collected: Dict[str, int]):
         """End a farming session"""
+        if self.write_buffer is not None:
+            # The final totals overwrite the stored ones, pending deltas must not be applied after them
+            self.write_buffer.flush()
+            self.write_buffer.discard_session(session_id)
+
         with self._lock:
             current_time = self.get_current_time()
             
@@ -525,6 +715,7 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
                         
                         deleted_count = len(cur.fetchall())
                         conn.commit()
+                        self.vertex_cache.drop_older_than(expiration_date)
                         Logger().info(f"Cleaned {deleted_count} expired vertex entries")
                         
                     except Exception as e:
@@ -533,5 +724,7 @@ class ResourceTracker(metaclass=ThreadSharedSingleton):
     
     def __del__(self):
         """Clean up connection pool on deletion"""
+        if getattr(self, 'write_buffer', None) is not None:
+            self.write_buffer.close()
         if hasattr(self, 'pool'):
             self.pool.closeall()
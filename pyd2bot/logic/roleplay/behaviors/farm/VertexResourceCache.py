@@ -0,0 +1,118 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class VertexResourceCache:
+    """
+    In-process copy of the `map_vertices` rows, keyed by vertex uid.
+
+    The whole table is loaded in bulk and reloaded once the snapshot is older than `ttl` seconds.
+    Rows are kept in LRU order and evicted past `max_entries`; once something was evicted the
+    cache is no longer complete and a miss must be read through from the database.
+    A `None` row records a vertex known to have no entry.
+    """
+
+    def __init__(self, ttl: float = 600, max_entries: int = 50000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._rows: OrderedDict[str, Tuple[Optional[dict], float]] = OrderedDict()
+        self._loaded_at: Optional[float] = None
+        self._complete = False
+        self._lock = threading.RLock()
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or perf_counter() - self._loaded_at > self.ttl
+
+    def load(self, rows: list[dict]):
+        now = perf_counter()
+        with self._lock:
+            self._rows.clear()
+            for row in rows:
+                self._rows[row["vertex_uid"]] = (dict(row), now)
+            self._complete = True
+            self._evict()
+            self._loaded_at = now
+
+    def get(self, vertex_uid: str) -> Tuple[bool, Optional[dict]]:
+        """Returns (hit, row), a hit with a None row means the vertex has no stored entry"""
+        with self._lock:
+            entry = self._rows.get(vertex_uid)
+            if entry is None:
+                return self._complete and not self.is_stale(), None
+            row, cached_at = entry
+            if perf_counter() - cached_at > self.ttl:
+                del self._rows[vertex_uid]
+                self._complete = False
+                return False, None
+            self._rows.move_to_end(vertex_uid)
+            return True, row
+
+    def put(self, vertex_uid: str, row: Optional[dict]):
+        with self._lock:
+            self._rows[vertex_uid] = (row, perf_counter())
+            self._rows.move_to_end(vertex_uid)
+            self._evict()
+
+    def observe(
+        self,
+        vertex_uid: str,
+        map_id: int,
+        zone_id: int,
+        resource_counts: Dict[str, int],
+        observed_at: datetime,
+        expiration_date: datetime,
+    ) -> Optional[bool]:
+        """
+        Mirror the tracker upsert: a stored row is only replaced once it has expired.
+        Returns whether the row was created or replaced, None when the vertex isn't cached and the cache is
+        incomplete so the outcome is unknown.
+        """
+        with self._lock:
+            entry = self._rows.get(vertex_uid)
+            if entry is None:
+                if not self._complete:
+                    return None
+                row = None
+            else:
+                row = entry[0]
+            if row is None:
+                row = {
+                    "map_id": map_id,
+                    "zone_id": zone_id,
+                    "vertex_uid": vertex_uid,
+                    "created_at": observed_at,
+                }
+            elif row["updated_at"] >= expiration_date:
+                return False
+            else:
+                row = dict(row)
+            row["resource_counts"] = dict(resource_counts)
+            row["updated_at"] = observed_at
+            self.put(vertex_uid, row)
+            return True
+
+    def invalidate(self, vertex_uid: str):
+        with self._lock:
+            if self._rows.pop(vertex_uid, None) is not None:
+                self._complete = False
+
+    def drop_older_than(self, expiration_date: datetime):
+        with self._lock:
+            for uid in [uid for uid, (row, _) in self._rows.items() if row and row["updated_at"] < expiration_date]:
+                self._rows[uid] = (None, self._rows[uid][1])
+
+    def rows(self) -> Iterator[dict]:
+        with self._lock:
+            return iter([row for row, _ in self._rows.values() if row is not None])
+
+    @property
+    def complete(self) -> bool:
+        return self._complete and not self.is_stale()
+
+    def _evict(self):
+        while len(self._rows) > self.max_entries:
+            self._rows.popitem(last=False)
+            self._complete = False
@@ -2,23 +2,21 @@ from typing import TYPE_CHECKING
 from pyd2bot.logic.roleplay.behaviors.fight.SoloFarmFights import SoloFarmFights
 from pyd2bot.logic.roleplay.behaviors.party.WaitForMembersToShow import \
     WaitForMembersToShow
-from pyd2bot.logic.roleplay.messages.FollowTransitionMessage import \
-    FollowTransitionMessage
-from pyd2bot.logic.roleplay.messages.MoveToVertexMessage import \
-    MoveToVertexMessage
 from pyd2bot.farmPaths.AbstractFarmPath import AbstractFarmPath
 from pyd2bot.data.models import Character
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.berilia.managers.KernelEventsManager import \
     KernelEventsManager
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
+from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
+    PlayedCharacterManager
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.TransitionTypeEnum import \
     TransitionTypeEnum
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import Vertex
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 
 if TYPE_CHECKING:
-    pass
+    from pyd2bot.logic.common.frames.BotRPCFrame import BotRPCFrame
 
 class GroupLeaderFarmFights(SoloFarmFights):
 
@@ -49,10 +47,26 @@ class GroupLeaderFarmFights(SoloFarmFights):
     def onMembersIdle(self, code, err):
         if err:
             return KernelEventsManager().send(KernelEvent.ClientRestart, f"Wait members idle failed for reason : {err}")
-        if not self.allMembersOnSameMap():
-            Logger().warning("Followers are not all on the same map!")
-            self.askFollowersMoveToVertex(self.path.currentVertex)
-            self.waitForMembersToShow(self.followers, callback=self.onMembersShowed)
+        # Every follower is asked at once, the check lasts as long as the slowest one answers
+        self.rpcFrame.askCurrVertexAll([follower.accountId for follower in self.followers], self.onFollowersVertex)
+
+    def onFollowersVertex(self, results: dict, errors: dict):
+        if not self.isRunning():
+            return
+        for accountId, error in errors.items():
+            Logger().warning(f"Follower {accountId} didn't tell its current vertex: {error}")
+        mapId = PlayedCharacterManager().currentMap.mapId
+        entitiesFrame = Kernel().roleplayEntitiesFrame
+        away = [
+            follower
+            for follower in self.followers
+            if (results.get(follower.accountId) is None or results[follower.accountId].mapId != mapId)
+            and not (entitiesFrame and entitiesFrame.getEntityInfos(follower.id))
+        ]
+        if away:
+            Logger().warning(f"Followers {[follower.accountId for follower in away]} are not on the same map!")
+            self.rpcFrame.askMoveToVertex([follower.accountId for follower in away], self.path.currentVertex)
+            self.waitForMembersToShow(away, callback=self.onMembersShowed)
             return False
         super().makeAction()
 
@@ -66,16 +80,22 @@ class GroupLeaderFarmFights(SoloFarmFights):
         Logger().warning("Followers are all on same map")
         self.makeAction()
  
+    @property
+    def rpcFrame(self) -> "BotRPCFrame":
+        return Kernel().worker.getFrameByName("BotRPCFrame")
+
     def askMembersFollow(self, transition: TransitionTypeEnum, dstMapId):
-        for follower in self.followers:
-            Kernel.getInstance(follower.accountId).worker.process(FollowTransitionMessage(transition, dstMapId))
+        self.rpcFrame.askFollowTransition([follower.accountId for follower in self.followers], transition, dstMapId)
 
     def askFollowersMoveToVertex(self, vertex: Vertex):
-        for follower in self.followers:
-            entity = Kernel().roleplayEntitiesFrame.getEntityInfos(follower.id)
-            if not entity:
-                Kernel.getInstance(follower.accountId).worker.process(MoveToVertexMessage(vertex))                
-                Logger().debug(f"Asked follower {follower.accountId} to go to farm start vertex")
+        absent = [
+            follower.accountId
+            for follower in self.followers
+            if not Kernel().roleplayEntitiesFrame.getEntityInfos(follower.id)
+        ]
+        self.rpcFrame.askMoveToVertex(absent, vertex)
+        if absent:
+            Logger().debug(f"Asked followers {absent} to go to farm start vertex")
             
     def allMembersOnSameMap(self):
         for follower in self.followers:
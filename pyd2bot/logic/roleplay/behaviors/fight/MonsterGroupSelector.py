@@ -0,0 +1,148 @@
+from typing import Dict, List, Tuple
+
+from prettytable import PrettyTable
+
+from pyd2bot.logic.roleplay.behaviors.movement.MapCellGraph import CELLS_COUNT, MapCellGraph
+from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import MapDisplayManager
+from pydofus2.com.ankamagames.dofus.datacenter.monsters.Monster import Monster
+from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
+from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
+    PlayedCharacterManager
+from pydofus2.com.ankamagames.dofus.network.types.game.context.roleplay.GameRolePlayGroupMonsterInformations import \
+    GameRolePlayGroupMonsterInformations
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+
+
+class MonsterGroupSelector:
+    """
+    Picks the monster group to attack on the current map.
+
+    Groups are reached by a BFS over the walkable cells of the map cell graph, that stops as soon as the
+    `max_groups` nearest eligible groups are found. Those are ranked by expected XP per second, walk and fight
+    time included, lowered for groups stronger than the team.
+    The ranking is kept until the player or a monster group moves.
+    """
+
+    # Rough timings used to turn the group XP into XP per second
+    WALK_SECONDS_PER_CELL = 0.5
+    FIGHT_BASE_SECONDS = 20
+    FIGHT_SECONDS_PER_MONSTER = 10
+
+    def __init__(self, max_groups: int = 5):
+        self.max_groups = max_groups
+        self._cacheKey = None
+        self._cached: List[dict] = []
+
+    def _eligibleGroups(self, monsterLvlCoefDiff: float) -> Dict[int, GameRolePlayGroupMonsterInformations]:
+        teamLvl = PlayedCharacterManager().limitedLevel
+        monsterByCellId = dict[int, GameRolePlayGroupMonsterInformations]()
+        for entityId in Kernel().roleplayEntitiesFrame._monstersIds:
+            infos: GameRolePlayGroupMonsterInformations = Kernel().roleplayEntitiesFrame.getEntityInfos(entityId)
+            if infos and self.groupLevel(infos) < monsterLvlCoefDiff * teamLvl:
+                monsterByCellId[infos.disposition.cellId] = infos
+        return monsterByCellId
+
+    @staticmethod
+    def groupLevel(infos: GameRolePlayGroupMonsterInformations) -> int:
+        return infos.staticInfos.mainCreatureLightInfos.level + sum(ul.level for ul in infos.staticInfos.underlings)
+
+    @staticmethod
+    def groupXp(infos: GameRolePlayGroupMonsterInformations) -> int:
+        xp = 0
+        for creature in [infos.staticInfos.mainCreatureLightInfos] + list(infos.staticInfos.underlings):
+            grades = Monster.getMonsterById(creature.genericId).grades
+            if grades:
+                xp += grades[min(max(creature.grade, 1), len(grades)) - 1].gradeXp
+        return xp
+
+    def select(self, monsterLvlCoefDiff: float) -> List[dict]:
+        """Eligible groups among the nearest ones, best first"""
+        if not Kernel().roleplayEntitiesFrame or not Kernel().roleplayEntitiesFrame._monstersIds:
+            return []
+        monsterByCellId = self._eligibleGroups(monsterLvlCoefDiff)
+        if not monsterByCellId:
+            return []
+
+        dataMap = MapDisplayManager().dataMap
+        mapId = dataMap.id if dataMap else None
+        currCellId = PlayedCharacterManager().currentCellId
+        cacheKey = (
+            mapId,
+            currCellId,
+            monsterLvlCoefDiff,
+            frozenset((infos.contextualId, cellId) for cellId, infos in monsterByCellId.items()),
+        )
+        if cacheKey == self._cacheKey:
+            return self._cached
+
+        groups = self._rank(self._nearestGroups(mapId, currCellId, monsterByCellId))
+        self._cacheKey = cacheKey
+        self._cached = groups
+        self.logGroupsTable(groups)
+        return groups
+
+    def _nearestGroups(
+        self, mapId: int, startCellId: int, monsterByCellId: Dict[int, GameRolePlayGroupMonsterInformations]
+    ) -> List[Tuple[GameRolePlayGroupMonsterInformations, int]]:
+        neighbours = MapCellGraph.walkableNeighbours(mapId)
+        found = []
+        distance = [-1] * CELLS_COUNT
+        distance[startCellId] = 0
+        frontier = [startCellId]
+        while frontier and len(found) < self.max_groups:
+            nextFrontier = []
+            for cellId in frontier:
+                infos = monsterByCellId.get(cellId)
+                if infos:
+                    found.append((infos, distance[cellId]))
+                    if len(found) >= self.max_groups:
+                        break
+                for nextCellId in neighbours[cellId]:
+                    if distance[nextCellId] == -1:
+                        distance[nextCellId] = distance[cellId] + 1
+                        nextFrontier.append(nextCellId)
+            frontier = nextFrontier
+        return found
+
+    def _rank(self, groups: List[Tuple[GameRolePlayGroupMonsterInformations, int]]) -> List[dict]:
+        teamLvl = max(1, PlayedCharacterManager().limitedLevel)
+        ranked = []
+        for infos, distance in groups:
+            monstersCount = 1 + len(infos.staticInfos.underlings)
+            levelRatio = self.groupLevel(infos) / teamLvl
+            seconds = (
+                distance * self.WALK_SECONDS_PER_CELL
+                + self.FIGHT_BASE_SECONDS
+                + self.FIGHT_SECONDS_PER_MONSTER * monstersCount
+            )
+            xpPerSecond = self.groupXp(infos) / seconds
+            ranked.append({
+                "mainMonsterName": Monster.getMonsterById(infos.staticInfos.mainCreatureLightInfos.genericId).name,
+                "id": infos.contextualId,
+                "cell": infos.disposition.cellId,
+                "distance": distance,
+                "levelRatio": levelRatio,
+                "xpPerSecond": xpPerSecond,
+                # Groups stronger than the team take longer and may be lost
+                "score": xpPerSecond / max(1.0, levelRatio),
+            })
+        ranked.sort(key=lambda g: (-g["score"], g["distance"]))
+        return ranked
+
+    @staticmethod
+    def logGroupsTable(groups: List[dict]) -> None:
+        if not groups:
+            return
+        headers = ["mainMonsterName", "id", "cell", "distance", "levelRatio", "xpPerSecond", "score"]
+        summaryTable = PrettyTable(headers)
+        for g in groups:
+            summaryTable.add_row([
+                g["mainMonsterName"],
+                g["id"],
+                g["cell"],
+                g["distance"],
+                f"{g['levelRatio']:.2f}",
+                f"{g['xpPerSecond']:.1f}",
+                f"{g['score']:.1f}",
+            ])
+        Logger().debug(f"Available monster groups :\n{summaryTable}")
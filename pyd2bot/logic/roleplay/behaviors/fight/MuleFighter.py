@@ -303,6 +303,7 @@ class MuleFighter(AbstractBehavior):
         self.autoTrip(
             vertex.mapId,
             vertex.zoneId,
+            kamas_budget=self.tripKamasBudget,
             callback=self._on_movement_complete
         )
 
@@ -1,24 +1,18 @@
-import heapq
 import threading
 import numpy as np
 import time
-from prettytable import PrettyTable
 
 from pyd2bot.data.models import Character
 from pyd2bot.logic.roleplay.behaviors.farm.AbstractFarmBehavior import \
     AbstractFarmBehavior
 from pyd2bot.logic.roleplay.behaviors.fight.AttackMonsters import \
     AttackMonsters
+from pyd2bot.logic.roleplay.behaviors.fight.MonsterGroupSelector import \
+    MonsterGroupSelector
 from pyd2bot.farmPaths.AbstractFarmPath import AbstractFarmPath
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
-from pydofus2.com.ankamagames.dofus.datacenter.monsters.Monster import Monster
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
-from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
-    PlayedCharacterManager
-from pydofus2.com.ankamagames.dofus.network.types.game.context.roleplay.GameRolePlayGroupMonsterInformations import \
-    GameRolePlayGroupMonsterInformations
 from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
-from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
 
 
 class SoloFarmFights(AbstractFarmBehavior):
@@ -29,6 +23,7 @@ class SoloFarmFights(AbstractFarmBehavior):
         self.fightsPerMinute = fightsPerMinute
         self.fightPartyMembers = fightPartyMembers
         self.monsterLvlCoefDiff = monsterLvlCoefDiff if monsterLvlCoefDiff else float("inf")
+        self.groupSelector = MonsterGroupSelector()
 
     def init(self):
         self.path.init()
@@ -79,47 +74,7 @@ class SoloFarmFights(AbstractFarmBehavior):
         return wait_time
 
     def getAvailableResources(self):
-        if not Kernel().roleplayEntitiesFrame._monstersIds:
-            return []
-        availableMonsterFights = []
-        visited = set()
-        queue = list[int, MapPoint]()
-        currCellId = PlayedCharacterManager().currentCellId
-        teamLvl = PlayedCharacterManager().limitedLevel
-        monsterByCellId = dict[int, GameRolePlayGroupMonsterInformations]()
-        for entityId in Kernel().roleplayEntitiesFrame._monstersIds:
-            infos: GameRolePlayGroupMonsterInformations = Kernel().roleplayEntitiesFrame.getEntityInfos(entityId)
-            if infos:
-                totalGrpLvl = infos.staticInfos.mainCreatureLightInfos.level + sum(
-                    ul.level for ul in infos.staticInfos.underlings
-                )
-                if totalGrpLvl < self.monsterLvlCoefDiff * teamLvl:
-                    monsterByCellId[infos.disposition.cellId] = infos
-        if not monsterByCellId:
-            return []
-        heapq.heappush(queue, (0, currCellId))
-        while queue:
-            distance, currCellId = heapq.heappop(queue)
-            if currCellId in visited:
-                continue
-            visited.add(currCellId)
-            if currCellId in monsterByCellId:
-                infos = monsterByCellId[currCellId]
-                mainMonster = Monster.getMonsterById(infos.staticInfos.mainCreatureLightInfos.genericId)
-                availableMonsterFights.append({
-                    "mainMonsterName": mainMonster.name,
-                    "id": infos.contextualId,
-                    "cell": currCellId,
-                    "distance": distance
-                })
-            for x, y in MapPoint.fromCellId(currCellId).iterChildren():
-                adjacentPos = MapPoint.fromCoords(x, y)
-                if adjacentPos.cellId in visited:
-                    continue
-                heapq.heappush(queue, (distance + 1, adjacentPos.cellId))
-        availableMonsterFights.sort(key=lambda r : r['distance'])
-        self.logResourcesTable(availableMonsterFights)
-        return availableMonsterFights
+        return self.groupSelector.select(self.monsterLvlCoefDiff)
         
     def onFightStarted(self, code, error):        
         if not self.running.is_set():
@@ -132,18 +87,3 @@ class SoloFarmFights(AbstractFarmBehavior):
             else:
                 self.send(KernelEvent.ClientRestart, f"Error while attacking monsters: {error}")
                 return
-
-    def logResourcesTable(self, resources):
-        if resources:
-            headers = ["mainMonsterName", "id", "cell", "distance"]
-            summaryTable = PrettyTable(headers)
-            for e in resources:
-                summaryTable.add_row(
-                    [
-                        e["mainMonsterName"],
-                        e["id"],
-                        e["cell"],
-                        e["distance"]
-                    ]
-                )
-            Logger().debug(f"Available resources :\n{summaryTable}")
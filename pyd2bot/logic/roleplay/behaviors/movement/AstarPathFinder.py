@@ -2,6 +2,9 @@ from time import perf_counter
 from typing import Optional
 
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
+from pyd2bot.misc.Localizer import Localizer
+from pyd2bot.misc.WorldPathCache import WorldPathCache
 from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import PlayedCharacterManager
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.astar.AStar import AStar
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.WorldGraph import WorldGraph
@@ -16,6 +19,7 @@ class AstarPathFinder(AbstractBehavior):
         self._start_time: float = 0
         self.dst_map_id = dst_map_id
         self.linked_zone = linked_zone
+        self._cache_key = None
 
     def run(self, ) -> None:
         src = PlayedCharacterManager().currVertex
@@ -35,8 +39,16 @@ class AstarPathFinder(AbstractBehavior):
             return self.finish(self.NO_PATH_FOUND, "No valid destination vertices found", None)
 
         self.vertices = vertices
+        EdgeHealthStore.forbidBrokenEdges()
+        state = Localizer.playerState()
+        dst = WorldPathCache.destinationKey(vertices if isinstance(vertices, list) else [vertices])
+        found, path = WorldPathCache.get(state, src, dst, AStar().forbiddenEdges)
+        if found and path is not None:
+            Logger().info(f"Path to map {self.dst_map_id} from {src} served from cache")
+            return self.finish(0, None, path)
+
+        self._cache_key = (state, src, dst)
         self._start_time = perf_counter()
-        src = PlayedCharacterManager().currVertex
         AStar().search_async(src, self.vertices, callback=self._on_path_found_callback)
 
     def _on_path_found_callback(self, code, exc, path):
@@ -46,6 +58,8 @@ class AstarPathFinder(AbstractBehavior):
             raise exc
 
         if code == 0:
+            if path is not None:
+                WorldPathCache.put(*self._cache_key, path)
             self.finish(0, None, path)
         else:
             self.finish(self.NO_PATH_FOUND, "Unable to find path to dest map", None)
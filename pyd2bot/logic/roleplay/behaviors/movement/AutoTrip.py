@@ -2,6 +2,10 @@ from enum import Enum
 
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
 from pyd2bot.logic.roleplay.behaviors.movement.ChangeMap import ChangeMap
+from pyd2bot.logic.roleplay.behaviors.movement.PathCursor import PathCursor
+from pyd2bot.logic.roleplay.behaviors.movement.TripPlanner import TripPlan, TripPlanner, TripStep, TripStepKind
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
+from pyd2bot.misc.WorldPathCache import WorldPathCache
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.berilia.managers.KernelEventsManager import \
     KernelEventsManager
@@ -36,8 +40,9 @@ class AutoTrip(AbstractBehavior):
     PLAYER_IN_COMBAT = 89090
     MAX_RETIES_COUNT = 2
 
-    def __init__(self, farm_resources_on_way):
+    def __init__(self, farm_resources_on_way, kamas_budget=None):
         super().__init__()
+        self._cursor: PathCursor = None
         self.path = None
         self.state = AutoTripState.IDLE
         self.dstMapId = None
@@ -47,6 +52,11 @@ class AutoTrip(AbstractBehavior):
         self._previous_vertex: Vertex = None
         self._edge_taken: Edge = None
         self._taken_transition: Transition = None
+        # Zaaps, havenbag and recall potions are only planned for when given a kamas budget
+        self.kamas_budget = kamas_budget
+        self._kamas_spent = 0
+        self._trip: list[TripStep] = []
+        self._teleport_step: TripStep = None
 
     def run(self, dstMapId=None, dstZoneId=None, path: list[Edge] = None):
         if Kernel().fightContextFrame:
@@ -74,21 +84,42 @@ class AutoTrip(AbstractBehavior):
 
         self.walkToNextStep()
 
+    @property
+    def path(self) -> list[Edge]:
+        return self._cursor.path if self._cursor else None
+
+    @path.setter
+    def path(self, path: list[Edge]):
+        self._cursor = PathCursor(path) if path is not None else None
+
     def currentEdgeIndex(self):
         v = PlayedCharacterManager().currVertex
         if not v:
             return None
 
-        for i, step in enumerate(self.path):
-            if step is None:
-                raise Exception("Found a None edge step, should never happen!")
-            if step.src.UID == v.UID:
-                return i
+        index = self._cursor.indexOf(v)
+        if index is None:
+            Logger().warning(f"Current vertex {v} is not on the path!")
+        return index
+
+    def _repair_path(self):
+        """Splices a detour back to the nearest vertex of the path still ahead, replans when there is none"""
+        src = PlayedCharacterManager().currVertex
+        targets = self._cursor.remainingVertices()
+        if src is None or not targets:
+            return self._find_path()
+
+        self.state = AutoTripState.CALCULATING_PATH
+        Logger().info(f"Searching a detour back to one of the {len(targets)} path vertices ahead")
 
-        Logger().error("Unable to find current player vertex index in the path!")
-        Logger().debug(f"Current vertex : {v}")
-        Logger().debug(f"Path vertices sources: {[step.src for step in self.path]}")
-        Logger().debug(f"Path vertices destinations: {[step.dst for step in self.path]}")
+        def on_detour(code, exc, detour):
+            if exc is not None or code != 0 or not self._cursor.splice(detour or []):
+                Logger().warning(f"No detour back to the path found ({code}, {exc}), searching a new path")
+                return self._find_path()
+            Logger().debug(f"Detour of {len(detour)} steps spliced, {len(self.path)} steps left")
+            self.walkToNextStep()
+
+        AStar().search_async(src, targets, callback=on_detour)
 
     def _on_transition_executed(self, code1, error1, transition=None):
         self._taken_transition = transition
@@ -109,6 +140,10 @@ class AutoTrip(AbstractBehavior):
             error = "Player didn't land on the expected edge!"
             if self._taken_transition and TransitionTypeEnum(self._taken_transition.type) in [ TransitionTypeEnum.ZAAP, TransitionTypeEnum.HAVEN_BAG_ZAAP ]:
                 Logger().warning("Player may have took a guessed zaap landing vertex!")
+            else:
+                EdgeHealthStore.recordFailure(
+                    self._edge_taken, self._taken_transition.type if self._taken_transition else None, code
+                )
 
         if error:
             currentIndex = self.currentEdgeIndex()
@@ -116,7 +151,11 @@ class AutoTrip(AbstractBehavior):
                 if Kernel().fightContextFrame:
                     Logger().error(f"Player is in Fight!")
                     return self.finish(self.PLAYER_IN_FIGHT_ERROR, "Player is in Fight")
-    
+
+                if PlayedCharacterManager().currVertex is not None:
+                    self._previous_vertex = None
+                    return self._repair_path()
+
                 KernelEventsManager().send(KernelEvent.ClientRestart, "restart cause couldn't find the player current index in the current path!")
                 return
     
@@ -130,7 +169,8 @@ class AutoTrip(AbstractBehavior):
                 Logger().warning(f"Failed to take edge {self._edge_taken} reach next step in found path for reason : {code}, {error}")
                 self._previous_vertex = None
                 AStar().forbiddenEdges.append(self._edge_taken)
-                return self.astar_find_path(self.dstMapId, self.dstRpZone, self.onPathFindResult)
+                WorldPathCache.invalidate(self._edge_taken)
+                return self._find_path()
             else:
                 Logger().debug(f"Error while auto traveling : {error}")
                 return self.finish(code, error)
@@ -151,6 +191,9 @@ class AutoTrip(AbstractBehavior):
             raise Exception("Something bad is happening it seems like we entered an infinite loop!")
 
         if self.path is not None:
+            if self._trip and (not self.path or PlayedCharacterManager().currVertex == self.path[-1].dst):
+                return self._take_teleport()
+
             if len(self.path) == 0:
                 Logger().debug("Player already at the destination nothing to do")
                 return self.finish(0)
@@ -161,14 +204,17 @@ class AutoTrip(AbstractBehavior):
             dstMapId = self.path[-1].dst.mapId
             dstZoneId = self.path[-1].dst.zoneId
 
-            if (not self.dstRpZone and currMapId == dstMapId) or (self.dstRpZone and currMapId == dstMapId and currZoneId == dstZoneId):
+            if not self._trip and (
+                (not self.dstRpZone and currMapId == dstMapId)
+                or (self.dstRpZone and currMapId == dstMapId and currZoneId == dstZoneId)
+            ):
                 Logger().info(f"Trip reached destination Map : {dstMapId}")
                 return self.finish(0)
 
             currentIndex = self.currentEdgeIndex()
             if currentIndex is None:
                 self._previous_vertex = None
-                return self.astar_find_path(self.dstMapId, self.dstRpZone, self.onPathFindResult)
+                return self._repair_path()
             
             nextEdge = self.path[currentIndex]
             
@@ -194,12 +240,76 @@ class AutoTrip(AbstractBehavior):
                 if not nextEdge.transitions:
                     self._previous_vertex = None
                     AStar().addForbiddenEdge(nextEdge, "Edge contains only impossible zaap usage from/to ankarnam")
-                    return self.astar_find_path(self.dstMapId, self.dstRpZone, self.onPathFindResult)
+                    WorldPathCache.invalidate(nextEdge)
+                    return self._find_path()
 
             self.changeMap(edge=nextEdge, callback=self._on_transition_executed)
         else:
-            self.state = AutoTripState.CALCULATING_PATH
-            self.astar_find_path(self.dstMapId, self.dstRpZone, self.onPathFindResult)
+            self._find_path()
+
+    def _find_path(self):
+        self.state = AutoTripState.CALCULATING_PATH
+        self._trip = []
+        if self.kamas_budget is None:
+            return self.astar_find_path(self.dstMapId, self.dstRpZone, self.onPathFindResult)
+
+        src = PlayedCharacterManager().currVertex
+        if src is None:
+            return self.once_map_rendered(self._find_path)
+
+        if self.dstRpZone is None:
+            dst_vertices = list(WorldGraph().getVertices(self.dstMapId).values())
+        else:
+            dst_vertices = [WorldGraph().getVertex(self.dstMapId, self.dstRpZone)]
+
+        TripPlanner().planAsync(src, dst_vertices, self.kamas_budget - self._kamas_spent, self._on_trip_planned)
+
+    def _on_trip_planned(self, plan: TripPlan):
+        if not self.isRunning():
+            return
+        if plan is None:
+            Logger().warning("No trip plan found within the kamas budget, looking for a walking path")
+            return self.astar_find_path(self.dstMapId, self.dstRpZone, self.onPathFindResult)
+
+        Logger().info(f"Trip plan of {len(plan.steps)} steps, about {plan.seconds:.0f}s for {plan.kamas} kamas")
+        self._trip = plan.steps
+        self.path = self._next_walk_segment()
+        self.walkToNextStep()
+
+    def _next_walk_segment(self) -> list[Edge]:
+        """Pops the walking steps up to the next teleport of the trip"""
+        segment = []
+        while self._trip and self._trip[0].kind == TripStepKind.WALK:
+            segment.append(self._trip.pop(0).edge)
+        return segment
+
+    def _take_teleport(self):
+        step = self._trip.pop(0)
+        self.path = self._next_walk_segment()
+        self._previous_vertex = None
+        self._teleport_step = step
+        Logger().info(f"{step.kind.name} teleport to map {step.dst.mapId}, for about {step.kamas} kamas")
+        if step.kind == TripStepKind.ZAAP:
+            self.useZaap(step.dst.mapId, callback=self._on_teleported)
+        elif step.kind == TripStepKind.HAVENBAG:
+            self.teleport_using_havenbag(step.dst.mapId, callback=self._on_teleported)
+        elif not self.use_rappel_potion(callback=self._on_teleported):
+            self._on_teleported(1, "No recall potion found in inventory")
+
+    def _on_teleported(self, code, error):
+        step = self._teleport_step
+        self._teleport_step = None
+        if error:
+            Logger().warning(f"{step.kind.name} teleport failed for reason [{code}] {error}, walking instead")
+            self.kamas_budget = None
+            return self._find_path()
+
+        self._kamas_spent += step.kamas
+        if PlayedCharacterManager().currVertex != step.dst:
+            Logger().warning(f"Teleport landed on {PlayedCharacterManager().currVertex} instead of {step.dst}")
+            return self._find_path()
+
+        self.walkToNextStep()
 
     def onPathFindResult(self, code, error, path):
         if error:
@@ -2,10 +2,12 @@ from enum import Enum
 from typing import Iterable, Optional
 
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.dofus.internalDatacenter.DataEnum import DataEnum
 from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
 from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import PlayedCharacterManager
+from pydofus2.com.ankamagames.dofus.logic.game.roleplay.types.MovementFailError import MovementFailError
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Edge import Edge
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Transition import Transition
 from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.TransitionTypeEnum import TransitionTypeEnum
@@ -25,6 +27,16 @@ class ChangeMap(AbstractBehavior):
         NEED_QUEST = 879908
         LANDED_ON_WRONG_MAP = 1002
 
+    # Failures any bot would meet again on the transition, shared through EdgeHealthStore. Timeouts, blocked
+    # cells or moves cut by an aggression stay with the bot that met them.
+    PERSISTED_FAILURES = (
+        errors.INVALID_TRANSITION,
+        errors.NEED_QUEST,
+        errors.LANDED_ON_WRONG_MAP,
+        MovementFailError.INVALID_TRANSITION,
+        MovementFailError.NO_VALID_SCROLL_CELL,
+    )
+
     TRANSITION_PREFERENCES = {
         TransitionTypeEnum.MAP_ACTION: 1,      # Highest priority - basic map change
         TransitionTypeEnum.SCROLL: 2,          # Walking between maps
@@ -73,6 +85,8 @@ class ChangeMap(AbstractBehavior):
     def onServerTextInfo(self, event, msgId, msgType, textId, text, params):
         if textId == 4908:
             Logger().error("Need a quest to be completed")
+            if self.transition:
+                EdgeHealthStore.recordFailure(self.edge, self.transition.type, self.errors.NEED_QUEST)
             return self.finish(self.errors.NEED_QUEST, "Need a quest to be completed")
 
     @property
@@ -92,10 +106,14 @@ class ChangeMap(AbstractBehavior):
             Logger().warning("No valid transitions found!")
             return iter([])
 
-        # Sort transitions based on preference map
+        # Sort transitions based on preference map, those that failed recently on this edge come last
         sorted_transitions = sorted(
             valid_transitions,
-            key=lambda tr: self.TRANSITION_PREFERENCES.get(TransitionTypeEnum(tr.type), 999)
+            key=lambda tr: (
+                self.edge is not None
+                and EdgeHealthStore.transitionPenalty(self.edge, tr.type) >= EdgeHealthStore.BROKEN_SCORE,
+                self.TRANSITION_PREFERENCES.get(TransitionTypeEnum(tr.type), 999),
+            )
         )
 
         return iter(sorted_transitions)
@@ -104,8 +122,12 @@ class ChangeMap(AbstractBehavior):
         if error:
             Logger().error(f"Transition {self.transition} failed for reason [{code}] : {error}")
             self._tr_fails_details[self.transition] = f"Transition failed for reason [{code}] : {error}"
+            if code in self.PERSISTED_FAILURES:
+                EdgeHealthStore.recordFailure(self.edge, self.transition.type, code)
             return self.followTransition()
 
+        if self.edge and PlayedCharacterManager().currVertex == self.edge.dst:
+            EdgeHealthStore.recordSuccess(self.edge, self.transition.type)
         self.finish(0, None, self.transition)
 
     def followTransition(self):
@@ -0,0 +1,55 @@
+import threading
+from typing import List, Tuple
+
+from pydofus2.com.ankamagames.atouin.utils.DataMapProvider import DataMapProvider
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+
+CELLS_COUNT = 560
+
+
+class MapCellGraph:
+    """
+    Walkable cells of roleplay maps as a neighbour table, built once per map from the current map data
+    and shared by every bot of the process.
+    """
+
+    _neighboursByMap = dict[int, List[Tuple[int, ...]]]()
+    _lock = threading.Lock()
+    _MAX_MAPS = 64
+
+    @classmethod
+    def walkableNeighbours(cls, mapId: int) -> List[Tuple[int, ...]]:
+        """Walkable cells next to each cell of the current map, indexed by cell id"""
+        with cls._lock:
+            table = cls._neighboursByMap.get(mapId)
+        if table is not None:
+            return table
+        table = []
+        for cellId in range(CELLS_COUNT):
+            neighbours = []
+            for x, y in MapPoint.fromCellId(cellId).iterChildren():
+                if MapPoint.isInMap(x, y) and DataMapProvider().pointMov(x, y):
+                    neighbours.append(MapPoint.fromCoords(x, y).cellId)
+            table.append(tuple(neighbours))
+        with cls._lock:
+            if len(cls._neighboursByMap) >= cls._MAX_MAPS:
+                cls._neighboursByMap.clear()
+            cls._neighboursByMap[mapId] = table
+        return table
+
+    @classmethod
+    def flood(cls, mapId: int, startCellId: int) -> List[int]:
+        """Steps from startCellId to every cell of the map, -1 for the cells that can't be walked to"""
+        neighbours = cls.walkableNeighbours(mapId)
+        steps = [-1] * CELLS_COUNT
+        steps[startCellId] = 0
+        frontier = [startCellId]
+        while frontier:
+            nextFrontier = []
+            for cellId in frontier:
+                for nextCellId in neighbours[cellId]:
+                    if steps[nextCellId] == -1:
+                        steps[nextCellId] = steps[cellId] + 1
+                        nextFrontier.append(nextCellId)
+            frontier = nextFrontier
+        return steps
@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Edge import Edge
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import Vertex
+
+
+class PathCursor:
+    """
+    Progress of a trip along a world path.
+
+    Edges are indexed by the UID of their source vertex once per path, so locating the player on the path is a
+    dict lookup. A player that lands off the path is brought back by splicing a detour that ends on one of the
+    vertices of the path still ahead.
+    """
+
+    def __init__(self, path: List[Edge]):
+        self.path: List[Edge] = []
+        self.position = 0
+        self._indexByUid = dict[str, int]()
+        self._reset(path)
+
+    def _reset(self, path: List[Edge]) -> None:
+        indexByUid = {}
+        for i, edge in enumerate(path):
+            if edge is None:
+                raise Exception("Found a None edge step, should never happen!")
+            indexByUid.setdefault(edge.src.UID, i)
+        self.path = path
+        self.position = 0
+        self._indexByUid = indexByUid
+
+    def __len__(self) -> int:
+        return len(self.path)
+
+    def indexOf(self, vertex: Vertex) -> Optional[int]:
+        """Index of the edge leaving the vertex, None when the vertex is off the path"""
+        index = self._indexByUid.get(vertex.UID)
+        if index is not None:
+            self.position = max(self.position, index)
+        return index
+
+    def remainingVertices(self) -> List[Vertex]:
+        """Vertices of the path not walked yet, destination included"""
+        if not self.path:
+            return []
+        return [edge.src for edge in self.path[self.position:]] + [self.path[-1].dst]
+
+    def splice(self, detour: List[Edge]) -> bool:
+        """Puts the detour in front of the rest of the path from where the detour joins it"""
+        if not detour:
+            return False
+        join = detour[-1].dst
+        if join.UID in self._indexByUid:
+            rest = self.path[self._indexByUid[join.UID]:]
+        elif join.UID == self.path[-1].dst.UID:
+            rest = []
+        else:
+            return False
+        self._reset(list(detour) + rest)
+        return True
@@ -0,0 +1,265 @@
+import heapq
+import threading
+from dataclasses import dataclass, field
+from enum import Enum
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
+from pyd2bot.misc.Localizer import Localizer
+from pydofus2.com.ankamagames.dofus.datacenter.world.Hint import Hint
+from pydofus2.com.ankamagames.dofus.datacenter.world.SubArea import SubArea
+from pydofus2.com.ankamagames.dofus.internalDatacenter.DataEnum import DataEnum
+from pydofus2.com.ankamagames.dofus.kernel.Kernel import Kernel
+from pydofus2.com.ankamagames.dofus.logic.common.managers.PlayerManager import PlayerManager
+from pydofus2.com.ankamagames.dofus.logic.game.common.managers.InventoryManager import InventoryManager
+from pydofus2.com.ankamagames.dofus.logic.game.common.managers.PlayedCharacterManager import \
+    PlayedCharacterManager
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.astar.AStar import AStar
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Edge import Edge
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.MapMemoryManager import MapMemoryManager
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.TransitionTypeEnum import TransitionTypeEnum
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import Vertex
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.WorldGraph import WorldGraph
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+
+
+class TripStepKind(Enum):
+    WALK = 0
+    ZAAP = 1
+    HAVENBAG = 2
+    RECALL = 3
+
+
+@dataclass
+class TripStep:
+    kind: TripStepKind
+    src: Vertex
+    dst: Vertex
+    seconds: float
+    kamas: int = 0
+    # World graph edge followed by a WALK step
+    edge: Optional[Edge] = None
+
+
+@dataclass
+class TripPlan:
+    steps: List[TripStep] = field(default_factory=list)
+    seconds: float = 0
+    kamas: int = 0
+
+    @property
+    def usesTeleports(self) -> bool:
+        return any(step.kind != TripStepKind.WALK for step in self.steps)
+
+    def walkEdges(self) -> List[Edge]:
+        return [step.edge for step in self.steps if step.kind == TripStepKind.WALK]
+
+
+class TripPlanner:
+    """
+    Fastest way to a destination over the world graph extended with teleports, within a kamas budget.
+
+    Edges of the world graph are weighted by the time their fastest valid transition takes. On top of them:
+    - zaap teleports from every zaap map to the known zaaps, priced like the zaap dialog prices them;
+    - havenbag jumps to the known zaaps from the start vertex;
+    - a recall potion jump to the saved zaap from the start vertex, when one is in the inventory.
+    Havenbag and recall jumps are usable from anywhere, walking before them only delays them, so they are
+    only offered at the start.
+
+    The search is a Dijkstra on time keeping, per vertex, the labels no faster label beats on kamas, so a
+    cheaper but slower way to a vertex survives when the faster one would break the budget.
+    """
+
+    # Rough timings, loading screens included
+    TRANSITION_SECONDS = {
+        TransitionTypeEnum.SCROLL: 6,
+        TransitionTypeEnum.SCROLL_ACTION: 6,
+        TransitionTypeEnum.MAP_ACTION: 6,
+        TransitionTypeEnum.INTERACTIVE: 8,
+        TransitionTypeEnum.NPC_TRAVEL: 15,
+        TransitionTypeEnum.ZAAP: 10,
+        TransitionTypeEnum.HAVEN_BAG_ZAAP: 14,
+        TransitionTypeEnum.ITEM_TELEPORT: 6,
+    }
+    ZAAP_SECONDS = 10
+    HAVENBAG_SECONDS = 14
+    RECALL_SECONDS = 6
+    # Added per recent failure of a transition, see EdgeHealthStore
+    FAILURE_SECONDS = 60
+    MAX_EXPANDED = 200000
+
+    def __init__(self):
+        self._zaapMapIds = frozenset(Hint.getZaapMapIds())
+        self._isAnkarnam = dict[float, bool]()
+        self._hasRecallPotion = False
+
+    def planAsync(self, src: Vertex, dstVertices: Iterable[Vertex], kamasBudget: int, callback) -> None:
+        """
+        Calls back on the calling bot's worker with the fastest plan from src to one of the destination vertices
+        costing at most kamasBudget kamas, or None.
+        Everything the search reads through per-thread singletons is resolved here, on the calling thread, the
+        search itself runs on its own thread.
+        """
+        kernel = Kernel()
+        logger = Logger()
+        worldGraph = WorldGraph()
+        targets = {v.UID for v in dstVertices if v is not None}
+        if not targets:
+            return kernel.defer(lambda: callback(None))
+        kamasBudget = max(0, min(kamasBudget, PlayedCharacterManager().characteristics.kamas))
+        self._hasRecallPotion = self.hasRecallPotion()
+        zaapDestinations = self._zaapDestinations()
+        startSteps = list(self._jumpSteps(src, zaapDestinations))
+        forbidden = {(edge.src.UID, edge.dst.UID) for edge in AStar().forbiddenEdges}
+        for mapId in self._zaapMapIds:
+            self._inAnkarnam(mapId)
+
+        def search():
+            try:
+                plan = self._search(
+                    src, targets, kamasBudget, zaapDestinations, startSteps, forbidden, worldGraph, logger
+                )
+            except Exception as e:
+                logger.error(f"Trip planning failed: {e}", exc_info=True)
+                plan = None
+            kernel.defer(lambda: callback(plan))
+
+        threading.Thread(target=search, name=f"{threading.current_thread().name}-TripPlanner", daemon=True).start()
+
+    def _search(
+        self,
+        src: Vertex,
+        targets: Set[str],
+        kamasBudget: int,
+        zaapDestinations: Dict[float, Vertex],
+        startSteps: List[TripStep],
+        forbidden: Set[Tuple[str, str]],
+        worldGraph: WorldGraph,
+        logger: Logger,
+    ) -> Optional[TripPlan]:
+        tie = count()
+        # label: (seconds, kamas, tie, vertex, step, parent label)
+        start = (0.0, 0, next(tie), src, None, None)
+        frontier = [start]
+        settled = dict[str, List[int]]()
+        expanded = 0
+        while frontier:
+            label = heapq.heappop(frontier)
+            seconds, kamas, _, vertex, _, _ = label
+            kept = settled.setdefault(vertex.UID, [])
+            if any(k <= kamas for k in kept):
+                continue
+            kept.append(kamas)
+            if vertex.UID in targets:
+                return self._unwind(label)
+            expanded += 1
+            if expanded > self.MAX_EXPANDED:
+                logger.warning(f"Trip planning gave up after expanding {expanded} vertices")
+                return None
+            steps = list(self._walkSteps(vertex, forbidden, worldGraph))
+            steps.extend(self._zaapSteps(vertex, zaapDestinations))
+            if label is start:
+                steps.extend(startSteps)
+            for step in steps:
+                nextKamas = kamas + step.kamas
+                if nextKamas > kamasBudget:
+                    continue
+                if any(k <= nextKamas for k in settled.get(step.dst.UID, ())):
+                    continue
+                heapq.heappush(frontier, (seconds + step.seconds, nextKamas, next(tie), step.dst, step, label))
+        return None
+
+    @staticmethod
+    def _unwind(label) -> TripPlan:
+        seconds, kamas = label[0], label[1]
+        steps = []
+        while label[4] is not None:
+            steps.append(label[4])
+            label = label[5]
+        steps.reverse()
+        return TripPlan(steps, seconds, kamas)
+
+    def _walkSteps(
+        self, vertex: Vertex, forbidden: Set[Tuple[str, str]], worldGraph: WorldGraph
+    ) -> Iterable[TripStep]:
+        for edge in worldGraph.getOutgoingEdgesFromVertex(vertex):
+            if (edge.src.UID, edge.dst.UID) in forbidden:
+                continue
+            best = None
+            for tr in edge.transitions:
+                if not tr.isValid:
+                    continue
+                ttype = TransitionTypeEnum(tr.type)
+                if ttype == TransitionTypeEnum.ITEM_TELEPORT and not self._hasRecallPotion:
+                    continue
+                failures = EdgeHealthStore.transitionPenalty(edge, tr.type)
+                if failures >= EdgeHealthStore.BROKEN_SCORE:
+                    continue
+                kamas = 0
+                if ttype in (TransitionTypeEnum.ZAAP, TransitionTypeEnum.HAVEN_BAG_ZAAP):
+                    kamas = Localizer.zaapTeleportCost(edge.src.mapId, edge.dst.mapId)
+                seconds = self.TRANSITION_SECONDS.get(ttype, self.ZAAP_SECONDS) + self.FAILURE_SECONDS * failures
+                cost = (seconds, kamas)
+                if best is None or cost < best:
+                    best = cost
+            if best is not None:
+                yield TripStep(TripStepKind.WALK, vertex, edge.dst, best[0], best[1], edge)
+
+    def _zaapSteps(self, vertex: Vertex, zaapDestinations: Dict[float, Vertex]) -> Iterable[TripStep]:
+        if vertex.mapId not in self._zaapMapIds:
+            return
+        for mapId, landing in zaapDestinations.items():
+            if mapId != vertex.mapId and self._zaapAllowed(vertex.mapId, mapId):
+                kamas = Localizer.zaapTeleportCost(vertex.mapId, mapId)
+                yield TripStep(TripStepKind.ZAAP, vertex, landing, self.ZAAP_SECONDS, kamas)
+
+    def _jumpSteps(self, vertex: Vertex, zaapDestinations: Dict[float, Vertex]) -> Iterable[TripStep]:
+        if self.canUseHavenbag(vertex.mapId):
+            for mapId, landing in zaapDestinations.items():
+                if mapId != vertex.mapId and self._zaapAllowed(vertex.mapId, mapId):
+                    kamas = Localizer.zaapTeleportCost(vertex.mapId, mapId)
+                    yield TripStep(TripStepKind.HAVENBAG, vertex, landing, self.HAVENBAG_SECONDS, kamas)
+        spawnMapId = Kernel().zaapFrame.spawnMapId if Kernel().zaapFrame else None
+        if spawnMapId and spawnMapId != vertex.mapId and self._hasRecallPotion:
+            landing = self.landingVertex(spawnMapId)
+            if landing is not None:
+                yield TripStep(TripStepKind.RECALL, vertex, landing, self.RECALL_SECONDS)
+
+    def _zaapDestinations(self) -> Dict[float, Vertex]:
+        destinations = {}
+        for mapId in PlayedCharacterManager().knownZaapMapIds or ():
+            landing = self.landingVertex(mapId)
+            if landing is not None:
+                destinations[mapId] = landing
+        return destinations
+
+    def _zaapAllowed(self, srcMapId: float, dstMapId: float) -> bool:
+        """Zaaps don't link Ankarnam and the rest of the world"""
+        return self._inAnkarnam(srcMapId) == self._inAnkarnam(dstMapId)
+
+    def _inAnkarnam(self, mapId: float) -> bool:
+        if mapId not in self._isAnkarnam:
+            subArea = SubArea.getSubAreaByMapId(mapId)
+            self._isAnkarnam[mapId] = subArea is not None and subArea.areaId == DataEnum.ANKARNAM_AREA_ID
+        return self._isAnkarnam[mapId]
+
+    @staticmethod
+    def landingVertex(mapId: float) -> Optional[Vertex]:
+        vertex = WorldGraph().getVertex(mapId, 1)
+        if vertex is None:
+            vertex = next(iter(WorldGraph().getVertices(mapId).values()), None)
+        return vertex
+
+    @staticmethod
+    def canUseHavenbag(mapId: float) -> bool:
+        if PlayerManager().isBasicAccount() or PlayedCharacterManager().infos.level < 10:
+            return False
+        return MapMemoryManager().is_havenbag_allowed(mapId) is not False
+
+    @staticmethod
+    def hasRecallPotion() -> bool:
+        return any(
+            iw.objectGID == DataEnum.RAPPEL_POTION_GUID
+            for iw in InventoryManager().inventory.getView("storageConsumables").content
+        )
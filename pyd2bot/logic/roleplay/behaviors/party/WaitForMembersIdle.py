@@ -1,8 +1,9 @@
 import json
-import threading
+from typing import TYPE_CHECKING
 
 from pyd2bot.logic.roleplay.behaviors.AbstractBehavior import AbstractBehavior
 from pyd2bot.data.models import Character
+from pyd2bot.misc.DeadlineScheduler import DeadlineScheduler
 from pydofus2.com.ankamagames.atouin.managers.MapDisplayManager import \
     MapDisplayManager
 from pydofus2.com.ankamagames.berilia.managers.Listener import Listener
@@ -17,9 +18,13 @@ from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
 from pydofus2.com.ankamagames.berilia.managers.KernelEvent import KernelEvent
 from pydofus2.com.ankamagames.berilia.managers.KernelEventsManager import \
     KernelEventsManager
-    
+
+if TYPE_CHECKING:
+    from pyd2bot.logic.common.frames.BotRPCFrame import BotRPCFrame
+
 class WaitForMembersIdle(AbstractBehavior):
     GET_STATUS_TIMEOUT = 992
+    GET_STATUS_TIMEOUT_SECONDS = 10
     MEMBER_RECONNECT_WAIT_TIMEOUT = 30
     MEMBER_DISCONNECTED = 997
     
@@ -33,40 +38,57 @@ class WaitForMembersIdle(AbstractBehavior):
     def run(self, members: list[Character], leader: Character) -> bool:
         self.leader = leader
         self.members = members
-        thread_name = threading.current_thread().name
-        self.status_thread = threading.Thread(target=self.fetchStatuses, name=thread_name)
-        self.status_thread.daemon = True
-        self.status_thread.start()
-        
+        self.fetchStatuses()
+
+    @property
+    def rpcFrame(self) -> "BotRPCFrame":
+        return Kernel().worker.getFrameByName("BotRPCFrame")
+
     def fetchStatuses(self):
-        Logger().debug("Fetch status started")
-        if not self.isRunning():
+        """Asks every connected member for its status at once, the round lasts as long as the slowest one"""
+        if not self.isRunning() or Kernel().worker.terminated.is_set():
             return
-        while not Kernel().worker.terminated.is_set():
-            Logger().debug("Fetching members statuses ...")
-            self.memberStatus = {member.accountId: self.getMuleStatus(member.accountId) for member in self.members}
-            Logger().debug(json.dumps(self.memberStatus, indent=2))
-            if any(status != "idle" for status in self.memberStatus.values()):
-                Logger().info(f"Some of the members are not idle!")
-                if any(status == "disconnected" for status in self.memberStatus.values()):
-                    Logger().debug("Some members are disconnected will wait for 10 seconds before fetching again")
-                    if Kernel().worker.terminated.wait(5):
-                        Logger().debug("fetch members status will shutdown because worker terminated!")
-                        return
-                else:
-                    if Kernel().worker.terminated.wait(2):
-                        Logger().debug("fetch members status will shutdown because worker terminated!")
-                        return
+        Logger().debug("Fetching members statuses ...")
+        self.memberStatus = {}
+        connected = []
+        for member in self.members:
+            if self.isDisconnected(member.accountId):
+                self.memberStatus[member.accountId] = "disconnected"
             else:
-                Logger().info(f"All members are idle.")
-                return self.finish(0)
-        Logger().debug("Fetch status finished because worker is terminated")
-    
-    def getMuleStatus(self, instanceId):
+                connected.append(member.accountId)
+        self.rpcFrame.askForStatusAll(connected, self.onStatuses, timeout=self.GET_STATUS_TIMEOUT_SECONDS)
+
+    def onStatuses(self, results: dict, errors: dict):
+        if not self.isRunning():
+            return
+        self.memberStatus.update(results)
+        for accountId, error in errors.items():
+            Logger().warning(f"Member {accountId} didn't answer the status request: {error}")
+            self.memberStatus[accountId] = "unresponsive"
+        Logger().debug(json.dumps(self.memberStatus, indent=2))
+        if all(status == "idle" for status in self.memberStatus.values()):
+            Logger().info(f"All members are idle.")
+            return self.finish(0)
+        Logger().info(f"Some of the members are not idle!")
+        if any(status == "disconnected" for status in self.memberStatus.values()):
+            Logger().debug("Some members are disconnected will wait for 5 seconds before fetching again")
+            delay = 5
+        else:
+            delay = 2
+        kernel = Kernel()
+        DeadlineScheduler().schedule(delay, lambda: kernel.defer(self.fetchStatuses))
+
+    @staticmethod
+    def isDisconnected(instanceId) -> bool:
+        connection = ConnectionsHandler.getInstance(instanceId)
+        return not connection or connection.connectionType == ConnectionType.DISCONNECTED
+
+    @staticmethod
+    def getMuleStatus(instanceId):
+        """Status of the bot, answered by the bot itself to the leader's GetStatusMessage"""
         Logger().debug(f"Fetching player {instanceId} status")
         try:
-            if not ConnectionsHandler.getInstance(instanceId) or \
-                ConnectionsHandler.getInstance(instanceId).connectionType == ConnectionType.DISCONNECTED:
+            if WaitForMembersIdle.isDisconnected(instanceId):
                 return "disconnected"
             elif ConnectionsHandler.getInstance(instanceId).connectionType == ConnectionType.TO_LOGIN_SERVER:
                 return "authenticating"
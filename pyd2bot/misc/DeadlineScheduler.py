@@ -0,0 +1,80 @@
+import heapq
+import threading
+from itertools import count
+from time import perf_counter
+from typing import Callable, List
+
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+from pydofus2.com.ankamagames.jerakine.metaclass.ThreadSharedSingleton import ThreadSharedSingleton
+
+
+class DeadlineScheduler(metaclass=ThreadSharedSingleton):
+    """
+    Runs callbacks at their deadline from a single daemon thread shared by every bot of the process.
+
+    Deadlines sit in a heap, the thread sleeps until the earliest one. Cancelling only marks the entry, cancelled
+    entries are dropped when they reach the top of the heap or when they outnumber the live ones.
+    """
+
+    COMPACT_MIN = 256
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._cancelled = 0
+        self._seq = count()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread = None
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> list:
+        """Returns the entry to give to cancel"""
+        entry = [perf_counter() + delay, next(self._seq), callback]
+        with self._cond:
+            heapq.heappush(self._heap, entry)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="DeadlineScheduler", daemon=True)
+                self._thread.start()
+            if self._heap[0] is entry:
+                self._cond.notify()
+        return entry
+
+    def cancel(self, entry: list) -> bool:
+        """False when the callback already ran or was cancelled"""
+        with self._cond:
+            if entry[2] is None:
+                return False
+            entry[2] = None
+            self._cancelled += 1
+            if self._cancelled > self.COMPACT_MIN and self._cancelled > len(self._heap) // 2:
+                self._heap = [e for e in self._heap if e[2] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+            return True
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap) - self._cancelled
+
+    def _next(self) -> Callable[[], None]:
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2] is None:
+                    heapq.heappop(self._heap)
+                    self._cancelled -= 1
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                wait = self._heap[0][0] - perf_counter()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                entry = heapq.heappop(self._heap)
+                callback, entry[2] = entry[2], None
+                return callback
+
+    def _run(self) -> None:
+        while True:
+            callback = self._next()
+            try:
+                callback()
+            except Exception as e:
+                Logger().error(f"Deadline callback failed: {e}", exc_info=True)
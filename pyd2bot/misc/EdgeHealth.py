@@ -0,0 +1,222 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional
+
+from pyd2bot.BotSettings import BotSettings
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.astar.AStar import AStar
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.WorldGraph import WorldGraph
+from pydofus2.com.ankamagames.jerakine.logger.Logger import Logger
+
+if TYPE_CHECKING:
+    from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Edge import Edge
+
+ANY_TRANSITION = "any"
+
+
+class EdgeHealthStore:
+    """
+    Failures of world graph edges, shared by every bot of the process and persisted across restarts.
+
+    Failures are counted per edge and transition type, the counts decay by half every `HALF_LIFE` seconds and
+    a success of the transition clears its count. An edge is broken once every of its transitions failed twice
+    recently, `BROKEN_SCORE` sits a little under 2 so the decay of the first failure doesn't hide the second.
+    Entries hold the map and zone ids of the edge ends so they can be resolved
+    back against the world graph.
+    The file is loaded in bulk on first use and written behind at most every `FLUSH_INTERVAL` seconds,
+    merged with what other processes wrote meanwhile.
+    """
+
+    HALF_LIFE = 12 * 3600
+    BROKEN_SCORE = 1.9
+    FLUSH_INTERVAL = 30
+    # Broken edges are resolved again at least this often, decay alone can heal an edge
+    RESOLVE_INTERVAL = 60
+    _file = os.path.join(BotSettings.PERSISTENCE_DIR, "edge_health.json")
+    _lock = threading.RLock()
+    _entries: dict[str, dict] = None
+    # Edges healed since the last flush, so the merge doesn't bring them back
+    _healed = set[str]()
+    _dirty = False
+    _lastFlush = 0.0
+    _version = 0
+    _brokenEdges: tuple[int, float, List["Edge"]] = (-1, 0.0, [])
+    # Edges forbidden by forbidBrokenEdges, per bot thread, so they can be allowed again once healed
+    _forbiddenByBot = dict[str, List["Edge"]]()
+
+    @staticmethod
+    def _key(edge: "Edge") -> str:
+        return f"{edge.src.UID}>{edge.dst.UID}"
+
+    @staticmethod
+    def _transitionKey(transitionType: Optional[int]) -> str:
+        return ANY_TRANSITION if transitionType is None else str(transitionType)
+
+    @classmethod
+    def _decayed(cls, record: list, now: float) -> float:
+        score, updatedAt = record
+        return score * math.pow(0.5, max(0.0, now - updatedAt) / cls.HALF_LIFE)
+
+    @classmethod
+    def load(cls) -> dict[str, dict]:
+        with cls._lock:
+            if cls._entries is not None:
+                return cls._entries
+            cls._entries = cls._read()
+            atexit.register(cls.flush)
+            Logger().debug(f"Loaded health of {len(cls._entries)} world edges")
+            return cls._entries
+
+    @classmethod
+    def _read(cls) -> dict[str, dict]:
+        if not os.path.exists(cls._file):
+            return {}
+        try:
+            with open(cls._file, "r") as fp:
+                return json.load(fp)
+        except Exception as e:
+            Logger().warning(f"Unable to read edge health store: {e}")
+            return {}
+
+    @classmethod
+    def recordFailure(cls, edge: "Edge", transitionType: Optional[int] = None, code=None) -> None:
+        if edge is None:
+            return
+        now = time.time()
+        with cls._lock:
+            entry = cls.load().setdefault(cls._key(edge), {
+                "src": [edge.src.mapId, edge.src.zoneId],
+                "dst": [edge.dst.mapId, edge.dst.zoneId],
+                "failures": {},
+            })
+            failures = entry["failures"]
+            trKey = cls._transitionKey(transitionType)
+            score = cls._decayed(failures[trKey], now) if trKey in failures else 0.0
+            failures[trKey] = [score + 1, now]
+            entry["lastCode"] = str(code)
+            cls._healed.discard(cls._key(edge))
+            cls._changed()
+        Logger().debug(f"Recorded failure [{code}] of transition {trKey} on edge {edge}")
+
+    @classmethod
+    def recordSuccess(cls, edge: "Edge", transitionType: Optional[int] = None) -> None:
+        if edge is None:
+            return
+        with cls._lock:
+            entry = cls.load().get(cls._key(edge))
+            if entry is None:
+                return
+            entry["failures"].pop(cls._transitionKey(transitionType), None)
+            entry["failures"].pop(ANY_TRANSITION, None)
+            if not entry["failures"]:
+                del cls._entries[cls._key(edge)]
+                cls._healed.add(cls._key(edge))
+            cls._changed()
+
+    @classmethod
+    def _changed(cls) -> None:
+        cls._dirty = True
+        cls._version += 1
+        if time.time() - cls._lastFlush > cls.FLUSH_INTERVAL:
+            cls.flush()
+
+    @classmethod
+    def transitionPenalty(cls, edge: "Edge", transitionType: int) -> float:
+        """Recent failures of the transition type on the edge, edge wide failures included"""
+        with cls._lock:
+            entry = cls.load().get(cls._key(edge))
+            if entry is None:
+                return 0.0
+            now = time.time()
+            failures = entry["failures"]
+            penalty = 0.0
+            for trKey in {cls._transitionKey(transitionType), ANY_TRANSITION}:
+                if trKey in failures:
+                    penalty += cls._decayed(failures[trKey], now)
+            return penalty
+
+    @classmethod
+    def penalty(cls, edge: "Edge") -> float:
+        """Recent failures of the edge, through its least failing valid transition"""
+        with cls._lock:
+            if cls._key(edge) not in cls.load():
+                return 0.0
+            return min(
+                (cls.transitionPenalty(edge, tr.type) for tr in edge.transitions if tr.isValid),
+                default=cls.transitionPenalty(edge, None),
+            )
+
+    @classmethod
+    def isBroken(cls, edge: "Edge") -> bool:
+        return cls.penalty(edge) >= cls.BROKEN_SCORE
+
+    @classmethod
+    def brokenEdges(cls) -> List["Edge"]:
+        """Broken edges resolved against the world graph, resolved again when the store changed or decayed"""
+        with cls._lock:
+            entries = cls.load()
+            now = time.time()
+            version, resolvedAt, edges = cls._brokenEdges
+            if version == cls._version and now - resolvedAt < cls.RESOLVE_INTERVAL:
+                return edges
+            edges = []
+            for key, entry in entries.items():
+                src = WorldGraph().getVertex(*entry["src"])
+                if src is None:
+                    continue
+                for edge in WorldGraph().getOutgoingEdgesFromVertex(src):
+                    if cls._key(edge) == key and cls.isBroken(edge):
+                        edges.append(edge)
+            cls._brokenEdges = (cls._version, now, edges)
+            return edges
+
+    @classmethod
+    def forbidBrokenEdges(cls) -> None:
+        """Makes the A* of the calling bot avoid the broken edges, and allows again those healed since"""
+        broken = cls.brokenEdges()
+        brokenKeys = {cls._key(edge) for edge in broken}
+        forbidden = AStar().forbiddenEdges
+        with cls._lock:
+            added = cls._forbiddenByBot.setdefault(threading.current_thread().name, [])
+            for edge in [e for e in added if cls._key(e) not in brokenKeys]:
+                added.remove(edge)
+                if edge in forbidden:
+                    forbidden.remove(edge)
+                    Logger().debug(f"Edge {edge} healed, allowed again")
+            for edge in broken:
+                if edge not in forbidden:
+                    AStar().addForbiddenEdge(edge, "Edge failed repeatedly lately")
+                    added.append(edge)
+
+    @classmethod
+    def flush(cls) -> None:
+        with cls._lock:
+            if not cls._dirty:
+                return
+            now = time.time()
+            entries = cls._read()
+            # Entries of other processes are kept, ours win for the edges we know about
+            entries.update(cls._entries)
+            for key in cls._healed:
+                entries.pop(key, None)
+            cls._healed.clear()
+            for key in list(entries):
+                failures = entries[key]["failures"]
+                for trKey in [k for k, record in failures.items() if cls._decayed(record, now) < 0.05]:
+                    del failures[trKey]
+                if not failures:
+                    del entries[key]
+            cls._entries = entries
+            tmp_file = f"{cls._file}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, "w") as fp:
+                    json.dump(entries, fp)
+                os.replace(tmp_file, cls._file)
+            except Exception as e:
+                Logger().warning(f"Unable to write edge health store: {e}")
+            cls._dirty = False
+            cls._lastFlush = now
+            cls._version += 1
@@ -3,6 +3,9 @@ import math
 import os
 from typing import Tuple
 
+from pyd2bot.misc.EdgeHealth import EdgeHealthStore
+from pyd2bot.misc.LocalizerCache import LocalizerQueryCache
+from pyd2bot.misc.WorldPathCache import WorldPathCache
 from pydofus2.com.ankamagames.dofus.datacenter.world.Hint import Hint
 from pydofus2.com.ankamagames.dofus.datacenter.world.MapPosition import \
     MapPosition
@@ -57,19 +60,39 @@ class Localizer:
         BANKS: dict = json.load(f)
 
     @classmethod
-    def findClosestBankAsync(
-        cls,
-        callback,
-        excludeMaps: list[float] = None,
-    ) -> tuple[list["Edge"], "BankInfos"]:
-        if not excludeMaps:
-            excludeMaps = []
+    def playerState(cls) -> tuple:
+        """Player state the candidate sets depend on"""
+        return (
+            PlayerManager().isBasicAccount(),
+            frozenset(PlayedCharacterManager().knownZaapMapIds or ()),
+        )
 
-        is_basic_account = PlayerManager().isBasicAccount()
+    @staticmethod
+    def zaapTeleportCost(srcMapId: float, dstMapId: float) -> int:
+        """Kamas a zaap teleport costs, from the world distance between the two maps"""
+        smp = MapPosition.getMapPositionById(srcMapId)
+        dmp = MapPosition.getMapPositionById(dstMapId)
+        return 10 * int(math.sqrt((dmp.posX - smp.posX) ** 2 + (dmp.posY - smp.posY) ** 2))
 
-        startVertex = PlayedCharacterManager().currVertex
+    @classmethod
+    def _searchClosestAsync(cls, category, src: Vertex, candidates: list[Vertex], callback):
+        EdgeHealthStore.forbidBrokenEdges()
+        state = cls.playerState()
+        dst = WorldPathCache.destinationKey(candidates)
+        found, path = WorldPathCache.get(state, src, dst, AStar().forbiddenEdges)
+        if found:
+            Logger().debug(f"Closest {category} path from {src} served from cache")
+            return Kernel().defer(lambda: callback(0, None, path))
 
-        # Dictionary to map vertices to their corresponding banks
+        def on_result(code, err, path):
+            if not err and code == 0 and path is not None:
+                WorldPathCache.put(state, src, dst, path)
+            callback(code, err, path)
+
+        return AStar().search_async(src, candidates, callback=on_result)
+
+    @classmethod
+    def _bankCandidates(cls, is_basic_account: bool) -> tuple[list[Vertex], dict]:
         vertex_bank_map = {}
         candidates = []
         
@@ -77,10 +100,6 @@ class Localizer:
         for bank_name, bank_info in cls.BANKS.items():
             bank_map_id = bank_info["npcMapId"]
             
-            # Skip excluded maps
-            if bank_map_id in excludeMaps:
-                continue
-            
             # Check account restrictions for the bank map
             if is_basic_account:
                 bank_subarea = SubArea.getSubAreaByMapId(bank_map_id)
@@ -94,6 +113,53 @@ class Localizer:
                 candidates.append(vertex)
                 vertex_bank_map[vertex] = bank_info
 
+        return candidates, vertex_bank_map
+
+    @classmethod
+    def _hintCandidates(cls, gfx, is_basic_account: bool) -> tuple[list[Vertex], dict]:
+        candidates = []
+        
+        for hint in Hint.getHints():
+            if hint.gfx != gfx:
+                continue
+                
+            if is_basic_account:
+                hint_subarea = SubArea.getSubAreaByMapId(hint.mapId)
+                if hint_subarea and not hint_subarea.basicAccountAllowed:
+                    continue
+
+            hint_vertices = WorldGraph().getVertices(hint.mapId).values()
+            for vertex in hint_vertices:
+                candidates.append(vertex)
+
+        return candidates, {}
+
+    @classmethod
+    def _zaapCandidates(cls) -> tuple[list[Vertex], dict]:
+        candidates = []
+        for mapId in Hint.getZaapMapIds():
+            candidates.extend(list(WorldGraph().getVertices(mapId).values()))
+        return candidates, {}
+
+    @classmethod
+    def findClosestBankAsync(
+        cls,
+        callback,
+        excludeMaps: list[float] = None,
+    ) -> tuple[list["Edge"], "BankInfos"]:
+        if not excludeMaps:
+            excludeMaps = []
+
+        is_basic_account = PlayerManager().isBasicAccount()
+
+        startVertex = PlayedCharacterManager().currVertex
+
+        # Dictionary to map vertices to their corresponding banks
+        candidates, vertex_bank_map = LocalizerQueryCache.getCandidates(
+            "bank", is_basic_account, lambda: cls._bankCandidates(is_basic_account)
+        )
+        candidates = [v for v in candidates if vertex_bank_map[v]["npcMapId"] not in excludeMaps]
+
         if not candidates:
             Logger().warning("Could not find any accessible bank from current position")
             return None, None
@@ -114,7 +180,7 @@ class Localizer:
 
             callback(code, err, None, None)
 
-        return AStar().search_async(PlayedCharacterManager().currVertex, candidates, callback=on_result)
+        return cls._searchClosestAsync("bank", startVertex, candidates, on_result)
 
     @classmethod
     def findClosestHintMapByGfxAsync(
@@ -129,23 +195,10 @@ class Localizer:
         Logger().debug(f"Searching closest hint with GFX {gfx} from {PlayedCharacterManager().currVertex}")
 
         is_basic_account = PlayerManager().isBasicAccount()
-        candidates = []
-        
-        for hint in Hint.getHints():
-            if int(hint.mapId) in excludeMaps:
-                continue
-            
-            if hint.gfx != gfx:
-                continue
-                
-            if is_basic_account:
-                hint_subarea = SubArea.getSubAreaByMapId(hint.mapId)
-                if hint_subarea and not hint_subarea.basicAccountAllowed:
-                    continue
-
-            hint_vertices = WorldGraph().getVertices(hint.mapId).values()
-            for vertex in hint_vertices:
-                candidates.append(vertex)
+        candidates, _ = LocalizerQueryCache.getCandidates(
+            ("hint", gfx), is_basic_account, lambda: cls._hintCandidates(gfx, is_basic_account)
+        )
+        candidates = [v for v in candidates if int(v.mapId) not in excludeMaps]
 
         if not candidates:
             Logger().warning(f"Could not find any accessible candidate maps with GFX {gfx}")
@@ -153,7 +206,7 @@ class Localizer:
 
         Logger().debug(f"Found {len(candidates)} accessible candidate maps for hint GFX {gfx}")
                 
-        return AStar().search_async(PlayedCharacterManager().currVertex, candidates, callback=callback)
+        return cls._searchClosestAsync(("hint", gfx), PlayedCharacterManager().currVertex, candidates, callback)
 
     @classmethod
     def findPathToClosestZaapAsync(
@@ -168,27 +221,30 @@ class Localizer:
             excludeMaps = []
 
         if dstZaapMapId:
-            dmp = MapPosition.getMapPositionById(dstZaapMapId)
+            maxCost = min(PlayedCharacterManager().characteristics.kamas, maxCost)
         
         # Collect all valid zaap candidates first
+        knownZaapMapIds = PlayedCharacterManager().knownZaapMapIds or ()
+        allZaapVertices, _ = LocalizerQueryCache.getCandidates("zaap", None, cls._zaapCandidates)
         candidates = []
-        for mapId in Hint.getZaapMapIds():
-            if onlyKnownZaap and not PlayedCharacterManager().isZaapKnown():
+        for vertex in allZaapVertices:
+            if vertex.mapId in excludeMaps:
+                continue
+
+            if onlyKnownZaap and vertex.mapId not in knownZaapMapIds:
                 continue
                 
             if dstZaapMapId:
-                cmp = MapPosition.getMapPositionById(mapId)
-                cost = 10 * int(math.sqrt((dmp.posX - cmp.posX) ** 2 + (dmp.posY - cmp.posY) ** 2))
-                if cost > min(PlayedCharacterManager().characteristics.kamas, maxCost):
+                if cls.zaapTeleportCost(vertex.mapId, dstZaapMapId) > maxCost:
                     continue
                     
-            candidates.extend(list(WorldGraph().getVertices(mapId).values()))
+            candidates.append(vertex)
         
         if not candidates:
             Logger().warning(f"Could not find a candidate zaap")
             return None
                 
-        return AStar().search_async(PlayedCharacterManager().currVertex, candidates, callback=callback)
+        return cls._searchClosestAsync("zaap", PlayedCharacterManager().currVertex, candidates, callback)
 
     @classmethod
     def  findDestVertexAsync(cls, src_vertex, dst_mapId, callback, rpZ=1) -> Tuple[Vertex, list[Edge]]:
@@ -0,0 +1,39 @@
+import threading
+from typing import Callable, Hashable, List, Tuple
+
+from pyd2bot.misc.WorldPathCache import WorldPathCache
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import \
+    Vertex
+
+
+class LocalizerQueryCache:
+    """
+    Shared cache for the Localizer closest-target candidates.
+
+    Candidate vertex sets are built once per target category and player state (account type, known zaaps).
+    The paths to them are kept in the WorldPathCache, keyed by the same player state, a change of
+    subscription or of known zaaps simply lands on other entries.
+    """
+
+    _lock = threading.Lock()
+    _candidates = dict[Tuple[Hashable, Hashable], Tuple[List[Vertex], dict]]()
+
+    @classmethod
+    def getCandidates(
+        cls, category: Hashable, state: Hashable, build: Callable[[], Tuple[List[Vertex], dict]]
+    ) -> Tuple[List[Vertex], dict]:
+        """Returns (candidate vertices, vertex -> target infos) for the category, built on first use"""
+        key = (category, state)
+        with cls._lock:
+            entry = cls._candidates.get(key)
+        if entry is None:
+            entry = build()
+            with cls._lock:
+                cls._candidates[key] = entry
+        return entry
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._candidates.clear()
+        WorldPathCache.invalidate()
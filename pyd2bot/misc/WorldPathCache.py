@@ -0,0 +1,96 @@
+import threading
+from collections import OrderedDict
+from time import perf_counter
+from typing import Hashable, Iterable, List, Optional, Set, Tuple
+
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Edge import \
+    Edge
+from pydofus2.com.ankamagames.dofus.modules.utils.pathFinding.world.Vertex import \
+    Vertex
+
+EntryKey = Tuple[Hashable, str, frozenset]
+
+
+class WorldPathCache:
+    """
+    World paths found by A*, shared by every bot of the process.
+
+    Entries are keyed by (player state, source vertex UID, destination vertices UIDs) and evicted least
+    recently used first. Forbidden edges are kept per bot, so a path is only served to a bot that doesn't
+    forbid one of its edges, instead of keying entries by the forbidden set and sharing none of them.
+    Each edge knows the entries going through it: an edge found broken drops only those.
+    """
+
+    RESULT_TTL = 15 * 60
+    MAX_ENTRIES = 4096
+
+    _lock = threading.Lock()
+    _entries = OrderedDict[EntryKey, Tuple[Optional[List[Edge]], float]]()
+    _entriesByEdge = dict[Tuple[str, str], Set[EntryKey]]()
+
+    @staticmethod
+    def _edgeKey(edge: Edge) -> Tuple[str, str]:
+        return edge.src.UID, edge.dst.UID
+
+    @staticmethod
+    def destinationKey(dst: Iterable[Vertex]) -> frozenset:
+        return frozenset(v.UID for v in dst)
+
+    @classmethod
+    def get(
+        cls, state: Hashable, src: Vertex, dst: frozenset, forbidden: Iterable[Edge] = ()
+    ) -> Tuple[bool, Optional[List[Edge]]]:
+        """Returns (found, path), a found path can be None when the destination was found unreachable"""
+        key = (state, src.UID, dst)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return False, None
+            path, stored_at = entry
+            if perf_counter() - stored_at > cls.RESULT_TTL:
+                cls._drop(key)
+                return False, None
+            cls._entries.move_to_end(key)
+        if path and forbidden:
+            forbiddenKeys = {cls._edgeKey(edge) for edge in forbidden}
+            if any(cls._edgeKey(edge) in forbiddenKeys for edge in path):
+                return False, None
+        return True, path
+
+    @classmethod
+    def put(cls, state: Hashable, src: Vertex, dst: frozenset, path: Optional[List[Edge]]) -> None:
+        key = (state, src.UID, dst)
+        with cls._lock:
+            if key in cls._entries:
+                cls._drop(key)
+            cls._entries[key] = (path, perf_counter())
+            for edge in path or ():
+                cls._entriesByEdge.setdefault(cls._edgeKey(edge), set()).add(key)
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._drop(next(iter(cls._entries)))
+
+    @classmethod
+    def _drop(cls, key: EntryKey) -> None:
+        path, _ = cls._entries.pop(key)
+        for edge in path or ():
+            keys = cls._entriesByEdge.get(cls._edgeKey(edge))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del cls._entriesByEdge[cls._edgeKey(edge)]
+
+    @classmethod
+    def invalidate(cls, edge: Edge = None) -> None:
+        """Drop cached paths, only those going through the edge when one is given"""
+        with cls._lock:
+            if edge is None:
+                cls._entries.clear()
+                cls._entriesByEdge.clear()
+                return
+            for key in list(cls._entriesByEdge.get(cls._edgeKey(edge), ())):
+                cls._drop(key)
+
+    @classmethod
+    def size(cls) -> int:
+        with cls._lock:
+            return len(cls._entries)
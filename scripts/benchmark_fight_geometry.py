@@ -0,0 +1,148 @@
+"""
+Benchmark of the casting cells search on fight states.
+
+Compares the previous per-target search (pydofus Cross/Lozenge zone cells, pointLos walks along the MP line,
+heuristic summed over every LOS cell for each expanded cell) with fight_geometry + FightLosMap, and checks both
+find the same casting cells. The map data the old search read through DataMapProvider comes from the state.
+
+States are read from a JSON list of {"targets": [cellId], "fighter": cellId, "kind": ZoneKind,
+"min_range": int, "range": int, "blocked": [cellId], "movable": [cellId] (optional, all cells by default)},
+random states are generated when no file is given.
+
+    python scripts/benchmark_fight_geometry.py --states fight_states.json
+"""
+import argparse
+import json
+import random
+from time import perf_counter
+
+import numpy as np
+
+from pyd2bot.logic.fight.behaviors.fight_turn import fight_geometry
+from pyd2bot.logic.fight.behaviors.fight_turn.FightLosMap import FightLosMap
+from pyd2bot.logic.fight.behaviors.fight_turn.spell_utils import ZoneKind, getSpellZone
+from pydofus2.com.ankamagames.jerakine.types.positions.MapPoint import MapPoint
+from pydofus2.mapTools import MapTools
+
+CELLS_COUNT = fight_geometry.CELLS_COUNT
+
+
+def random_states(count: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    states = []
+    for _ in range(count):
+        cells = rng.sample(range(CELLS_COUNT), 120)
+        min_range = rng.choice([0, 1, 1, 2])
+        states.append({
+            "targets": cells[:rng.randint(1, 6)],
+            "fighter": cells[10],
+            "kind": rng.choice([ZoneKind.LOZENGE, ZoneKind.LOZENGE, ZoneKind.CROSS, ZoneKind.CROSS_AND_DIAGONAL]),
+            "min_range": min_range,
+            "range": rng.randint(max(min_range, 1), 8),
+            "blocked": cells[20:20 + rng.randint(10, 80)],
+        })
+    return states
+
+
+class StateMapProvider:
+    """Stands for DataMapProvider in the pydofus zones and the LOS walk, answering from a fight state"""
+
+    def __init__(self, movable: set, blocked: set):
+        self.movable = movable
+        self.blocked = blocked
+
+    def pointMov(self, x: int, y: int, *args, **kwargs) -> bool:
+        return MapPoint.isInMap(x, y) and MapPoint.fromCoords(x, y).cellId in self.movable
+
+    def pointLos(self, x: int, y: int, bAllowTroughEntity: bool = True) -> bool:
+        return MapPoint.isInMap(x, y) and MapPoint.fromCoords(x, y).cellId not in self.blocked
+
+
+def spell_of(state: dict) -> dict:
+    """Spell with the zone of the state, as getSpellZone reads it"""
+    kind = state["kind"]
+    return {
+        "range": state["range"],
+        "minRange": state["min_range"],
+        "castInLine": kind in (ZoneKind.CROSS, ZoneKind.CROSS_AND_DIAGONAL),
+        "castInDiagonal": kind in (ZoneKind.DIAGONAL, ZoneKind.CROSS_AND_DIAGONAL),
+        "effects": [],
+    }
+
+
+def legacy_search(state: dict, movable: set):
+    """The search as it was: pydofus zone cells, then a pointLos walk along the MP line to each target"""
+    provider = StateMapProvider(movable, set(state["blocked"]))
+    spellZone = getSpellZone(spell_of(state), provider)
+    has_los = {}
+    for target in state["targets"]:
+        for cellId in spellZone.getCells(target):
+            line = MapTools.getMpLine(target, cellId)
+            if all(provider.pointLos(mp.x, mp.y, False) for mp in line[:-1]):
+                has_los.setdefault(cellId, []).append(target)
+    # Heuristic as evaluated for every expanded cell
+    heuristic = [
+        sum(MapTools.getDistance(cellId, dst) for dst in has_los) / len(has_los) if has_los else 0
+        for cellId in range(CELLS_COUNT)
+    ]
+    return has_los, heuristic
+
+
+def vectorized_search(state: dict, movable: np.ndarray):
+    blocked = 0
+    for cellId in state["blocked"]:
+        blocked |= 1 << cellId
+    zones = fight_geometry.zone_mask(state["kind"], state["min_range"], state["range"], state["targets"], movable)
+    has_los = {}
+    for target, zone in zip(state["targets"], zones):
+        for cellId in np.flatnonzero(zone).tolist():
+            if not (FightLosMap.lineMask(target, cellId) & blocked):
+                has_los.setdefault(cellId, []).append(target)
+    heuristic = fight_geometry.mean_distance_to(list(has_los)) if has_los else np.zeros(CELLS_COUNT)
+    return has_los, heuristic
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--states", help="JSON file of recorded fight states")
+    parser.add_argument("--count", type=int, default=200, help="number of random states when no file is given")
+    args = parser.parse_args()
+
+    if args.states:
+        with open(args.states) as fp:
+            states = json.load(fp)
+    else:
+        states = random_states(args.count)
+
+    movables = []
+    for state in states:
+        cells = state.get("movable", range(CELLS_COUNT))
+        mask = np.zeros(CELLS_COUNT, dtype=bool)
+        mask[list(cells)] = True
+        movables.append(mask)
+
+    start = perf_counter()
+    legacy = [legacy_search(state, set(np.flatnonzero(movable).tolist())) for state, movable in zip(states, movables)]
+    legacy_time = perf_counter() - start
+
+    # Geometry tables and line masks are built once per process, time a cold and a warm run
+    start = perf_counter()
+    cold = [vectorized_search(state, movable) for state, movable in zip(states, movables)]
+    cold_time = perf_counter() - start
+    start = perf_counter()
+    warm = [vectorized_search(state, movable) for state, movable in zip(states, movables)]
+    warm_time = perf_counter() - start
+
+    mismatches = sum(
+        legacy_los != new_los or not np.allclose(legacy_h, new_h)
+        for (legacy_los, legacy_h), (new_los, new_h) in zip(legacy, warm)
+    )
+    print(f"states: {len(states)}")
+    print(f"per-target : {legacy_time * 1000 / len(states):8.2f} ms/state")
+    print(f"vectorized : {cold_time * 1000 / len(states):8.2f} ms/state (cold)")
+    print(f"vectorized : {warm_time * 1000 / len(states):8.2f} ms/state (warm), {legacy_time / warm_time:.1f}x")
+    print(f"mismatching states: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark of the market statistics computation on synthetic sold bids.
+
+Compares the previous per-key implementation of MarketItemAnalytics.calculate_all_stats (python lists of
+dicts, one numpy call per key) with the vectorized engine, reports rows per second for both and the
+largest difference between their results.
+
+    python scripts/benchmark_market_stats.py --rows 500000 --keys 20000
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime, timezone
+from time import perf_counter
+
+import numpy as np
+
+from pyd2bot.logic.roleplay.behaviors.bidhouse.MarketStatsEngine import SalesColumns, compute_group_stats
+
+FIELDS = [
+    "num_samples", "mean_time_to_sell", "std_time_to_sell", "exp_rate", "mean_price", "std_price",
+    "median_price", "mean_tax", "sales_rate", "mean_profit_per_hour", "std_profit_per_hour", "p95_profit_per_hour",
+]
+
+
+def generate_rows(n_rows: int, n_keys: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    keys = np.stack([
+        rng.integers(1, 5, n_keys), rng.integers(1, 30000, n_keys), rng.choice([1, 10, 100], n_keys)
+    ], axis=1)
+    key_idx = rng.integers(0, n_keys, n_rows)
+    created = 1.7e9 + rng.uniform(0, 90 * 24 * 3600, n_rows)
+    # Some sales in the same second they were listed, to exercise the zero time to sell case
+    sold = created + np.where(rng.random(n_rows) < 0.02, 0, rng.exponential(12 * 3600, n_rows)).round()
+    prices = rng.integers(10, 100000, n_rows).astype(np.float64)
+    rows = [
+        (int(keys[k, 0]), int(keys[k, 1]), int(keys[k, 2]), p, c, s)
+        for k, p, c, s in zip(key_idx, prices, created, sold)
+    ]
+    taxes = {tuple(int(v) for v in keys[k]): float(rng.integers(1, 500)) for k in range(0, n_keys, 2)}
+    return rows, taxes
+
+
+def legacy_stats(rows, taxes):
+    """The per-key computation used before the vectorized engine, item name lookup left out"""
+    sales_data = defaultdict(list)
+    for server_id, gid, batch_size, price, created, sold in sorted(rows, key=lambda r: r[5], reverse=True):
+        sales_data[(server_id, gid, batch_size)].append({
+            'price': float(price),
+            'sold_at': datetime.fromtimestamp(sold, timezone.utc),
+            'created_at': datetime.fromtimestamp(created, timezone.utc),
+        })
+    result = {}
+    for key, sales in sales_data.items():
+        avg_tax = taxes.get(key, 0)
+        times_to_sell = [(sale['sold_at'] - sale['created_at']).total_seconds() / 3600 for sale in sales]
+        prices = [sale['price'] for sale in sales]
+        profits_per_hour = [
+            (sale['price'] - avg_tax) / ((sale['sold_at'] - sale['created_at']).total_seconds() / 3600)
+            for sale in sales
+            if (sale['sold_at'] - sale['created_at']).total_seconds() > 0
+        ]
+        if len(sales) >= 2:
+            time_span = (sales[0]['sold_at'] - sales[-1]['sold_at']).total_seconds() / (24 * 3600)
+            sales_rate = len(sales) / time_span if time_span > 0 else 0
+        else:
+            sales_rate = 0
+        with np.errstate(divide="ignore"):
+            exp_rate = 1 / np.mean(times_to_sell) if times_to_sell else 0
+        result[key] = dict(
+            num_samples=len(sales),
+            mean_time_to_sell=np.mean(times_to_sell),
+            std_time_to_sell=np.std(times_to_sell),
+            exp_rate=exp_rate,
+            mean_price=np.mean(prices),
+            std_price=np.std(prices),
+            median_price=np.median(prices),
+            mean_tax=avg_tax,
+            sales_rate=sales_rate,
+            mean_profit_per_hour=np.mean(profits_per_hour) if profits_per_hour else 0,
+            std_profit_per_hour=np.std(profits_per_hour) if profits_per_hour else 0,
+            p95_profit_per_hour=np.percentile(profits_per_hour, 95) if profits_per_hour else 0,
+        )
+    return result
+
+
+def max_relative_difference(legacy, groups) -> float:
+    worst = 0.0
+    for i in range(len(groups)):
+        expected = legacy[groups.key(i)]
+        for field in FIELDS:
+            a, b = float(expected[field]), float(getattr(groups, field)[i])
+            if a == b:
+                continue
+            worst = max(worst, abs(a - b) / max(abs(a), abs(b), 1e-12))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+
+    rows, taxes = generate_rows(args.rows, args.keys)
+
+    start = perf_counter()
+    legacy = legacy_stats(rows, taxes)
+    legacy_time = perf_counter() - start
+
+    start = perf_counter()
+    groups = compute_group_stats(SalesColumns.from_rows(rows), taxes)
+    engine_time = perf_counter() - start
+
+    assert len(groups) == len(legacy), "engine and legacy found a different number of groups"
+    print(f"rows: {len(rows)}, groups: {len(groups)}")
+    print(f"per-key  : {legacy_time:8.3f}s  {len(rows) / legacy_time:12,.0f} rows/s")
+    print(f"engine   : {engine_time:8.3f}s  {len(rows) / engine_time:12,.0f} rows/s")
+    print(f"speedup  : {legacy_time / engine_time:8.1f}x")
+    print(f"max relative difference: {max_relative_difference(legacy, groups):.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Replays recorded fights through the turn planner, offline.
+
+Fights are recorded by the bots of sessions with `recordFights` set, in
+<persistence dir>/fight_records/fights-<day>.jsonl.gz. Reports the planner decision latency over every
+recorded turn, and the turns needed to win each fight played out with a fixed damage per cast.
+
+    python scripts/simulate_fights.py --damage 40 %APPDATA%/pyd2bot/persistence/fight_records/*.jsonl.gz
+"""
+import argparse
+import glob
+import os
+
+from pyd2bot.logic.fight.replay.FightRecorder import FightRecorder
+from pyd2bot.logic.fight.replay.FightSimulator import FightSimulator, load_fights, percentiles
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("records", nargs="*", help="record files, every recorded day by default")
+    parser.add_argument("--damage", type=int, default=40, help="HP taken off a target by each cast")
+    parser.add_argument("--max-turns", type=int, default=30)
+    args = parser.parse_args()
+
+    paths = args.records or sorted(glob.glob(os.path.join(FightRecorder.RECORDS_DIR, "fights-*.jsonl.gz")))
+    fights = load_fights(paths)
+    if not fights:
+        print("no recorded fight found")
+        return
+
+    simulator = FightSimulator(args.damage, args.max_turns)
+    replay_latencies = []
+    simulated_latencies = []
+    turns_to_win = []
+    lost = 0
+    for fight in fights:
+        replay_latencies.extend(simulator.replay_turns(fight))
+        turns, latencies = simulator.simulate(fight)
+        simulated_latencies.extend(latencies)
+        if turns is None:
+            lost += 1
+        else:
+            turns_to_win.append(turns)
+        played = fight.playedTurns if fight.playedTurns is not None else "?"
+        print(f"{fight.fightId}: {len(fight.turns)} recorded turns, played {played}, simulated {turns or 'not won'}")
+
+    print(f"\nfights: {len(fights)}, recorded turns: {len(replay_latencies)}")
+    for name, latencies in [("recorded turns", replay_latencies), ("simulated turns", simulated_latencies)]:
+        p = percentiles([latency * 1000 for latency in latencies])
+        print(f"decision latency on {name:15}: p50 {p[50]:7.2f} ms  p90 {p[90]:7.2f} ms  p99 {p[99]:7.2f} ms")
+    p = percentiles(turns_to_win)
+    print(f"turns to win: p50 {p[50]:.1f}  p90 {p[90]:.1f}  p99 {p[99]:.1f}, not won in {args.max_turns} turns: {lost}")
+
+
+if __name__ == "__main__":
+    main()